@@ -0,0 +1,39 @@
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import generate
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("skeem", "Skeem benchmarks")
+    group.addoption(
+        "--rows", default="1000,10000", help="Comma-separated list of row counts of synthetic data. Default: 1000,10000"
+    )
+    group.addoption(
+        "--columns", default="5,50", help="Comma-separated list of column counts of synthetic data. Default: 5,50"
+    )
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Parametrize benchmarks by the sizes of synthetic data.
+    """
+    for name in ["rows", "columns"]:
+        if name in metafunc.fixturenames:
+            values = [int(value) for value in metafunc.config.getoption(name).split(",")]
+            metafunc.parametrize(name, values, ids=[f"{name}={value}" for value in values], scope="session")
+
+
+@pytest.fixture(scope="session")
+def synthetic(tmp_path_factory) -> t.Callable[[str, int, int], Path]:
+    """
+    Provide synthetic input data, generating each file only once per session.
+    """
+    directory = tmp_path_factory.mktemp("synthetic")
+
+    def factory(fmt: str, rows: int, columns: int) -> Path:
+        return generate(directory, fmt, rows, columns)
+
+    return factory
@@ -0,0 +1,109 @@
+"""
+Generate synthetic input data in all supported formats, for benchmarking inference.
+
+The data consists of an `id` column, followed by columns cycling through integer,
+float, string, timestamp, and boolean types, in order to exercise all type detectors.
+Values are generated from a fixed seed, so the data is reproducible.
+"""
+
+import datetime as dt
+import json
+import typing as t
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+KINDS = ["int", "float", "str", "timestamp", "bool"]
+
+# Which formats to generate, and their filename extensions.
+FORMATS = {
+    "csv": "csv",
+    "ndjson": "ndjson",
+    "json": "json",
+    "lineprotocol": "lp",
+    "parquet": "parquet",
+    "xlsx": "xlsx",
+    "ods": "ods",
+    "netcdf": "nc",
+}
+
+
+def make_frame(rows: int, columns: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Generate a DataFrame with `columns` columns, including the `id` column.
+    """
+    rng = np.random.default_rng(seed)
+    data: t.Dict[str, t.Any] = {"id": np.arange(1, rows + 1)}
+    for index in range(columns - 1):
+        kind = KINDS[index % len(KINDS)]
+        name = f"{kind}_{index}"
+        if kind == "int":
+            data[name] = rng.integers(-(10**6), 10**6, size=rows)
+        elif kind == "float":
+            data[name] = (rng.random(size=rows) * 1000).round(3)
+        elif kind == "str":
+            data[name] = [f"sensor-{value}" for value in rng.integers(0, rows, size=rows)]
+        elif kind == "timestamp":
+            data[name] = pd.date_range(dt.datetime(2023, 1, 1), periods=rows, freq="7min")
+        else:
+            data[name] = rng.random(size=rows) > 0.5
+    return pd.DataFrame(data)
+
+
+def write(df: pd.DataFrame, fmt: str, path: Path):
+    """
+    Write DataFrame to file in the given format.
+    """
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "ndjson":
+        df.to_json(path, orient="records", lines=True, date_format="iso")
+    elif fmt == "json":
+        path.write_text(json.dumps(json.loads(df.to_json(orient="records", date_format="iso")), indent=2))
+    elif fmt == "lineprotocol":
+        write_lineprotocol(df, path)
+    elif fmt == "parquet":
+        df.to_parquet(path, engine="fastparquet", index=False)
+    elif fmt == "xlsx":
+        df.to_excel(path, index=False, engine="openpyxl")
+    elif fmt == "ods":
+        df.to_excel(path, index=False, engine="odf")
+    elif fmt == "netcdf":
+        df.set_index("id").to_xarray().to_netcdf(path, engine="scipy")
+    else:
+        raise ValueError(f"Unknown format: {fmt}")
+
+
+def write_lineprotocol(df: pd.DataFrame, path: Path):
+    """
+    Write DataFrame in InfluxDB line protocol format. String columns become tags,
+    timestamp columns are skipped, except the first one, which becomes the time.
+    """
+    tags = [name for name in df.columns if name.startswith("str_")]
+    times = [name for name in df.columns if name.startswith("timestamp_")]
+    fields = [name for name in df.columns if name not in tags and name not in times]
+    timestamps = df[times[0]].astype("int64") if times else pd.Series(np.arange(len(df)) * 10**9)
+    with open(path, "w") as f:
+        for (_, row), timestamp in zip(df.iterrows(), timestamps):
+            tagset = "".join(f",{name}={row[name]}" for name in tags)
+            fieldset = ",".join(f"{name}={_field(row[name])}" for name in fields)
+            f.write(f"sensor{tagset} {fieldset} {timestamp}\n")
+
+
+def _field(value: t.Any) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (int, np.integer)):
+        return f"{value}i"
+    return str(value)
+
+
+def generate(directory: Path, fmt: str, rows: int, columns: int) -> Path:
+    """
+    Generate a file in the given format and size, unless it exists already.
+    """
+    path = directory / f"data-{rows}x{columns}.{FORMATS[fmt]}"
+    if not path.exists():
+        write(make_frame(rows, columns), fmt, path)
+    return path
@@ -0,0 +1,129 @@
+"""
+Benchmark inference throughput across formats, sizes, and backends, using `pytest-benchmark`.
+
+Measure `SchemaGenerator.to_sql_ddl` end-to-end, as well as the individual stages of the
+inference pipeline: peeking into the resource, inferring the primary key, inferring the
+column types, and rendering the SQL DDL. Benchmarks of the same input are grouped, in
+order to compare both backends side by side.
+
+Usage::
+
+    pytest benchmarks --no-cov --benchmark-only
+    pytest benchmarks --no-cov --benchmark-only --rows=100000 --columns=20 -k "csv or ndjson"
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from skeem.autopk import infer_pk
+from skeem.core import SchemaGenerator
+from skeem.model import Resource, SqlTarget
+
+# Which formats each backend supports. With the `ddlgen` backend,
+# Parquet files are routed to the `parquet` backend, reading the footer only.
+BACKEND_FORMATS = {
+    "ddlgen": ["csv", "ndjson", "json", "lineprotocol", "parquet", "xlsx", "ods", "netcdf"],
+    "frictionless": ["csv", "ndjson", "json", "parquet", "xlsx", "ods"],
+}
+
+# Which formats to benchmark individual stages of the `ddlgen` backend for.
+STAGE_FORMATS = ["csv", "ndjson", "json", "lineprotocol", "xlsx", "ods", "netcdf"]
+
+# How many cells spreadsheets may have at most, because generating them is slow.
+SPREADSHEET_MAX_CELLS = 100_000
+
+DIALECTS = ["crate", "postgresql", "sqlite"]
+
+
+def dataset(synthetic, fmt: str, rows: int, columns: int) -> Path:
+    if fmt in ["xlsx", "ods"] and rows * columns > SPREADSHEET_MAX_CELLS:
+        pytest.skip(f"Spreadsheets are limited to {SPREADSHEET_MAX_CELLS} cells")
+    if fmt == "netcdf":
+        pytest.importorskip("xarray")
+        pytest.importorskip("scipy")
+    return synthetic(fmt, rows, columns)
+
+
+def schema_generator(path: Path, backend: str = "ddlgen", **kwargs) -> SchemaGenerator:
+    return SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="postgresql", **kwargs),
+        backend=backend,
+    )
+
+
+@pytest.mark.parametrize(
+    "backend,fmt", [(backend, fmt) for backend, formats in BACKEND_FORMATS.items() for fmt in formats]
+)
+def test_end_to_end(benchmark, synthetic, backend, fmt, rows, columns):
+    """
+    Infer SQL DDL from file, including all stages. The timings of the stages
+    of the last round are recorded into the benchmark's `extra_info`.
+    """
+    path = dataset(synthetic, fmt, rows, columns)
+    benchmark.group = f"end-to-end {fmt} {rows}x{columns}"
+
+    def run() -> SchemaGenerator:
+        sg = schema_generator(path, backend)
+        sg.to_sql_ddl()
+        return sg
+
+    sg = benchmark(run)
+    benchmark.extra_info["stages"] = sg.timings
+
+
+@pytest.mark.parametrize("fmt", STAGE_FORMATS)
+def test_stage_peek(benchmark, synthetic, fmt, rows, columns):
+    """
+    Peek into the resource, reading the sample.
+    """
+    path = dataset(synthetic, fmt, rows, columns)
+    benchmark.group = f"peek {rows}x{columns}"
+
+    def run():
+        resource = Resource(path=path)
+        resource.detect_type()
+        return resource.peek()
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("fmt", STAGE_FORMATS)
+def test_stage_infer_pk(benchmark, synthetic, fmt, rows, columns):
+    """
+    Infer the primary key from the sample.
+    """
+    resource = Resource(path=dataset(synthetic, fmt, rows, columns))
+    resource.detect_type()
+    payload = resource.peek().read()
+    benchmark.group = f"infer_pk {rows}x{columns}"
+    benchmark(lambda: infer_pk(io.BytesIO(payload), resource.type, peek_lines=resource.sampling.rows))
+
+
+@pytest.mark.parametrize(
+    "backend,fmt", [(backend, fmt) for backend, formats in BACKEND_FORMATS.items() for fmt in formats]
+)
+def test_stage_infer_types(benchmark, synthetic, backend, fmt, rows, columns):
+    """
+    Infer the column types, with a given primary key. This includes reading the sample.
+    """
+    path = dataset(synthetic, fmt, rows, columns)
+    benchmark.group = f"infer_types {fmt} {rows}x{columns}"
+    benchmark(lambda: schema_generator(path, backend, primary_key="id").infer().dispose())
+
+
+@pytest.mark.parametrize("backend", BACKEND_FORMATS)
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_stage_render(benchmark, synthetic, backend, dialect, rows, columns):
+    """
+    Render the SQL DDL statement of an inferred schema for an SQL dialect, including pretty-printing it.
+    """
+    sg = schema_generator(dataset(synthetic, "csv", rows, columns), backend)
+    inferred = sg.infer()
+    benchmark.group = f"render {dialect} {rows}x{columns}"
+    try:
+        benchmark(lambda: sg._to_sql_ddl(inferred, dialect).pretty)
+    finally:
+        inferred.dispose()
@@ -0,0 +1,95 @@
+"""
+Benchmark inferring column types of wide tables in parallel.
+
+Generate a synthetic CSV file with many columns of different types, and infer
+its SQL DDL using the `ddlgen` backend with an increasing number of workers.
+
+Usage::
+
+    python benchmarks/wide_columns.py
+    python benchmarks/wide_columns.py --columns=3000 --rows=100 --workers=1,2,4,8
+"""
+
+import argparse
+import datetime as dt
+import os
+import random
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from skeem.core import SchemaGenerator
+from skeem.model import Resource, SamplingConfig, SqlTarget
+
+KINDS = ["int", "float", "str", "date", "bool"]
+
+
+def value(kind: str, row: int) -> str:
+    if kind == "int":
+        return str(random.randint(-(10**6), 10**6))  # noqa: S311
+    if kind == "float":
+        return f"{random.random() * 1000:.3f}"  # noqa: S311
+    if kind == "str":
+        return f"sensor-{random.random()}"  # noqa: S311
+    if kind == "date":
+        return (dt.datetime(2023, 1, 1) + dt.timedelta(minutes=row * 7)).isoformat()
+    return random.choice(["true", "false"])  # noqa: S311
+
+
+def generate_csv(path: Path, columns: int, rows: int):
+    """
+    Generate a CSV file with `columns` columns, cycling through integer, float, string, date, and boolean types.
+    """
+    random.seed(42)
+    kinds = [KINDS[index % len(KINDS)] for index in range(columns)]
+    with open(path, "w") as f:
+        f.write(",".join(f"{kind}_{index}" for index, kind in enumerate(kinds)) + "\n")
+        for row in range(rows):
+            f.write(",".join(value(kind, row) for kind in kinds) + "\n")
+
+
+def infer(path: Path, rows: int, workers: int) -> t.Tuple[float, str]:
+    started = time.perf_counter()
+    result = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="postgresql"),
+        sampling=SamplingConfig(rows=rows, bytes=path.stat().st_size),
+        workers=workers,
+    ).to_sql_ddl()
+    return time.perf_counter() - started, result.canonical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=2000, help="Number of columns. Default: 2000")
+    parser.add_argument("--rows", type=int, default=100, help="Number of rows. Default: 100")
+    parser.add_argument("--workers", type=str, help="Comma-separated list of worker counts. Default: 1, 2, 4, ...")
+    args = parser.parse_args()
+
+    if args.workers:
+        workers = [int(item) for item in args.workers.split(",")]
+    else:
+        cpus = os.cpu_count() or 1
+        workers = [1] + [2**exponent for exponent in range(1, cpus.bit_length()) if 2**exponent <= cpus]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "wide.csv"
+        generate_csv(path, columns=args.columns, rows=args.rows)
+        print(f"Inferring {args.columns} columns x {args.rows} rows, {os.cpu_count()} CPUs")  # noqa: T201
+        print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")  # noqa: T201
+
+        baseline = None
+        reference = None
+        for count in workers:
+            duration, sql = infer(path, rows=args.rows, workers=count)
+            baseline = baseline or duration
+            if reference is None:
+                reference = sql
+            elif sql != reference:
+                raise RuntimeError(f"Inferred SQL DDL differs when using {count} workers")
+            print(f"{count:>8} {duration:>8.2f} {baseline / duration:>7.2f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,7 @@
-from skeem import types
-from skeem.ddlgen import monkey as ddlgen_monkey
-from skeem.fastparquet import monkey as fastparquet_monkey
-from skeem.frictionless import monkey as frictionless_monkey
-from skeem.pandas import monkey as pandas_monkey
+from skeem import monkey, types
 from skeem.util.report import get_version
 
-ddlgen_monkey.activate()
-frictionless_monkey.activate()
-fastparquet_monkey.activate()
-pandas_monkey.activate()
+monkey.activate()
 types.init()
 
 
@@ -1,12 +1,19 @@
+import datetime
 import io
 import logging
 import typing as t
+from decimal import Decimal
 
 import pandas as pd
 
+from skeem.cardinality import is_unique
 from skeem.io import to_dataframe
+from skeem.settings import PEEK_LINES
 from skeem.types import ContentType, ContentTypeGroup
 
+if t.TYPE_CHECKING:
+    from skeem.ddlgen.typehelpers import ColumnStatistics
+
 IntOrString = t.TypeVar("IntOrString", int, str)
 AddressType = t.Union[int, str, t.List[IntOrString]]
 
@@ -26,7 +33,11 @@ logger = logging.getLogger(__name__)
 
 
 def infer_pk(
-    data: t.Any, content_type: t.Optional[ContentType] = None, address: t.Optional[AddressType] = None
+    data: t.Any,
+    content_type: t.Optional[ContentType] = None,
+    address: t.Optional[AddressType] = None,
+    peek_lines: int = PEEK_LINES,
+    peek_bytes: t.Optional[int] = None,
 ) -> t.Optional[str]:
     """
     Attempt to infer primary key from column names and data, DWIM [1].
@@ -39,7 +50,7 @@ def infer_pk(
         return None
 
     logger.info("Inferring primary key")
-    pk = _infer_pk(data, content_type, address)
+    pk = _infer_pk(data, content_type, address, peek_lines=peek_lines, peek_bytes=peek_bytes)
     logger.info(f"Inferred primary key: {pk}")
     if hasattr(data, "seek"):
         data.seek(0)
@@ -48,7 +59,11 @@ def infer_pk(
 
 
 def _infer_pk(
-    data: t.Any, content_type: t.Optional[ContentType] = None, address: t.Optional[AddressType] = None
+    data: t.Any,
+    content_type: t.Optional[ContentType] = None,
+    address: t.Optional[AddressType] = None,
+    peek_lines: int = PEEK_LINES,
+    peek_bytes: t.Optional[int] = None,
 ) -> t.Optional[str]:
     # Try to converge data into pandas DataFrame.
     if isinstance(data, pd.DataFrame):
@@ -59,7 +74,9 @@ def _infer_pk(
         if isinstance(data, str):
             data = io.StringIO(data)
         try:
-            df = to_dataframe(data=data, content_type=content_type, address=address)
+            df = to_dataframe(
+                data=data, content_type=content_type, address=address, peek_lines=peek_lines, peek_bytes=peek_bytes
+            )
         except ValueError as ex:
             raise NotImplementedError(f"Failed to infer primary key. Reason: {ex}") from ex
 
@@ -67,6 +84,63 @@ def _infer_pk(
     columns = list(df.columns)
     logger.info(f"Decoded list of column names: {columns}")
 
+    # Choose primary key based on column names.
+    pk = infer_pk_from_names(columns)
+    if pk is not None:
+        return pk
+
+    # If the values of the first column are unique, use that as primary key.
+    column1_series = df[df.columns[0]]
+    if column1_series.dtype not in ["datetime64[ns]", "float64"]:
+        try:
+            if column1_series.isna().sum() <= 1 and is_unique(column1_series):
+                return df.columns[0]
+        except Exception as ex:
+            logger.info(
+                f"WARNING: Unable to use '{column1_series.name}' as primary key. Uniqueness check failed. Reason: {ex}"
+            )
+
+    return None
+
+
+def infer_pk_from_statistics(
+    statistics: t.Mapping[str, "ColumnStatistics"], content_type: t.Optional[ContentType] = None
+) -> t.Optional[str]:
+    """
+    Attempt to infer primary key from column names and statistics of all records, see `fold_statistics`.
+    """
+    # No PK detection for certain content types.
+    if content_type in ContentTypeGroup.NO_AUTOPK:
+        logger.info(f"Not inferring primary key for {content_type}")
+        return None
+
+    logger.info("Inferring primary key from column statistics")
+    columns = list(statistics)
+    pk = infer_pk_from_names(columns)
+
+    # If the values of the first column are unique, use that as primary key.
+    # Only trust uniqueness when distinct values have been counted exactly, because an
+    # estimate can not rule out a few duplicates, which would violate the constraint.
+    if pk is None and columns:
+        column1 = statistics[columns[0]]
+        if not isinstance(column1.sample_datum, (Decimal, datetime.datetime)) and column1.is_unique:
+            if column1.cardinality.is_exact:
+                pk = columns[0]
+            else:
+                logger.info(
+                    f"WARNING: Not using '{columns[0]}' as primary key. Its uniqueness has only been estimated, "
+                    f"because it has more than {column1.cardinality.exact_max} distinct values"
+                )
+
+    logger.info(f"Inferred primary key: {pk}")
+    return pk
+
+
+def infer_pk_from_names(columns: t.List[str]) -> t.Optional[str]:
+    """
+    Attempt to infer primary key from column names only.
+    """
+
     # If there is any column starting with "id", use it as primary key right away.
     for column in columns:
         for candidate in PK_CANDIDATES_PRIMARY_PREFIXES:
@@ -82,15 +156,4 @@ def _infer_pk(
         if column.lower() in PK_CANDIDATES_SECONDARY_LIST:
             return column
 
-    # If the values of the first column are unique, use that as primary key.
-    column1_series = df[df.columns[0]]
-    if column1_series.dtype not in ["datetime64[ns]", "float64"]:
-        try:
-            if column1_series.is_unique:
-                return df.columns[0]
-        except Exception as ex:
-            logger.info(
-                f"WARNING: Unable to use '{column1_series.name}' as primary key. Uniqueness check failed. Reason: {ex}"
-            )
-
     return None
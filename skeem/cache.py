@@ -0,0 +1,182 @@
+"""
+Persistent cache for inference results, in order to not read and infer unchanged resources again.
+
+Entries are stored into an SQLite database within the user's cache directory, keyed by
+a fingerprint of the resource, and all settings which influence the inference result.
+"""
+
+import contextlib
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle  # noqa: S403
+import sqlite3
+import time
+import typing as t
+from pathlib import Path
+
+import skeem.io
+from skeem.settings import CACHE_MAX_BYTES, CACHE_TTL
+from skeem.util.report import get_version
+
+if t.TYPE_CHECKING:
+    from skeem.model import Resource, SqlTarget
+
+logger = logging.getLogger(__name__)
+
+
+# Which attributes of `fsspec`'s `info()` identify the version of a resource, in order of preference.
+VERSION_ATTRIBUTES = ["ETag", "etag", "md5Hash", "generation", "LastModified", "last_modified", "mtime", "updated"]
+
+
+class InferenceCache:
+    """
+    Store inference results into an SQLite database, with TTL- and size-based eviction.
+
+    Values are serialized using `pickle`. Because of that, the cache directory must not
+    be shared with untrusted users. When `refresh` is enabled, entries will be written,
+    but not read, in order to replace them.
+    """
+
+    def __init__(
+        self,
+        path: t.Optional[t.Union[Path, str]] = None,
+        ttl: float = CACHE_TTL,
+        max_bytes: int = CACHE_MAX_BYTES,
+        refresh: bool = False,
+    ):
+        self.path = Path(path) if path is not None else cache_directory() / "inference.sqlite"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+
+    def get(self, key: str) -> t.Optional[t.Any]:
+        """
+        Return cached value, or `None` when it is missing, expired, or when refreshing the cache.
+        """
+        if self.refresh:
+            return None
+        now = time.time()
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        logger.info(f"Cache hit: {key}")
+        return pickle.loads(row[0])  # noqa: S301
+
+    def put(self, key: str, value: t.Any):
+        """
+        Store value, and evict expired entries, and least recently used entries beyond the size limit.
+        """
+        payload = pickle.dumps(value)
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            connection.execute("DELETE FROM entries WHERE created <= ?", (now - self.ttl,))
+            connection.execute(
+                """
+                DELETE FROM entries WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total FROM entries
+                    ) WHERE total > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+        logger.info(f"Cache store: {key}")
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self.connect() as connection:
+            connection.execute("DELETE FROM entries")
+
+    @contextlib.contextmanager
+    def connect(self) -> t.Generator[sqlite3.Connection, None, None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries "
+                    "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, created REAL, accessed REAL)"
+                )
+                yield connection
+        finally:
+            connection.close()
+
+
+def cache_directory() -> Path:
+    """
+    Where to store cache files. Use `SKEEM_CACHE_DIR`, or `XDG_CACHE_HOME`, defaulting to `~/.cache/skeem`.
+    """
+    if "SKEEM_CACHE_DIR" in os.environ:
+        return Path(os.environ["SKEEM_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "skeem"
+
+
+def fingerprint(resource: "Resource") -> t.Optional[str]:
+    """
+    Identify the content of a resource, without reading it, where possible.
+
+    Files are identified by path, size, and version attributes like ETag or modification
+    time, as reported by `fsspec`. Streams are identified by a hash of their content, when
+    it fits into the byte budget of the sample. Otherwise, the resource can not be cached.
+    """
+    if resource.path is not None:
+        info = skeem.io.fsspec_info(resource.path)
+        version = next((info[name] for name in VERSION_ATTRIBUTES if info.get(name) is not None), None)
+        if version is None:
+            logger.info(f"WARNING: Unable to cache resource without version information: {resource.path}")
+            return None
+        return _digest(["path", str(resource.path), info.get("size"), str(version)])
+
+    if resource.data is not None and hasattr(resource.data, "read"):
+        prefix, resource.data = skeem.io.read_prefix(resource.data, resource.sampling.bytes + 1)
+        if len(prefix) > resource.sampling.bytes:
+            logger.info("WARNING: Unable to cache stream larger than the sample byte budget")
+            return None
+        return _digest(["data", hashlib.sha256(prefix).hexdigest()])
+
+    return None
+
+
+def cache_key(
+    fingerprint: str,
+    resource: "Resource",
+    target: t.Optional["SqlTarget"] = None,
+    backend: t.Optional[str] = None,
+    kind: str = "sql",
+) -> str:
+    """
+    Compute cache key from the fingerprint of the resource, and all settings which influence the result.
+
+    Column statistics (`kind="statistics"`) do not depend on the SQL target and the backend,
+    except for the strategy of mapping nested objects, because flattened records are scanned.
+    """
+    settings = [
+        kind,
+        get_version("skeem"),
+        fingerprint,
+        resource.address,
+        str(resource.content_type),
+        dataclasses.asdict(resource.sampling),
+    ]
+    if kind != "statistics":
+        settings += [backend, dataclasses.asdict(target) if target is not None else None]
+    else:
+        settings += [str(target.nested) if target is not None else None]
+    return f"{kind}:{_digest(settings)}"
+
+
+def _digest(items: t.List[t.Any]) -> str:
+    return hashlib.sha256(json.dumps(items, default=str, sort_keys=True).encode()).hexdigest()
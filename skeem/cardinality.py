@@ -0,0 +1,158 @@
+import logging
+import math
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from skeem.settings import CARDINALITY_EXACT_MAX, CARDINALITY_PRECISION
+
+logger = logging.getLogger(__name__)
+
+
+class CardinalityEstimator:
+    """
+    Count distinct values of a column, in order to decide about its uniqueness, with bounded memory.
+
+    Up to `exact_max` distinct values, their 64-bit hashes are tracked in a set, and the
+    outcome is exact, so duplicates are detected reliably. Beyond that threshold, the
+    estimator degrades to HyperLogLog [1], using `2 ** precision` registers of one byte
+    each, with a standard error of `1.04 / sqrt(2 ** precision)`.
+
+    Duplicates observed while counting exactly rule out uniqueness definitively. After
+    degrading, a column is considered unique when the estimated number of distinct values
+    is within three standard errors of the number of values. Such an estimate can not rule
+    out a small number of duplicates, so it must not be used for choosing a primary key,
+    see `is_exact`.
+
+    [1] https://en.wikipedia.org/wiki/HyperLogLog
+
+    >>> estimator = CardinalityEstimator(exact_max=100)
+    >>> estimator.update(pd.Series(range(50)))
+    >>> estimator.cardinality, estimator.is_unique
+    (50, True)
+    >>> estimator.update(pd.Series(range(1000, 2000)))
+    >>> estimator.is_exact, estimator.is_unique
+    (False, True)
+    >>> estimator.update(pd.Series([42] * 500))
+    >>> estimator.is_unique
+    False
+    """
+
+    def __init__(self, exact_max: int = CARDINALITY_EXACT_MAX, precision: int = CARDINALITY_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got: {precision}")
+        self.exact_max = exact_max
+        self.precision = precision
+        self.count = 0
+        self.duplicates = False
+        self.hashes: t.Optional[t.Set[int]] = set()
+        self.registers: t.Optional[np.ndarray] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.hashes is not None
+
+    @property
+    def error(self) -> float:
+        """
+        The standard error of the HyperLogLog estimate.
+        """
+        return 1.04 / math.sqrt(1 << self.precision)
+
+    @property
+    def cardinality(self) -> int:
+        """
+        The number of distinct values, estimated when counting is not exact anymore.
+        """
+        if self.hashes is not None:
+            return len(self.hashes)
+        return round(_hll_estimate(t.cast(np.ndarray, self.registers)))
+
+    @property
+    def is_unique(self) -> bool:
+        if self.duplicates:
+            return False
+        if self.hashes is not None:
+            return True
+        return self.cardinality >= self.count * (1 - 3 * self.error)
+
+    def update(self, values: pd.Series):
+        """
+        Add non-null values to the estimator.
+        """
+        try:
+            hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        except TypeError:
+            # Nested values, like lists or dictionaries, are not hashable.
+            from ddlgenerator.typehelpers import is_scalar
+
+            values = values.map(lambda value: value if is_scalar(value) else str(value))
+            hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self.count += len(hashes)
+        if self.hashes is not None:
+            distinct = set(hashes.tolist())
+            if len(distinct) < len(hashes) or not self.hashes.isdisjoint(distinct):
+                self.duplicates = True
+            self.hashes |= distinct
+            if len(self.hashes) > self.exact_max:
+                logger.info(f"More than {self.exact_max} distinct values, estimating cardinality using HyperLogLog")
+                self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+                self._add(np.fromiter(self.hashes, dtype=np.uint64, count=len(self.hashes)))
+                self.hashes = None
+        else:
+            self._add(hashes)
+
+    def _add(self, hashes: np.ndarray):
+        """
+        Add hashes to the HyperLogLog registers. The first `precision` bits address the
+        register, and the position of the leftmost 1-bit within the rest is recorded.
+        """
+        width = np.uint64(64 - self.precision)
+        index = (hashes >> width).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        rank = (width - _bit_length(rest) + np.uint64(1)).astype(np.uint8)
+        np.maximum.at(t.cast(np.ndarray, self.registers), index, rank)
+
+
+def is_unique(values: pd.Series, estimator: t.Callable[[], CardinalityEstimator] = CardinalityEstimator) -> bool:
+    """
+    Decide whether the non-null values of a column are unique, using a cardinality estimator.
+
+    >>> is_unique(pd.Series([1, 2, 3]))
+    True
+    >>> is_unique(pd.Series(["foo", "bar", "foo"]))
+    False
+    """
+    cardinality = estimator()
+    cardinality.update(values.dropna())
+    return cardinality.is_unique
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """
+    Compute the number of bits needed to represent each of the unsigned 64-bit integers.
+
+    >>> _bit_length(np.array([0, 1, 2, 255, 256, 2**63], dtype=np.uint64)).tolist()
+    [0, 1, 2, 8, 9, 64]
+    """
+    length = np.zeros(values.shape, dtype=np.uint64)
+    for shift in [32, 16, 8, 4, 2, 1]:
+        high = values >= np.uint64(1 << shift)
+        length[high] += np.uint64(shift)
+        values = np.where(high, values >> np.uint64(shift), values)
+    return length + (values > 0).astype(np.uint64)
+
+
+def _hll_estimate(registers: np.ndarray) -> float:
+    """
+    Estimate the number of distinct values from HyperLogLog registers,
+    using linear counting for small cardinalities.
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -registers.astype(np.int64))))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)
+    return estimate
@@ -1,3 +1,4 @@
+import json
 import logging
 import sys
 import typing as t
@@ -5,9 +6,14 @@ from pathlib import Path
 
 import click
 
+from skeem.cache import InferenceCache
 from skeem.core import SchemaGenerator
-from skeem.model import Resource, SqlTarget
+from skeem.io import expand_paths
+from skeem.model import Resource, SamplingConfig, SqlTarget
+from skeem.profiling import cprofile
 from skeem.report import AboutReport
+from skeem.settings import BATCH_IO_WORKERS, PEEK_BYTES_MAX, PEEK_LINES
+from skeem.types import NestedStrategy, SamplingStrategy
 from skeem.util.cli import boot_click, docstring_format_verbatim, split_list
 
 logger = logging.getLogger(__name__)
@@ -51,6 +57,11 @@ def help_infer_ddl():
       skeem infer-ddl --dialect=postgresql data.ods
       skeem --verbose infer-ddl --dialect=postgresql data.xlsx
       skeem --verbose infer-ddl --dialect=postgresql data.xlsx --address="Sheet2"
+      skeem infer-ddl --dialect=postgresql data.json --address="results[*]"
+
+      # Nested objects as one column per path, or as native nested types
+      skeem infer-ddl --dialect=crate --nested=flatten data.ndjson
+      skeem infer-ddl --dialect=crate --nested=object data.ndjson
 
       # Google Sheets
       skeem infer-ddl --dialect=postgresql --table-name=foo https://docs.google.com/spreadsheets/d/1ExyrawjlyksbC6DOM6nLolJDbU8qiRrrhxSuxf5ScB0/view
@@ -59,7 +70,24 @@ def help_infer_ddl():
       skeem infer-ddl --dialect=postgresql https://github.com/influxdata/influxdb2-sample-data/raw/master/air-sensor-data/air-sensor-data.lp
 
       # Compressed files in gzip format
-      skeem infer-ddl --content-type=ndjson --dialect=crate https://s3.amazonaws.com/crate.sampledata/nyc.yellowcab/yc.2019.07.gz
+      skeem infer-ddl --dialect=crate https://s3.amazonaws.com/crate.sampledata/nyc.yellowcab/yc.2019.07.gz
+
+      # Compressed files in bz2, lz4, snappy, xz, or zstd format
+      skeem infer-ddl --dialect=postgresql data.ndjson.zst
+
+      # Sample 10_000 lines from evenly spaced offsets across the file
+      skeem infer-ddl --dialect=postgresql --sample-rows=10000 --sample-strategy=stride data.csv
+
+      # Infer schema once, and generate SQL DDL for multiple dialects
+      skeem infer-ddl --dialect=postgresql,crate,sqlite data.csv
+      skeem infer-ddl --dialect=postgresql,crate,sqlite --output-dir=ddl data.csv
+
+      # Report column types, nullability, uniqueness, sample values, and stage timings
+      skeem infer-ddl --dialect=postgresql --format=json data.csv
+      skeem infer-ddl --dialect=postgresql,crate --format=yaml data.csv
+
+      # Display wall clock time, CPU time, rows, and bytes of each stage
+      skeem infer-ddl --dialect=postgresql --profile data.csv
 
       ... and a lot more!
 
@@ -72,6 +100,117 @@ def help_infer_ddl():
     """  # noqa: E501
 
 
+def help_infer_ddl_batch():
+    """
+    Infer SQL DDL from many inputs, concurrently, within a single process.
+
+    INPUTS can be files, URLs, or glob patterns. More inputs can be read
+    from a manifest file, containing one input per line.
+
+    Table names are derived from the input file names. Errors are reported
+    per item, and do not stop the batch operation.
+
+    Examples
+    --------
+
+      # Emit a combined SQL DDL script to stdout
+      skeem infer-ddl-batch --dialect=postgresql data/*.ndjson data/*.csv
+
+      # Glob patterns also work on remote file systems
+      skeem infer-ddl-batch --dialect=postgresql "s3://noaa-ghcn-pds/csv/by_year/202*.csv"
+
+      # Read inputs from manifest file, and write one SQL DDL file per table
+      skeem infer-ddl-batch --dialect=postgresql --manifest=inputs.txt --output-dir=ddl
+    """  # noqa: E501
+
+
+def sampling_options(func):
+    """
+    Add options for configuring the sample of data used for inferring the schema.
+    """
+    func = click.option(
+        "--full-scan",
+        is_flag=True,
+        required=False,
+        default=False,
+        help="Infer column types from all records, reading CSV and NDJSON resources in chunks",
+    )(func)
+    func = click.option(
+        "--sample-strategy",
+        type=click.Choice(SamplingStrategy.values()),
+        required=False,
+        default=SamplingStrategy.HEAD.value,
+        help="Select which lines of line-based formats to sample. Default: head",
+    )(func)
+    func = click.option(
+        "--sample-bytes",
+        type=click.IntRange(min=1),
+        required=False,
+        default=PEEK_BYTES_MAX,
+        help=f"Maximum number of bytes to read for acquiring the sample. Default: {PEEK_BYTES_MAX}",
+    )(func)
+    func = click.option(
+        "--sample-rows",
+        type=click.IntRange(min=1),
+        required=False,
+        default=PEEK_LINES,
+        help=f"Number of lines/records to sample. Default: {PEEK_LINES}",
+    )(func)
+    return func
+
+
+def cache_options(func):
+    """
+    Add options for configuring the persistent cache of inference results.
+    """
+    func = click.option(
+        "--refresh",
+        is_flag=True,
+        required=False,
+        default=False,
+        help="Infer schema again, and replace the cached result. Implies `--cache`",
+    )(func)
+    func = click.option(
+        "--cache/--no-cache",
+        required=False,
+        default=False,
+        help="Use the persistent cache of inference results, stored at `~/.cache/skeem`. Default: disabled",
+    )(func)
+    return func
+
+
+def profile_options(func):
+    """
+    Add options for measuring the stages of the inference pipeline.
+    """
+    func = click.option(
+        "--profile-dump",
+        type=click.Path(dir_okay=False, path_type=Path),
+        required=False,
+        help="Run cProfile, and write its statistics to file, for inspecting them using `python -m pstats`",
+    )(func)
+    func = click.option(
+        "--profile-report",
+        type=click.Path(dir_okay=False, path_type=Path),
+        required=False,
+        help="Write wall clock time, CPU time, rows, and bytes per stage to file, in JSON format",
+    )(func)
+    func = click.option(
+        "--profile",
+        is_flag=True,
+        required=False,
+        default=False,
+        help="Display wall clock time, CPU time, rows, and bytes per stage on stderr",
+    )(func)
+    return func
+
+
+def make_cache(cache: bool, refresh: bool) -> t.Optional[InferenceCache]:
+    if not cache and not refresh:
+        return None
+    return InferenceCache(refresh=refresh)
+
+
 @click.group()
 @click.version_option(package_name="skeem")
 @click.option("--verbose", is_flag=True, required=False, help="Turn on logging")
@@ -102,7 +241,12 @@ def info():
     context_settings={"max_content_width": 120},
 )
 @click.argument("input", type=str, required=True)
-@click.option("--dialect", type=str, required=False, help="Select SQLAlchemy dialect for generating SQL")
+@click.option(
+    "--dialect",
+    type=str,
+    required=False,
+    help="Select SQLAlchemy dialect for generating SQL. Multiple dialects can be given as comma-separated list",
+)
 @click.option("--table-name", type=str, required=False, help="Specify table name used in DDL statement")
 @click.option(
     "--primary-key",
@@ -112,15 +256,51 @@ def info():
 )
 @click.option("--content-type", type=str, required=False, help="Specify content type when data is read from STDIN")
 @click.option(
-    "--address", type=str, required=False, help="Optionally address sub-resources like tabs within spreadsheets"
+    "--address",
+    type=str,
+    required=False,
+    help="Optionally address sub-resources like tabs within spreadsheets, "
+    "or records within nested JSON documents, like `results[*]` or `/results`",
 )
 @click.option(
     "--backend",
-    type=click.Choice(["ddlgen", "frictionless", "fl"]),
+    type=click.Choice(["ddlgen", "frictionless", "fl", "parquet"]),
     required=False,
     default="ddlgen",
     help="Select backend for inferring data types. Default: ddlgen",
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    required=False,
+    default=1,
+    help="Number of processes for inferring column types of wide tables in parallel. Default: 1",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=False,
+    help="Write one SQL DDL file per dialect into directory, instead of emitting to stdout",
+)
+@click.option(
+    "--format",
+    "format_",
+    type=click.Choice(["ddl", "json", "yaml"]),
+    required=False,
+    default="ddl",
+    help="Select output format. `json` and `yaml` report about column statistics and stage timings. Default: ddl",
+)
+@click.option(
+    "--nested",
+    type=click.Choice(NestedStrategy.values()),
+    required=False,
+    default=NestedStrategy.RELATIONAL.value,
+    help="Select how to map nested objects of JSON-like inputs: Unnest them into child tables, "
+    "flatten them into one column per path, or map them and arrays to native nested types. Default: relational",
+)
+@sampling_options
+@cache_options
+@profile_options
 @click.pass_context
 def infer_ddl(
     ctx: click.Context,
@@ -131,7 +311,21 @@ def infer_ddl(
     table_name: t.Optional[str] = None,
     primary_key: t.Optional[str] = None,
     backend: t.Optional[str] = "ddlgen",
+    workers: int = 1,
+    output_dir: t.Optional[Path] = None,
+    format_: str = "ddl",
+    nested: str = NestedStrategy.RELATIONAL.value,
+    sample_rows: int = PEEK_LINES,
+    sample_bytes: int = PEEK_BYTES_MAX,
+    sample_strategy: str = SamplingStrategy.HEAD.value,
+    full_scan: bool = False,
+    cache: bool = False,
+    refresh: bool = False,
+    profile: bool = False,
+    profile_report: t.Optional[Path] = None,
+    profile_dump: t.Optional[Path] = None,
 ):
+    dialects = split_list(dialect)  # type: ignore[arg-type]
     indata: t.Union[t.IO, Path, str, None] = input
     path: t.Optional[t.Union[Path, str]] = None
 
@@ -158,16 +352,160 @@ def infer_ddl(
             content_type=content_type,
         ),
         target=SqlTarget(
-            dialect=dialect,
+            dialect=dialects[0] if dialects else None,
             table_name=table_name,
             primary_key=primary_key,
+            nested=nested,
         ),
         backend=backend,
+        sampling=SamplingConfig(rows=sample_rows, bytes=sample_bytes, strategy=sample_strategy, full_scan=full_scan),
+        workers=workers,
+        cache=make_cache(cache, refresh),
     )
 
-    # Convert to SQL DDL.
-    result = sg.to_sql_ddl()
-    print(result.pretty)  # noqa: T201
+    # Infer schema, and emit SQL DDL or report, optionally profiling the inference pipeline.
+    with cprofile(profile_dump):
+        emit_infer_ddl(sg, dialects, format_=format_, output_dir=output_dir)
+    if profile:
+        click.echo(sg.profiler.to_table(), err=True)
+    if profile_report is not None:
+        logger.info(f"Writing profile report to {profile_report}")
+        profile_report.write_text(sg.profiler.to_json() + "\n")
 
     if indata is not None:
         indata.close()
+
+
+def emit_infer_ddl(
+    sg: SchemaGenerator, dialects: t.List[str], format_: str = "ddl", output_dir: t.Optional[Path] = None
+):
+    """
+    Emit SQL DDL statements or inference report to stdout, or write them into `output_dir`.
+    """
+    # Report about inferred schema in a structured format.
+    if format_ != "ddl":
+        report = sg.to_report(dialects)
+        content = report.to_json() if format_ == "json" else report.to_yaml()
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            outfile = output_dir / f"{sg.target.table_name}.{format_}"
+            logger.info(f"Writing inference report to {outfile}")
+            outfile.write_text(content.rstrip("\n") + "\n")
+        else:
+            print(content.rstrip("\n"))  # noqa: T201
+
+    # Convert to SQL DDL, for one or multiple dialects.
+    elif output_dir is not None:
+        results = sg.to_sql_ddl_dialects(dialects)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for dialect_name, result in results.items():
+            outfile = output_dir / f"{sg.target.table_name}.{dialect_name}.sql"
+            logger.info(f"Writing SQL DDL for dialect '{dialect_name}' to {outfile}")
+            with sg.profiler.span("pretty"):
+                content = result.pretty
+            outfile.write_text(content + "\n")
+    else:
+        results = sg.to_sql_ddl_dialects(dialects)
+        with sg.profiler.span("pretty"):
+            statements = {dialect_name: result.pretty for dialect_name, result in results.items()}
+        if len(statements) == 1:
+            print(next(iter(statements.values())))  # noqa: T201
+        else:
+            print(json.dumps(statements, indent=2))  # noqa: T201
+
+
+@cli.command(
+    "infer-ddl-batch",
+    help=docstring_format_verbatim(help_infer_ddl_batch.__doc__),
+    context_settings={"max_content_width": 120},
+)
+@click.argument("inputs", type=str, nargs=-1, required=False)
+@click.option("--manifest", type=str, required=False, help="Read more inputs from file, one per line")
+@click.option("--dialect", type=str, required=True, help="Select SQLAlchemy dialect for generating SQL")
+@click.option("--content-type", type=str, required=False, help="Specify content type for all inputs")
+@click.option(
+    "--backend",
+    type=click.Choice(["ddlgen", "frictionless", "fl", "parquet"]),
+    required=False,
+    default="ddlgen",
+    help="Select backend for inferring data types. Default: ddlgen",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=False,
+    help="Write one SQL DDL file per table into directory, instead of emitting a combined script to stdout",
+)
+@click.option("--workers", type=int, required=False, help="Number of inference processes. Default: Number of CPUs")
+@click.option("--io-workers", type=int, required=False, default=BATCH_IO_WORKERS, help="Number of I/O threads")
+@click.option(
+    "--nested",
+    type=click.Choice(NestedStrategy.values()),
+    required=False,
+    default=NestedStrategy.RELATIONAL.value,
+    help="Select how to map nested objects of JSON-like inputs: Unnest them into child tables, "
+    "flatten them into one column per path, or map them and arrays to native nested types. Default: relational",
+)
+@sampling_options
+@cache_options
+@click.pass_context
+def infer_ddl_batch(
+    ctx: click.Context,
+    inputs: t.Tuple[str, ...],
+    manifest: t.Optional[str] = None,
+    dialect: t.Optional[str] = None,
+    content_type: t.Optional[str] = None,
+    backend: t.Optional[str] = "ddlgen",
+    output_dir: t.Optional[Path] = None,
+    workers: t.Optional[int] = None,
+    io_workers: int = BATCH_IO_WORKERS,
+    nested: str = NestedStrategy.RELATIONAL.value,
+    sample_rows: int = PEEK_LINES,
+    sample_bytes: int = PEEK_BYTES_MAX,
+    sample_strategy: str = SamplingStrategy.HEAD.value,
+    full_scan: bool = False,
+    cache: bool = False,
+    refresh: bool = False,
+):
+    paths = expand_paths(inputs, manifest=manifest)
+    if not paths:
+        raise click.UsageError("No inputs given")
+
+    results = SchemaGenerator.batch(
+        paths,
+        dialect=dialect,  # type: ignore[arg-type]
+        backend=backend,
+        nested=nested,
+        content_type=content_type,
+        io_workers=io_workers,
+        workers=workers,
+        sampling=SamplingConfig(rows=sample_rows, bytes=sample_bytes, strategy=sample_strategy, full_scan=full_scan),
+        cache=make_cache(cache, refresh),
+    )
+
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    statements = []
+    table_names: t.Dict[t.Optional[str], str] = {}
+    for item in results:
+        if item.result is None:
+            logger.error(f"Failed to infer schema of {item.path}. Reason: {item.error}")
+            continue
+        if item.table_name in table_names:
+            item.error = f"Table name '{item.table_name}' already used by {table_names[item.table_name]}"
+            logger.error(f"Failed to write SQL DDL of {item.path}. Reason: {item.error}")
+            continue
+        table_names[item.table_name] = item.path
+        if output_dir is not None:
+            outfile = output_dir / f"{item.table_name}.sql"
+            logger.info(f"Writing SQL DDL of {item.path} to {outfile}")
+            outfile.write_text(item.result.pretty + "\n")
+        else:
+            statements.append(item.result.pretty)
+
+    if statements:
+        print("\n\n".join(statements))  # noqa: T201
+
+    if not all(item.ok for item in results):
+        sys.exit(1)
@@ -1,17 +1,46 @@
+import contextlib
+import dataclasses
+import functools
+import io
 import logging
+import multiprocessing
 import typing as t
 import warnings
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import pandas as pd
-
-from skeem.autopk import infer_pk
+import skeem.io
+from skeem.cache import InferenceCache, cache_key, fingerprint
 from skeem.exception import UnknownContentType
-from skeem.model import Resource, SqlResult, SqlTarget
-from skeem.settings import FRICTIONLESS_CONTENT_TYPES
-from skeem.types import ContentType
+from skeem.model import (
+    BatchItem,
+    BatchResult,
+    ColumnReport,
+    InferenceReport,
+    InferredSchema,
+    Resource,
+    SamplingConfig,
+    SqlResult,
+    SqlTarget,
+    StageSpan,
+)
+from skeem.profiling import Profiler
+from skeem.settings import (
+    BATCH_IO_WORKERS,
+    FORKSERVER_PRELOAD,
+    FRICTIONLESS_CONTENT_TYPES,
+    PARQUET_CONTENT_TYPES,
+    REPORT_SAMPLE_VALUES,
+)
+from skeem.types import Compression, ContentType, ContentTypeGroup, NestedStrategy, SamplingStrategy
 from skeem.util.data import to_bytes
 
+if t.TYPE_CHECKING:
+    import pandas as pd
+    import sqlalchemy as sa
+
+    from skeem.ddlgen.typehelpers import ColumnStatistics
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,10 +54,27 @@ class SchemaGenerator:
         resource: Resource,
         target: SqlTarget,
         backend: t.Optional[str] = "ddlgen",
+        sampling: t.Optional[SamplingConfig] = None,
+        workers: t.Optional[int] = 1,
+        cache: t.Optional[InferenceCache] = None,
     ):
+        """
+        With the `ddlgen` backend, column types of wide tables can be inferred in parallel,
+        using a process pool of `workers`. `None` means the number of CPU cores.
+
+        When a `cache` is given, results of unchanged resources are served from the cache.
+
+        Measurements of each stage of the inference pipeline are recorded by `profiler`.
+        """
         self.resource = resource
         self.target = target
         self.backend = backend
+        self.workers = workers
+        self.cache = cache
+        self.fingerprint: t.Optional[str] = None
+        self.profiler = Profiler()
+        if sampling is not None:
+            self.resource.sampling = sampling
         self.configure()
 
     def configure(self):
@@ -45,17 +91,220 @@ class SchemaGenerator:
 
         # Derive table name from input file name or data.
         if not self.target.table_name and self.resource.path:
-            self.target.table_name = Path(self.resource.path).stem
+            self.target.table_name = _table_name(self.resource.path)
+
+    @classmethod
+    def batch(
+        cls,
+        paths: t.Iterable[t.Union[Path, str]],
+        dialect: str,
+        backend: t.Optional[str] = "ddlgen",
+        nested: t.Union[NestedStrategy, str] = NestedStrategy.RELATIONAL,
+        content_type: t.Optional[str] = None,
+        io_workers: int = BATCH_IO_WORKERS,
+        workers: t.Optional[int] = None,
+        sampling: t.Optional[SamplingConfig] = None,
+        cache: t.Optional[InferenceCache] = None,
+    ) -> t.List[BatchResult]:
+        """
+        Infer SQL DDL statements for many resources concurrently, within a single process.
+
+        The resources are peeked at concurrently using a thread pool of `io_workers`, while
+        inference is running in a process pool of `workers`, which defaults to the number
+        of CPU cores. Use `workers=0` to run inference within the calling process.
+
+        Errors are reported per item, and do not stop the batch operation. When a `cache`
+        is given, results of unchanged resources are served from the cache, without reading them.
+        """
+        sampling = sampling or SamplingConfig()
+        target = SqlTarget(dialect=dialect, nested=nested)
+        items = [BatchItem(path=str(path), table_name=_table_name(path), content_type=content_type) for path in paths]
+        logger.info(f"Processing batch of {len(items)} resources")
+
+        pool: Executor
+        if workers == 0:
+            pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+
+        results: t.List[t.Optional[BatchResult]] = [None] * len(items)
+        with ThreadPoolExecutor(max_workers=io_workers) as io_pool, pool:
+            prefetch_futures = {
+                io_pool.submit(_batch_prefetch, item, target, backend, sampling, cache): index
+                for index, item in enumerate(items)
+            }
+            infer_futures: t.Dict[Future, int] = {}
+            for future in as_completed(prefetch_futures):
+                index = prefetch_futures[future]
+                item = items[index]
+                try:
+                    item = future.result()
+                except Exception as ex:
+                    logger.info(f"WARNING: Failed to read {item.path}. Reason: {ex}")
+                    results[index] = BatchResult(path=item.path, table_name=item.table_name, error=_error(ex))
+                    continue
+                if item.result is not None:
+                    results[index] = BatchResult(path=item.path, table_name=item.table_name, result=item.result)
+                    continue
+                try:
+                    infer_futures[pool.submit(_batch_infer, item, target, backend, sampling)] = index
+                except Exception as ex:
+                    logger.info(f"WARNING: Failed to infer schema of {item.path}. Reason: {ex}")
+                    results[index] = BatchResult(path=item.path, table_name=item.table_name, error=_error(ex))
+            for infer_future, index in infer_futures.items():
+                item = items[index]
+                # Worker crashes, or data which can not be pickled, must not abort the whole batch.
+                try:
+                    result = results[index] = infer_future.result()
+                except Exception as ex:
+                    logger.info(f"WARNING: Failed to infer schema of {item.path}. Reason: {ex}")
+                    results[index] = BatchResult(path=item.path, table_name=item.table_name, error=_error(ex))
+                    continue
+                if cache is not None and item.cache_key is not None and result.result is not None:
+                    cache.put(item.cache_key, result.result)
+
+        return t.cast(t.List[BatchResult], results)
 
     def to_sql_ddl(self) -> SqlResult:
         """
         Infer field/column schema from input data and generate SQL DDL statement.
         """
+        dialect = t.cast(str, self.target.dialect)
+        return self.to_sql_ddl_dialects([dialect])[dialect]
+
+    def to_sql_ddl_dialects(self, dialects: t.List[str]) -> t.Dict[str, SqlResult]:
+        """
+        Infer field/column schema from input data once, and generate SQL DDL statements for multiple dialects.
+        """
+        results: t.Dict[str, SqlResult] = {}
+        keys = {dialect: self._cache_key(dialect=dialect) for dialect in dialects}
+        for dialect, key in keys.items():
+            if key is not None:
+                result = self.cache.get(key)  # type: ignore[union-attr]
+                if result is not None:
+                    results[dialect] = result
+
+        missing = [dialect for dialect in dialects if dialect not in results]
+        if missing:
+            inferred = self.infer()
+            try:
+                for dialect in missing:
+                    with self._stage("serialize") as span:
+                        results[dialect] = self._to_sql_ddl(inferred, dialect)
+                        span.add(bytes=len(results[dialect].sql))
+                    key = keys[dialect]
+                    if key is not None:
+                        self.cache.put(key, results[dialect])  # type: ignore[union-attr]
+            finally:
+                inferred.dispose()
+
+        return {dialect: results[dialect] for dialect in dialects}
+
+    def to_report(self, dialects: t.Optional[t.List[str]] = None) -> InferenceReport:
+        """
+        Infer field/column schema from input data, and report about it in a structured format.
 
+        The report includes the SQL type of each column per dialect, column statistics like
+        nullability, maximum length, uniqueness, and sample values, the primary key, the size
+        of the sample, SQL DDL statements per dialect, and how long each stage took.
+        """
+        dialects = dialects or [t.cast(str, self.target.dialect)]
+        inferred = self.infer()
+        try:
+            ddl = {}
+            for dialect in dialects:
+                with self._stage("serialize") as span:
+                    ddl[dialect] = self._to_sql_ddl(inferred, dialect).pretty
+                    span.add(bytes=len(ddl[dialect]))
+            columns = self._report_columns(inferred, dialects)
+        finally:
+            inferred.dispose()
+        return InferenceReport(
+            table_name=self.target.table_name,
+            primary_key=self.target.primary_key,
+            backend=self.backend,
+            content_type=self.resource.type.name if self.resource.type is not None else None,
+            sample_rows=inferred.sample_rows,
+            sample_bytes=inferred.sample_bytes,
+            columns=columns,
+            ddl=ddl,
+            timings=self.timings,
+        )
+
+    def _report_columns(self, inferred: InferredSchema, dialects: t.List[str]) -> t.List[ColumnReport]:
+        """
+        Report the SQL type of each column per dialect, and the statistics of its values.
+
+        With the `ddlgen` backend, nullability and uniqueness are reported as they have been
+        inferred, either from the sample, or from all records when scanning the whole resource.
+        Otherwise, they are derived from the SQL table, and from the sample, respectively.
+        """
+        import sqlalchemy as sa
+
+        from skeem.cardinality import CardinalityEstimator
+        from skeem.ddlgen.reshape import clean_key_name
+
+        tables = {dialect: self._to_sa_table(inferred, dialect) for dialect in dialects}
+        sa_dialects = {dialect: sa.dialects.registry.load(dialect)() for dialect in dialects}
+        columns_inferred = inferred.table.columns if inferred.table is not None else {}
+        statistics = {
+            clean_key_name(name): stats for name, stats in (getattr(inferred.table, "statistics", None) or {}).items()
+        }
+        sample = inferred.sample
+
+        reports = []
+        for column in tables[dialects[0]].columns:
+            report = ColumnReport(
+                name=column.name,
+                type={
+                    dialect: str(tables[dialect].columns[column.name].type.compile(dialect=sa_dialects[dialect]))
+                    for dialect in dialects
+                },
+                nullable=bool(column.nullable),
+            )
+            if sample is not None and column.name in sample:
+                series = sample[column.name]
+                values = series[~series.isna()]
+                cardinality = CardinalityEstimator()
+                cardinality.update(values)
+                report.max_length = int(values.astype(str).str.len().max()) if len(values) else 0
+                report.unique = bool(series.isna().sum() <= 1 and cardinality.is_unique)
+                report.cardinality = cardinality.cardinality
+                report.sample_values = list(values[values != ""].drop_duplicates().head(REPORT_SAMPLE_VALUES))
+            if column.name in columns_inferred:
+                report.max_length = columns_inferred[column.name]["str_length"]
+                report.unique = columns_inferred[column.name]["is_unique"]
+            if column.name in statistics:
+                report.cardinality = statistics[column.name].cardinality.cardinality
+            reports.append(report)
+        return reports
+
+    def _cache_key(self, kind: str = "sql", dialect: t.Optional[str] = None) -> t.Optional[str]:
+        """
+        Compute cache key for the resource and the inference settings, when caching is enabled and possible.
+        """
+        if self.cache is None:
+            return None
+        if self.fingerprint is None:
+            try:
+                self.fingerprint = fingerprint(self.resource)
+            except Exception as ex:
+                logger.info(f"WARNING: Unable to compute resource fingerprint, not using cache. Reason: {ex}")
+            if self.fingerprint is None:
+                self.cache = None
+                return None
+        target = dataclasses.replace(self.target, dialect=dialect) if dialect is not None else self.target
+        return cache_key(self.fingerprint, self.resource, target, self.backend, kind=kind)
+
+    def infer(self) -> InferredSchema:
+        """
+        Infer field/column schema from input data, independently of the SQL dialect.
+        """
         logger.info(f"Selected backend: {self.backend}")
         fallback = False
         try:
-            self.resource.detect_type()
+            with self._stage("detect"):
+                self.resource.detect_type()
         except UnknownContentType:
             logger.info("WARNING: Unable to detect content type")
             fallback = True
@@ -65,41 +314,85 @@ class SchemaGenerator:
         )
         if choose_frictionless:
             self.backend = "frictionless"
+        elif self.resource.type in PARQUET_CONTENT_TYPES:
+            self.backend = "parquet"
         logger.info(f"Effective backend: {self.backend}")
 
         if self.backend == "ddlgen":
-            return self._ddl_ddlgen()
+            return self._infer_ddlgen()
         elif self.backend == "frictionless":
-            return self._ddl_frictionless()
+            return self._infer_frictionless()
+        elif self.backend == "parquet":
+            return self._infer_parquet()
         else:
             raise NotImplementedError(f"Backend '{self.backend}' not implemented")
 
-    def _ddl_frictionless(self) -> SqlResult:
+    def _to_sql_ddl(self, inferred: InferredSchema, dialect: str) -> SqlResult:
+        """
+        Serialize inferred schema to SQL DDL statement for the given dialect.
+        """
+        if inferred.table is not None:
+            logger.info(f"Serialize SQLAlchemy schema to SQL DDL statement for dialect: {dialect}")
+            return SqlResult(inferred.table.sql(dialect=dialect, creates=True, drops=False, inserts=False))
+        return self._frictionless_schema_to_ddl(inferred.schema, dialect)
+
+    def _to_sa_table(self, inferred: InferredSchema, dialect: str) -> "sa.Table":
+        """
+        Provide SQLAlchemy table of inferred schema for the given dialect.
+        """
+        if inferred.table is not None:
+            return inferred.table.table
+        return self._frictionless_schema_to_sa_table(inferred.schema, dialect)
+
+    @property
+    def timings(self) -> t.Dict[str, float]:
+        """
+        The wall clock time per stage of the inference pipeline, in seconds.
+        """
+        return self.profiler.timings
+
+    def _stage(self, name: str) -> t.ContextManager[StageSpan]:
+        """
+        Measure a stage of the inference pipeline.
+        """
+        return self.profiler.span(name)
+
+    def _infer_frictionless(self) -> InferredSchema:
         # Suppress warnings of BeautifulSoup
         from bs4 import GuessedAtParserWarning
 
         warnings.filterwarnings("ignore", category=GuessedAtParserWarning)
 
-        from frictionless import Control, Schema
-        from frictionless.formats import ExcelControl, OdsControl, SqlMapper
+        from frictionless import Control, Detector
+        from frictionless.formats import ExcelControl, JsonControl, OdsControl
+        from frictionless.resources import TableResource
 
-        from skeem.ddlgen.ddlgenerator import TablePlus
+        from skeem.autopk import infer_pk
+        from skeem.fastparquet.core import READ_COL_LIMIT
         from skeem.frictionless.resource import TableSampleResource
 
-        # Sanity checks.
-        if not self.target.dialect:
-            raise ValueError("Inferring the database schema needs an SQLAlchemy dialect")
-
         frictionless_args: t.Dict[str, t.Union[str, t.IO]] = {}
-        if self.resource.path is not None:
+        # When the content type has been detected from data, it has been opened already.
+        # Compressed resources are decompressed while reading them.
+        if self.resource.path is not None and self.resource.data is None and self.resource.compression is None:
             frictionless_args["path"] = str(self.resource.path)
-        elif self.resource.data is not None:
+        elif self.resource.data is not None or self.resource.path is not None:
             # Sanity checks.
             if self.resource.type is None:
                 raise ValueError("Unable to infer schema without resource type")
             frictionless_args["format"] = self.resource.type.suffix.lstrip(".")
 
-            payload = self.resource.data.read()
+            stream = self.resource.data or self.resource.open()
+            if self.resource.compression is not None and self.resource.type in ContentTypeGroup.LINE_BASED:
+                # Decompress only the sample, instead of the whole resource.
+                payload = skeem.io.read_lines_prefix(stream, self.resource.sampling.bytes)
+            else:
+                if self.resource.compression is not None:
+                    logger.info(
+                        f"WARNING: Hitting a speed bump by needing to decompress resource as a whole: "
+                        f"{self.resource.path or self.resource.type}"
+                    )
+                payload = stream.read()
             data = to_bytes(payload)
             frictionless_args["data"] = data
         else:
@@ -111,34 +404,122 @@ class SchemaGenerator:
             control = OdsControl(sheet=self.resource.address or 1)
         elif self.resource.type is ContentType.XLSX:
             control = ExcelControl(sheet=self.resource.address or 1)
+        elif self.resource.type is ContentType.JSON and self.resource.address:
+            control = JsonControl(property=_frictionless_json_property(self.resource.address))
 
-        # Open resource.
+        # Open resource, and read the sample once. The schema is inferred from the sample while
+        # opening the resource, and the primary key will be inferred from the same sample rows.
         logger.info(f"Opening resource {frictionless_args}. type={self.resource.type}, control={control}")
-        resource = TableSampleResource(**frictionless_args, control=control)  # type: ignore[arg-type]
+        detector = Detector(sample_size=self.resource.sampling.rows)
+        resource = TableSampleResource(**frictionless_args, control=control, detector=detector)  # type: ignore[arg-type]
+        # When Parquet columns are decoded by fastparquet, its patched `read_col` decodes at most that many values.
+        token = READ_COL_LIMIT.set(self.resource.sampling.rows)
+        try:
+            with self._stage("infer_types") as span, resource:
+                logger.info("Inferring schema")
+                schema = resource.schema
+                rows = resource.read_rows(size=self.resource.sampling.rows)
+                sample_bytes = resource.stats.bytes
+                span.add(bytes=sample_bytes, rows=len(rows))
+        finally:
+            READ_COL_LIMIT.reset(token)
+
+        logger.info("Converging sample to pandas DataFrame")
+        with self._stage("deserialize") as span:
+            sample = TableResource(data=[schema.field_names] + [row.to_list() for row in rows], schema=schema)
+            df: pd.DataFrame = sample.to_pandas()
+            span.add(rows=len(df))
+        logger.info(f"pandas DataFrame size={len(df)}")
 
         # When primary key is not given, try to infer it from the data.
         # TODO: Make `infer_pk` obtain a `Resource` instance, and/or refactor as method.
-        # TODO: Optimize runtime by not needing to open the resource twice.
         if self.target.primary_key is None:
-            logger.info("Converging resource to pandas DataFrame")
-            df: pd.DataFrame = resource.to_pandas()
-            logger.info(f"pandas DataFrame size={len(df)}")
+            logger.info("Inferring primary key")
+            with self._stage("infer_pk"):
+                self.target.primary_key = infer_pk(
+                    df, self.resource.type, address=self.resource.address, peek_lines=self.resource.sampling.rows
+                )
+
+        logger.debug(f"Inferred schema: {schema}")
 
+        return InferredSchema(schema=schema, sample=df, sample_rows=len(df), sample_bytes=sample_bytes)
+
+    def _infer_parquet(self) -> InferredSchema:
+        """
+        Infer schema from the footer of a Parquet file, without reading any data pages.
+
+        For remote resources, this only needs a single ranged request for the last few
+        kilobytes of the file. Only columns whose type can not be derived from metadata
+        alone will need a tiny sample of data.
+        """
+        # Suppress warnings of BeautifulSoup
+        from bs4 import GuessedAtParserWarning
+
+        warnings.filterwarnings("ignore", category=GuessedAtParserWarning)
+
+        from skeem.fastparquet.schema import ParquetSchema, read_footer
+
+        reader: t.Callable[[int], bytes]
+        source: t.Union[t.IO, Path, str]
+        if self.resource.path is not None and self.resource.compression is None:
+            source = self.resource.path
+            reader = functools.partial(skeem.io.read_tail, source, size=skeem.io.fsspec_size(source))
+        elif self.resource.path is not None:
+            # Compressed files can not be read from their end, so decompress them as a whole.
+            logger.info(
+                f"WARNING: Hitting a speed bump by needing to decompress Parquet file as a whole: {self.resource.path}"
+            )
+            with skeem.io.open(self.resource.path, compression=self.resource.compression) as f:
+                source = io.BytesIO(f.read())
+            reader = functools.partial(skeem.io.stream_read_tail, source)
+        elif self.resource.data is not None:
+            source = self.resource.data
+            if not (hasattr(source, "seekable") and source.seekable()):
+                source = to_bytes(source.read())
+            reader = functools.partial(skeem.io.stream_read_tail, source)
+        else:
+            raise ValueError("Unable to read any data")
+
+        logger.info(f"Reading Parquet footer of {self.resource}")
+        with self._stage("peek"):
+            parquet_schema = ParquetSchema(read_footer(reader), source=source, peek_lines=self.resource.sampling.rows)
+
+        # When primary key is not given, try to infer it from column names and statistics.
+        if self.target.primary_key is None:
             logger.info("Inferring primary key")
-            self.target.primary_key = infer_pk(df, self.resource.type, address=self.resource.address)
+            with self._stage("infer_pk"):
+                self.target.primary_key = parquet_schema.infer_pk()
 
         # Infer schema.
         logger.info("Inferring schema")
-        mapper = SqlMapper(dialect=self.target.dialect)
-        descriptor = resource.to_descriptor()
+        with self._stage("infer_types"):
+            schema = parquet_schema.to_frictionless()
+        logger.debug(f"Inferred schema: {schema}")
 
-        # Either `schema` is already present, or it needs to be established by invoking `describe` first.
-        if "schema" in descriptor:
-            schema = Schema.from_descriptor(descriptor["schema"])
-        else:
-            schema = Schema.describe(**frictionless_args, control=control)
+        return InferredSchema(schema=schema)
 
-        logger.debug(f"Inferred schema: {schema}")
+    def _frictionless_schema_to_ddl(self, schema, dialect: str) -> SqlResult:
+        """
+        Serialize frictionless `Schema` instance to SQL DDL statement.
+        """
+        from skeem.ddlgen.ddlgenerator import TablePlus
+
+        table = self._frictionless_schema_to_sa_table(schema, dialect)
+
+        # Serialize SQLAlchemy table instance to SQL DDL, using `ddlgenerator`.
+        logger.info("Serialize SQLAlchemy schema to SQL DDL statement")
+        tt = TablePlus(data="")
+        tt.table = table
+        sql = tt.ddl(dialect=dialect, creates=True, drops=False)
+        return SqlResult(sql)
+
+    def _frictionless_schema_to_sa_table(self, schema, dialect: str) -> "sa.Table":
+        """
+        Converge frictionless `Schema` instance to SQLAlchemy table.
+        """
+        from frictionless.formats import SqlMapper
+
+        mapper = SqlMapper(dialect=dialect)
 
         # Amend schema with primary key information.
         if self.target.primary_key is not None:
@@ -152,16 +533,10 @@ class SchemaGenerator:
 
         # Create SQLAlchemy table from schema.
         logger.info("Converging schema to SQLAlchemy")
-        table = mapper.write_schema(schema, table_name=self.target.table_name, with_metadata=False)
+        return mapper.write_schema(schema, table_name=self.target.table_name, with_metadata=False)
 
-        # Serialize SQLAlchemy table instance to SQL DDL, using `ddlgenerator`.
-        logger.info("Serialize SQLAlchemy schema to SQL DDL statement")
-        tt = TablePlus(data="")
-        tt.table = table
-        sql = tt.ddl(dialect=self.target.dialect, creates=True, drops=False)
-        return SqlResult(sql)
-
-    def _ddl_ddlgen(self) -> SqlResult:
+    def _infer_ddlgen(self) -> InferredSchema:
+        from skeem.autopk import infer_pk, infer_pk_from_statistics
         from skeem.ddlgen.ddlgenerator import TablePlus
         from skeem.ddlgen.sources import SourcePlus
 
@@ -174,31 +549,245 @@ class SchemaGenerator:
 
         # Only peek at the first bytes of data.
         logger.info(f"Opening resource {self.resource}")
-        indata = self.resource.peek()
+        with self._stage("peek") as span:
+            indata = self.resource.peek()
+            sample_bytes = len(indata.getbuffer()) if isinstance(indata, io.BytesIO) else None
+            span.add(bytes=sample_bytes)
+
+        # Scan the whole resource, in order to infer column types from all records.
+        statistics = None
+        if self.resource.sampling.full_scan:
+            with self._stage("scan") as span:
+                statistics = self._ddlgen_statistics()
+                if statistics is not None:
+                    span.add(rows=_scanned_rows(statistics))
 
         # When primary key is not given, try to infer it from the data.
         # TODO: Make `infer_pk` obtain a `Resource` instance, and/or refactor as method.
         if self.target.primary_key is None:
-            self.target.primary_key = infer_pk(indata, self.resource.type, address=self.resource.address)
+            with self._stage("infer_pk"):
+                if statistics is not None:
+                    self.target.primary_key = infer_pk_from_statistics(statistics, self.resource.type)
+                else:
+                    self.target.primary_key = infer_pk(
+                        indata,
+                        self.resource.type,
+                        address=self.resource.address,
+                        peek_lines=self.resource.sampling.rows,
+                        peek_bytes=self.resource.sampling.bytes,
+                    )
 
         # Wrap data into data-dispenser's `Source` instance.
         logger.info("Converging resource to ddlgen source object")
-        data = SourcePlus(indata, ext=self.resource.type.suffix, table=self.resource.address)
+        with self._stage("deserialize"):
+            data = SourcePlus(
+                indata,
+                ext=self.resource.type.suffix,
+                table=self.resource.address,
+                peek_lines=self.resource.sampling.rows,
+                peek_bytes=self.resource.sampling.bytes,
+            )
 
         # Infer schema from data.
         logger.info("Inferring schema")
-        table = TablePlus(
-            data=data,
-            table_name=self.target.table_name,
-            varying_length_text=True,
-            uniques=False,
-            pk_name=self.target.primary_key,
-            force_pk=False,
-            reorder=False,
-            loglevel=logging.DEBUG,
-            limit=None,
+        with self._stage("infer_types") as span, self._executor() as executor:
+            table = TablePlus(
+                data=data,
+                statistics=statistics,
+                executor=executor,
+                nested=t.cast(NestedStrategy, self.target.nested),
+                table_name=self.target.table_name,
+                varying_length_text=True,
+                uniques=False,
+                pk_name=self.target.primary_key,
+                force_pk=False,
+                reorder=False,
+                loglevel=logging.DEBUG,
+                limit=None,
+            )
+            span.add(rows=_len(table.sample))
+
+        return InferredSchema(
+            table=table,
+            sample=table.sample,
+            sample_rows=_scanned_rows(statistics) if statistics is not None else _len(table.sample),
+            sample_bytes=sample_bytes,
         )
 
-        # Convert schema to SQL DDL statement.
-        sql = table.sql(dialect=self.target.dialect, creates=True, drops=False, inserts=False)
-        return SqlResult(sql)
+    def _executor(self) -> t.ContextManager[t.Optional[Executor]]:
+        """
+        Provide a process pool for inferring column types in parallel, when using multiple workers.
+        """
+        if self.workers is not None and self.workers <= 1:
+            return contextlib.nullcontext()
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+
+    def _ddlgen_statistics(self) -> t.Optional[t.Dict[str, "ColumnStatistics"]]:
+        """
+        Serve column statistics of the full scan from the cache, so that inferring
+        the SQL DDL for another dialect or table name does not need to scan again.
+        """
+        key = self._cache_key(kind="statistics")
+        if key is not None:
+            statistics = self.cache.get(key)  # type: ignore[union-attr]
+            if statistics is not None:
+                return statistics
+        statistics = self._ddlgen_scan()
+        if key is not None and statistics is not None:
+            self.cache.put(key, statistics)  # type: ignore[union-attr]
+        return statistics
+
+    def _ddlgen_scan(self) -> t.Optional[t.Dict[str, "ColumnStatistics"]]:
+        """
+        Read the whole resource in chunks, when its format supports it, and fold column statistics.
+        Otherwise, fall back to inferring the column types from the sample.
+        """
+        from skeem.ddlgen.sources import scan_funcs_by_ext, scan_statistics
+
+        suffix = self.resource.type.suffix  # type: ignore[union-attr]
+        if suffix not in scan_funcs_by_ext:
+            logger.info(f"WARNING: Full scan not supported for {self.resource.type}, using sample")
+            return None
+        try:
+            data = self.resource.open()
+        except ValueError as ex:
+            logger.info(f"WARNING: Full scan not possible, using sample. Reason: {ex}")
+            return None
+        logger.info(f"Scanning resource {self.resource}")
+        statistics = scan_statistics(data, ext=suffix, nested=t.cast(NestedStrategy, self.target.nested))
+        logger.info(f"Scanned {_scanned_rows(statistics)} records")
+        return statistics
+
+
+def _scanned_rows(statistics: t.Dict[str, "ColumnStatistics"]) -> int:
+    """
+    Compute the number of records of a full scan from its column statistics.
+    """
+    return max((stats.rows for stats in statistics.values()), default=0)
+
+
+def _len(sample: t.Optional["pd.DataFrame"]) -> t.Optional[int]:
+    return len(sample) if sample is not None else None
+
+
+def _batch_prefetch(
+    item: BatchItem,
+    target: SqlTarget,
+    backend: t.Optional[str] = "ddlgen",
+    sampling: t.Optional[SamplingConfig] = None,
+    cache: t.Optional[InferenceCache] = None,
+) -> BatchItem:
+    """
+    Peek at the first lines of a resource, when it will be processed by the `ddlgen` backend,
+    and its types will be inferred from the sample.
+
+    This is the I/O-bound part of batch processing, running within a thread pool.
+    Other resources are passed through, and will be read by the inference workers.
+    Resources whose result is found in the cache are not read at all.
+    """
+    resource = Resource(path=item.path, content_type=item.content_type, sampling=sampling or SamplingConfig())
+    if cache is not None:
+        sg = SchemaGenerator(
+            resource=resource,
+            target=dataclasses.replace(target, table_name=item.table_name),
+            backend=backend,
+            cache=cache,
+        )
+        item.cache_key = sg._cache_key()
+        if item.cache_key is not None:
+            item.result = cache.get(item.cache_key)
+            if item.result is not None:
+                return item
+    try:
+        resource.detect_type()
+    except UnknownContentType:
+        return item
+    item.content_type = item.content_type or resource.type.name  # type: ignore[union-attr]
+
+    if (
+        backend == "ddlgen"
+        and resource.type not in FRICTIONLESS_CONTENT_TYPES
+        and resource.type not in PARQUET_CONTENT_TYPES
+        and resource.is_range_readable()
+        and not resource.sampling.full_scan
+    ):
+        logger.info(f"Peeking at {item.path}")
+        item.data = resource.peek().read()
+    return item
+
+
+def _batch_infer(
+    item: BatchItem, target: SqlTarget, backend: t.Optional[str] = "ddlgen", sampling: t.Optional[SamplingConfig] = None
+) -> BatchResult:
+    """
+    Infer SQL DDL statement for a single item of a batch operation.
+
+    This is the CPU-bound part of batch processing, running within a process pool.
+    """
+    sampling = sampling or SamplingConfig()
+    try:
+        if item.data is not None:
+            # The prefetched data is the sample already.
+            sampling = dataclasses.replace(sampling, strategy=SamplingStrategy.HEAD)
+            resource = Resource(
+                data=item.data,  # type: ignore[arg-type]
+                content_type=item.content_type,
+                sampling=sampling,
+            )
+        else:
+            resource = Resource(path=item.path, content_type=item.content_type, sampling=sampling)
+        sg = SchemaGenerator(
+            resource=resource,
+            target=dataclasses.replace(target, table_name=item.table_name),
+            backend=backend,
+        )
+        result = sg.to_sql_ddl()
+    except Exception as ex:
+        logger.info(f"WARNING: Failed to infer schema of {item.path}. Reason: {ex}")
+        return BatchResult(path=item.path, table_name=item.table_name, error=_error(ex))
+    return BatchResult(path=item.path, table_name=sg.target.table_name, result=result)
+
+
+def _mp_context():
+    """
+    Select the process start method for inference workers, used by batch mode,
+    and for inferring column types in parallel.
+
+    Forking the main process is not safe while the I/O threads are running. The
+    "forkserver" method forks workers from a clean server process instead, which
+    imports the heavy machinery only once. It is not available on Windows.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(FORKSERVER_PRELOAD)
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _table_name(path: t.Union[Path, str]) -> str:
+    """
+    Derive table name from file name, also stripping the extension of compressed files like `data.ndjson.zst`.
+    """
+    name = Path(path).name
+    if Compression.from_filename(name) is not None:
+        name = Compression.strip_suffix(name)
+        try:
+            ContentType.from_filename(name)
+        except UnknownContentType:
+            return name
+    return Path(name).stem
+
+
+def _frictionless_json_property(address: str) -> str:
+    """
+    Translate a path selecting the records of a nested JSON document into the property
+    of frictionless' `JsonControl`, which only supports object keys.
+    """
+    segments = skeem.io.json_path_segments(address)
+    if not all(isinstance(segment, str) for segment in segments):
+        raise ValueError(f"Backend 'frictionless' does not support array indexes in JSON paths: {address}")
+    return ".".join(t.cast(t.List[str], segments))
+
+
+def _error(ex: Exception) -> str:
+    return f"{ex.__class__.__name__}: {ex}"
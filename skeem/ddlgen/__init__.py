@@ -0,0 +1,3 @@
+from skeem.ddlgen import monkey
+
+monkey.activate()
@@ -1,17 +1,26 @@
-import datetime as dt
 import logging
 import pprint
+import typing as t
 from collections import OrderedDict
-from decimal import Decimal
+from concurrent.futures import Executor
 
+import pandas as pd
 import sqlalchemy as sa
 from ddlgenerator.ddlgenerator import Table, _dump
+from sqlalchemy.ext.compiler import compiles
 
-try:
-    import ddlgenerator.typehelpers as th
-except ImportError:  # pragma: no cover
-    import typehelpers as th  # TODO: can py2/3 split this
-
+from skeem.ddlgen.reshape import clean_key_name, flatten_record, unwrap_nested, wrap_nested
+from skeem.ddlgen.typehelpers import (
+    ColumnStatistics,
+    fold_records,
+    infer_column,
+    infer_columns,
+    is_nested_column,
+    nested_example,
+)
+from skeem.io import records_to_columns
+from skeem.settings import PARALLEL_COLUMNS_PER_TASK
+from skeem.types import NestedStrategy
 
 logger = logging.getLogger(__name__)
 
@@ -42,13 +51,132 @@ class AnyDialect(dict):
         return sa.create_mock_engine(f"{item}://", executor=_dump)
 
 
+class NestedObject(sa.types.UserDefinedType):
+    """
+    Column type for nested objects, with the types of their keys as `columns`.
+
+    On CrateDB, it is `OBJECT(DYNAMIC)`, including the typed subcolumns, on PostgreSQL,
+    it is `JSONB`, and on other dialects, it is SQLAlchemy's generic `JSON` type.
+    """
+
+    cache_ok = True
+
+    def __init__(self, columns: t.Optional[t.Union[t.Mapping[str, t.Any], t.Iterable[t.Tuple[str, t.Any]]]] = None):
+        self.columns = tuple(dict(columns or {}).items())
+
+    def get_col_spec(self, **kw):
+        return "JSON"
+
+
+class NestedArray(sa.types.UserDefinedType):
+    """
+    Column type for arrays, with the type of their elements as `item_type`.
+
+    On CrateDB, it is `ARRAY(...)`, on PostgreSQL, it is an array of scalar values,
+    or `JSONB` when the elements are nested, and on other dialects, it is SQLAlchemy's
+    generic `JSON` type.
+    """
+
+    cache_ok = True
+
+    def __init__(self, item_type: t.Any):
+        self.item_type = sa.types.to_instance(item_type)
+
+    def get_col_spec(self, **kw):
+        return "JSON"
+
+
+@compiles(NestedObject)
+@compiles(NestedArray)
+def compile_nested(type_, compiler, **kw):
+    return compiler.process(sa.JSON(), **kw)
+
+
+@compiles(NestedObject, "crate")
+def compile_nested_object_crate(type_, compiler, **kw):
+    if not type_.columns:
+        return "OBJECT(DYNAMIC)"
+    quote = compiler.dialect.identifier_preparer.quote_identifier
+    columns = ", ".join(
+        f"{quote(name)} {compiler.process(sa.types.to_instance(satype), **kw)}" for name, satype in type_.columns
+    )
+    return f"OBJECT(DYNAMIC) AS ({columns})"
+
+
+@compiles(NestedArray, "crate")
+def compile_nested_array_crate(type_, compiler, **kw):
+    return f"ARRAY({compiler.process(type_.item_type, **kw)})"
+
+
+@compiles(NestedObject, "postgresql")
+def compile_nested_object_postgresql(type_, compiler, **kw):
+    return "JSONB"
+
+
+@compiles(NestedArray, "postgresql")
+def compile_nested_array_postgresql(type_, compiler, **kw):
+    if isinstance(type_.item_type, (NestedObject, NestedArray)):
+        return "JSONB"
+    return f"{compiler.process(type_.item_type, **kw)}[]"
+
+
 class TablePlus(Table):
     """
     Overwrite specific methods with a few patches.
+
+    When `statistics` of all records of the resource are given, see `fold_statistics`,
+    column types are inferred from them, instead of from the sample `data`.
+
+    When an `executor` is given, column types are inferred in parallel, in slices of
+    `PARALLEL_COLUMNS_PER_TASK` columns.
+
+    With the `flatten` strategy for `nested` objects, they are flattened into one column
+    per path, before `ddlgenerator` would unnest them. The statistics of a full scan are
+    folded from flattened records as well, see `scan_statistics`. With the `object`
+    strategy, nested objects and arrays are mapped to native types, see `NestedObject`
+    and `NestedArray`, which are inferred from the statistics of each path.
+
+    The sample is retained as `sample`, in order to report about column statistics.
     """
 
+    def __init__(
+        self,
+        *args,
+        statistics: t.Optional[t.Dict[str, ColumnStatistics]] = None,
+        executor: t.Optional[Executor] = None,
+        nested: NestedStrategy = NestedStrategy.RELATIONAL,
+        **kwargs,
+    ):
+        self.statistics = statistics
+        self.executor = executor
+        self.nested = nested
+        self.sample: t.Optional[pd.DataFrame] = None
+        data = kwargs.get("data")
+        if nested is not NestedStrategy.RELATIONAL and hasattr(data, "generator"):
+            reshape = flatten_record if nested is NestedStrategy.FLATTEN else wrap_nested
+            data.generator = map(reshape, data.generator)  # type: ignore[union-attr]
+        # `ddlgenerator` adjusts the level of the root logger, which would
+        # make subsequent log messages leak to stderr, so restore it.
+        root_level = logging.getLogger().level
+        try:
+            super().__init__(*args, **kwargs)
+        finally:
+            logging.getLogger().setLevel(root_level)
+
+    def dispose(self):
+        """
+        Remove tables from the module-global SQLAlchemy `MetaData` instance of `ddlgenerator`,
+        so that tables of the same name can be inferred again within the same process.
+        """
+        for child in getattr(self, "children", {}).values():
+            child.dispose()
+        self.table.metadata.remove(self.table)
+
     def _determine_types(self):
-        column_data = OrderedDict()  # noqa: F841
+        """
+        Infer column types column by column, using vectorized operations on a pandas
+        DataFrame, instead of coercing each value individually.
+        """
         self.columns = OrderedDict()
         if hasattr(self.data, "generator") and hasattr(self.data.generator, "sqla_columns"):
             for col in self.data.generator.sqla_columns:
@@ -60,56 +188,113 @@ class TablePlus(Table):
                 }
             return
         self.comments = {}
-        rowcount = 0
-        for row in self.data:
-            rowcount += 1
-            keys = row.keys()
-            # print("keys:", keys)  # noqa: ERA001
-            for col_name in self.columns:
-                if col_name not in keys:
-                    self.columns[col_name]["is_nullable"] = True
-            if not isinstance(row, OrderedDict):
-                keys = sorted(keys)
-            for k in keys:
-                v_raw = row[k]
-                if not th.is_scalar(v_raw):
-                    v = str(v_raw)
-                    self.comments[k] = "nested values! example:\n%s" % pprint.pformat(v)
-                    logging.warning("in %s: %s" % (k, self.comments[k]))
-
-                # PATCH: Decimals like `"0704.0001"` should be treated as strings, see `nested.json`.
-                v_candidate = th.coerce_to_specific(v_raw)
-                if isinstance(v_raw, str) and isinstance(v_candidate, Decimal):
-                    v = v_raw
-                elif isinstance(v_raw, dt.datetime) and isinstance(v_candidate, str):
-                    v = v_raw
-                else:
-                    v = v_candidate
-
-                # print("v_raw, v:", v_raw, v, type(v_raw), type(v))  # noqa: ERA001
-                if k not in self.columns:
-                    self.columns[k] = {
-                        "sample_datum": v,
-                        "str_length": len(str(v_raw)),
-                        "is_nullable": not (rowcount == 1 and v is not None and str(v).strip()),
-                        "is_unique": {
-                            v,
-                        },
-                    }
-                else:
-                    col = self.columns[k]
-                    col["str_length"] = max(col["str_length"], len(str(v_raw)))
-                    old_sample_datum = col.get("sample_datum")  # noqa: F841
-                    col["sample_datum"] = th.best_representative(col["sample_datum"], v)
-                    if (v is None) or (not str(v).strip()):
-                        col["is_nullable"] = True
-                    if col["is_unique"] is not False:
-                        if v in col["is_unique"]:
-                            col["is_unique"] = False
-                        else:
-                            col["is_unique"].add(v)
-        for col_name in self.columns:
-            col = self.columns[col_name]
+        records = list(self.data)
+        if self.nested is NestedStrategy.OBJECT:
+            records = [unwrap_nested(record) for record in records]
+        df = pd.DataFrame(records_to_columns(records), dtype=object)
+        self.sample = df
+        if self.statistics is not None:
+            self._determine_types_from_statistics(df)
+            return
+        # Traverse nested values once, folding the statistics of each path.
+        nested = [col_name for col_name, series in df.items() if self._is_nested(series)]
+        statistics = {}
+        if nested:
+            statistics = fold_records({key: record[key] for key in nested if key in record} for record in records)
+        scalars = df.drop(columns=nested)
+        if self.executor is not None and len(scalars.columns) > PARALLEL_COLUMNS_PER_TASK:
+            slices = [
+                scalars.iloc[:, start : start + PARALLEL_COLUMNS_PER_TASK]
+                for start in range(0, len(scalars.columns), PARALLEL_COLUMNS_PER_TASK)
+            ]
+            logger.info(f"Inferring {len(scalars.columns)} columns in {len(slices)} slices")
+            results = [result for part in self.executor.map(infer_columns, slices) for result in part]
+        else:
+            results = infer_columns(scalars)
+        inferred = dict(zip(scalars.columns, results))
+        for col_name in df.columns:
+            if col_name in statistics:
+                self.columns[col_name] = self._nested_column(statistics[col_name])
+                continue
+            col, example = inferred[col_name]
+            self._comment_nested(col_name, example)
+            self._fill_metadata_from_sample(col)
+            self.columns[col_name] = col
+
+    def _determine_types_from_statistics(self, sample: pd.DataFrame):
+        """
+        Infer column types from statistics of all records of the resource.
+
+        The columns of the sample come first. Columns which are not present in the
+        sample are added, unless they contain nested values, which would need a child
+        table. Columns of the sample which are not present in the statistics, like
+        those flattened from nested dictionaries, are inferred from the sample.
+        """
+        statistics = t.cast(dict, self.statistics)
+        statistics = OrderedDict((clean_key_name(col_name), stats) for col_name, stats in statistics.items())
+        col_names = list(sample.columns)
+        col_names += [
+            col_name
+            for col_name, stats in statistics.items()
+            if col_name not in sample and (stats.example is None or self._is_nested(stats))
+        ]
+        for col_name in col_names:
+            if col_name in statistics and self._is_nested(statistics[col_name]):
+                self.columns[col_name] = self._nested_column(statistics[col_name])
+                continue
+            if col_name in statistics:
+                stats = statistics[col_name]
+                self._comment_nested(col_name, stats.example)
+                col = stats.to_column()
+            elif self._is_nested(sample[col_name]):
+                stats = fold_records({col_name: value} for value in sample[col_name].dropna())[col_name]
+                stats.is_nullable = bool(sample[col_name].isna().any())
+                self.columns[col_name] = self._nested_column(stats)
+                continue
+            else:
+                self._comment_nested(col_name, nested_example(sample[col_name]))
+                col = infer_column(sample[col_name])
             self._fill_metadata_from_sample(col)
-            col["is_unique"] = bool(col["is_unique"])
-        # print("self.columns:", self.columns)  # noqa: ERA001
+            self.columns[col_name] = col
+
+    def _is_nested(self, column: t.Union[pd.Series, ColumnStatistics]) -> bool:
+        """
+        Whether to map a column to a nested type, when all of its values are objects, or arrays.
+        """
+        if self.nested is not NestedStrategy.OBJECT:
+            return False
+        if isinstance(column, ColumnStatistics):
+            return column.is_object or column.is_array
+        return is_nested_column(column)
+
+    def _nested_column(self, stats: ColumnStatistics) -> t.Dict[str, t.Any]:
+        """
+        Describe a column of nested objects or arrays, with its type inferred from the statistics of each path.
+        """
+        return {
+            "sample_datum": stats.example,
+            "str_length": stats.str_length,
+            "is_nullable": stats.is_nullable,
+            "is_unique": False,
+            "pytype": type(stats.example),
+            "satype": self._nested_type(stats),
+        }
+
+    def _nested_type(self, stats: ColumnStatistics) -> sa.types.TypeEngine:
+        """
+        Infer the type of a path recursively. Values of mixed nested and scalar types are stored as strings.
+        """
+        if stats.is_object:
+            return NestedObject(OrderedDict((key, self._nested_type(child)) for key, child in stats.children.items()))
+        if stats.is_array:
+            return NestedArray(self._nested_type(stats.items) if stats.items is not None else sa.Text())
+        col = stats.to_column()
+        if stats.example is not None or col["sample_datum"] is None:
+            return sa.Text()
+        self._fill_metadata_from_sample(col)
+        return sa.types.to_instance(col["satype"])
+
+    def _comment_nested(self, col_name: str, nested: t.Optional[t.Any]):
+        if nested is not None:
+            self.comments[col_name] = "nested values! example:\n%s" % pprint.pformat(str(nested))
+            logging.warning("in %s: %s" % (col_name, self.comments[col_name]))
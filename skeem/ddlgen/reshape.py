@@ -1,3 +1,5 @@
+import typing as t
+
 import sqlalchemy as sa
 from ddlgenerator.reshape import UniqueKey, _illegal_in_column_name, all_values_for
 
@@ -50,3 +52,54 @@ def use_this_pk(self, pk_name, key_type):
             pass
 
     self.pk = UniqueKey(pk_name, key_type)
+
+
+def flatten_record(record: t.Mapping[str, t.Any], prefix: str = "") -> t.Dict[str, t.Any]:
+    """
+    Flatten nested objects of a record into keys named by their path, like `meta.user`.
+    Empty objects are omitted, so their columns will be nullable.
+
+    >>> flatten_record({"id": 1, "meta": {"user": "foo", "geo": {"lat": 1.5}, "tags": {}}})
+    {'id': 1, 'meta.user': 'foo', 'meta.geo.lat': 1.5}
+    """
+    flat: t.Dict[str, t.Any] = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, prefix=f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+class Nested:
+    """
+    Wrap a nested object or array, in order to map it to a nested column type.
+
+    `ddlgenerator` would unnest objects into the columns of the parent table, and arrays
+    into child tables, because it reshapes all values which have `items`, and all lists.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: t.Union[t.Dict[str, t.Any], t.List[t.Any]]):
+        self.value = value
+
+
+def wrap_nested(record: t.Mapping[str, t.Any]) -> t.Dict[str, t.Any]:
+    """
+    Wrap nested objects and arrays of a record, see `Nested`.
+
+    >>> wrap_nested({"id": 1, "meta": {"user": "foo"}, "tags": ["foo"]})["tags"]
+    <skeem.ddlgen.reshape.Nested object at ...>
+    """
+    return {key: Nested(value) if isinstance(value, (dict, list)) else value for key, value in record.items()}
+
+
+def unwrap_nested(record: t.Mapping[str, t.Any]) -> t.Dict[str, t.Any]:
+    """
+    Unwrap nested objects and arrays of a record, see `Nested`.
+
+    >>> unwrap_nested(wrap_nested({"id": 1, "meta": {"user": "foo"}}))
+    {'id': 1, 'meta': {'user': 'foo'}}
+    """
+    return {key: value.value if isinstance(value, Nested) else value for key, value in record.items()}
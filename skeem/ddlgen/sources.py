@@ -1,16 +1,27 @@
 import ast
+import functools
 import io
+import itertools
 import logging
 import typing as t
-from copy import deepcopy
 
 import pandas as pd
 import sqlalchemy
-from cachetools.func import lru_cache
 from data_dispenser import Source
-
-from skeem.io import dataframe_from_lineprotocol, dataset_to_dataframe, to_tempfile
-from skeem.settings import PEEK_LINES
+from data_dispenser.sources import ordered_yaml_load
+
+from skeem.ddlgen.reshape import flatten_record
+from skeem.ddlgen.typehelpers import ColumnStatistics, fold_records, fold_statistics
+from skeem.io import (
+    dataframe_from_lineprotocol,
+    dataset_path,
+    dataset_to_dataframe,
+    netcdf_engine,
+    read_ndjson,
+    to_tempfile,
+)
+from skeem.settings import PEEK_LINES, SCAN_CHUNK_ROWS
+from skeem.types import NestedStrategy
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +42,8 @@ class SourcePlus(Source):
         fieldnames: t.List[str] = None,
         table: t.Optional[str] = None,
         ext: t.Optional[str] = None,
+        peek_lines: int = PEEK_LINES,
+        peek_bytes: t.Optional[int] = None,
     ):
         """
         For ``.csv`` and ``.xls``, field names will be taken from
@@ -38,7 +51,12 @@ class SourcePlus(Source):
         in which case, it will override.  For ``.xls``, ``fieldnames``
         may be an integer, in which case it will be the (1-based) row number
         field names will be taken from (rows before that will be discarded).
+
+        At most ``peek_lines`` records will be read from the data. For line-based
+        formats decoded by `skeem`, reading is also bounded by ``peek_bytes``.
         """
+        self.peek_lines = peek_lines
+        self.peek_bytes = peek_bytes
         self.improve()
 
         self.counter = 0
@@ -126,12 +144,17 @@ class SourcePlus(Source):
     def improve(self):
         """
         Register improved content type handler functions for certain data formats.
+
+        The registry is copied per instance, because the handler functions are bound to its sample size.
         """
-        self.eval_funcs_by_ext[".csv"] = [_eval_csv]
-        self.eval_funcs_by_ext[".grib2"] = [_eval_grib2]
-        self.eval_funcs_by_ext[".lp"] = [_eval_lineprotocol]
-        self.eval_funcs_by_ext[".nc"] = [_eval_netcdf]
-        self.eval_funcs_by_ext[".ndjson"] = [_eval_ndjson]
+        self.eval_funcs_by_ext = dict(self.eval_funcs_by_ext)
+        self.eval_funcs_by_ext[".csv"] = [functools.partial(_eval_csv, peek_lines=self.peek_lines)]
+        self.eval_funcs_by_ext[".grib2"] = [functools.partial(_eval_grib2, peek_lines=self.peek_lines)]
+        self.eval_funcs_by_ext[".lp"] = [
+            functools.partial(_eval_lineprotocol, peek_lines=self.peek_lines, peek_bytes=self.peek_bytes)
+        ]
+        self.eval_funcs_by_ext[".nc"] = [functools.partial(_eval_netcdf, peek_lines=self.peek_lines)]
+        self.eval_funcs_by_ext[".ndjson"] = [functools.partial(_eval_ndjson, peek_lines=self.peek_lines)]
 
         # TODO: Use the generic interface if deserializer can be created with `sheet_name` option.
 
@@ -147,39 +170,87 @@ class SourcePlus(Source):
         self.deserializers = deserializers
         self._deserialize(src)
 
+    def _deserialize(self, open_file):
+        """
+        Try deserializers in order, and use the first one which yields a non-empty record.
+
+        In contrast to `data_dispenser`, each deserializer is invoked only once per resource.
+        The record consumed for probing is memoized, and put in front of the records generated
+        by the same invocation, instead of invoking the deserializer again, which would read
+        and decode the resource twice.
+        """
+        self.file = open_file
+        errors = []
+        for deserializer in self.deserializers:
+            open_file.seek(0)
+            try:
+                generator = deserializer(open_file, fieldnames=self.fieldnames)
+                row_1 = next(generator)
+            except StopIteration:
+                self.generator = iter([])
+                self.deserializer = deserializer
+                return
+            except Exception as ex:
+                logger.info(f"{deserializer} failed to deserialize {open_file}")
+                logger.info(str(ex))
+                errors.append(str(ex))
+                continue
+            if not row_1:
+                logger.info(f"{deserializer} found no items in first row of {open_file}")
+                continue
+            if deserializer is ordered_yaml_load and isinstance(row_1, str) and len(row_1) == 1:
+                logger.info("False hit: Reading `yaml` as a single string")
+                continue
+            self.generator = itertools.chain([row_1], generator)
+            self.deserializer = deserializer
+            return
+        raise SyntaxError(
+            f"{self.table_name}: Could not deserialize {open_file} "
+            f"(tried {', '.join(str(s) for s in self.deserializers)})\nErrors:\n" + "\n".join(errors)
+        )
+
     def _source_is_excel(self, spreadsheet, sheet=None):
-        df = pd.read_excel(spreadsheet, sheet_name=sheet, parse_dates=False, keep_default_na=False, nrows=PEEK_LINES)
+        df = pd.read_excel(
+            spreadsheet, sheet_name=sheet, parse_dates=False, keep_default_na=False, nrows=self.peek_lines
+        )
         self.generator = _generate_records(df)
 
 
-def _eval_csv(target, fieldnames: t.List[str] = None, *args, **kwargs):
+def _eval_csv(target, fieldnames: t.List[str] = None, *args, peek_lines: int = PEEK_LINES, **kwargs):
     """
     Generate records from a CSV string, using pandas' `pd.read_csv`.
     """
-    df = pd.read_csv(target, parse_dates=False, keep_default_na=False, nrows=PEEK_LINES)
+    df = pd.read_csv(target, parse_dates=False, keep_default_na=False, nrows=peek_lines)
     return _generate_records(df)
 
 
-def _eval_lineprotocol(target, fieldnames: t.List[str] = None, *args, **kwargs):
+def _eval_lineprotocol(
+    target,
+    fieldnames: t.List[str] = None,
+    *args,
+    peek_lines: int = PEEK_LINES,
+    peek_bytes: t.Optional[int] = None,
+    **kwargs,
+):
     """
     Generate records from an InfluxData lineprotocol string.
     """
-    df = dataframe_from_lineprotocol(data=target)
+    df = dataframe_from_lineprotocol(data=target, peek_lines=peek_lines, peek_bytes=peek_bytes)
     return _generate_records(df)
 
 
-# Work around being called twice.
-# TODO: Find the root cause why those functions are called twice.
-@lru_cache  # type: ignore[arg-type]
-def _eval_grib2(target, fieldnames: t.List[str] = None, *args, **kwargs):
+def _eval_grib2(target, fieldnames: t.List[str] = None, *args, peek_lines: int = PEEK_LINES, **kwargs):
     """
     Generate records from an NDJSON string, using pandas' `pd.read_json`.
     """
     import cfgrib
     import xarray as xr
 
-    tmp = to_tempfile(target)
-    gribfile = tmp.name
+    # `cfgrib` can only read files by path, so copy other resources to a temporary file.
+    gribfile = dataset_path(target)
+    if gribfile is None:
+        tmp = to_tempfile(target, suffix=".grib2")
+        gribfile = tmp.name
 
     """
     # WARNING: Falling back to 'lalala'. Reason: multiple values for unique key,
@@ -195,7 +266,8 @@ def _eval_grib2(target, fieldnames: t.List[str] = None, *args, **kwargs):
     """
     logger.info("Opening dataset")
     try:
-        ds = xr.open_dataset(gribfile, engine="cfgrib")
+        # Do not write index files next to the input file.
+        ds = xr.open_dataset(gribfile, engine="cfgrib", indexpath="")
     except cfgrib.dataset.DatasetBuildError as ex:
         msg = str(ex)
         if "multiple values for unique key" in msg:
@@ -203,38 +275,81 @@ def _eval_grib2(target, fieldnames: t.List[str] = None, *args, **kwargs):
             candidate = candidates[0].strip()
             logger.info(f"WARNING: Falling back to '{candidate}'. Reason: {ex}")
             kwargs = ast.literal_eval(f"dict({candidate})")
-            ds = xr.open_dataset(gribfile, engine="cfgrib", **kwargs, decode_times=False)
+            ds = xr.open_dataset(gribfile, engine="cfgrib", indexpath="", **kwargs, decode_times=False)
         else:
             raise
-    df = dataset_to_dataframe(ds, peek_lines=PEEK_LINES)
+    df = dataset_to_dataframe(ds, peek_lines=peek_lines)
     return _generate_records(df)
 
 
-# Work around being called twice.
-# TODO: Find the root cause why those functions are called twice.
-@lru_cache  # type: ignore[arg-type]
-def _eval_netcdf(target, fieldnames: t.List[str] = None, *args, **kwargs):
+def _eval_netcdf(target, fieldnames: t.List[str] = None, *args, peek_lines: int = PEEK_LINES, **kwargs):
     """
     Generate records from an NDJSON string, using pandas' `pd.read_json`.
     """
     import xarray as xr
 
-    # FIXME: Because this function is called two times, we need to copy the
-    #        buffer, because `xr.open_dataset` will apparently close it.
-    target = deepcopy(target)
-
+    # Open local files by path, so they can be memory-mapped, and other resources
+    # as file objects, so only the header and the sampled variables are read.
     logger.info("Opening dataset")
-    ds = xr.open_dataset(target, engine="scipy")
-    df = dataset_to_dataframe(ds, peek_lines=PEEK_LINES)
+    ds = xr.open_dataset(dataset_path(target) or target, engine=netcdf_engine(target))
+    df = dataset_to_dataframe(ds, peek_lines=peek_lines)
     return _generate_records(df)
 
 
-def _eval_ndjson(target, fieldnames: t.List[str] = None, *args, **kwargs):
+def _eval_ndjson(target, fieldnames: t.List[str] = None, *args, peek_lines: int = PEEK_LINES, **kwargs):
     """
-    Generate records from an NDJSON string, using pandas' `pd.read_json`.
+    Generate records from an NDJSON string, decoding it line by line using `orjson`.
     """
-    df = pd.read_json(target, convert_dates=False, lines=True, nrows=PEEK_LINES)
-    return _generate_records(df)
+    return read_ndjson(target, nrows=peek_lines)
+
+
+def scan_statistics(
+    src: t.IO,
+    ext: t.Optional[str],
+    chunksize: int = SCAN_CHUNK_ROWS,
+    nested: NestedStrategy = NestedStrategy.RELATIONAL,
+) -> t.Dict[str, ColumnStatistics]:
+    """
+    Read the whole resource in chunks of `chunksize` records, and fold the statistics
+    of its columns, in order to infer column types with bounded memory usage.
+    """
+    func = scan_funcs_by_ext.get(ext or "*")
+    if func is None:
+        raise NotImplementedError(f"Backend 'ddlgen' can not scan resources with extension '{ext}'")
+    return func(src, chunksize=chunksize, nested=nested)
+
+
+def _scan_csv(
+    target, chunksize: int = SCAN_CHUNK_ROWS, nested: NestedStrategy = NestedStrategy.RELATIONAL
+) -> t.Dict[str, ColumnStatistics]:
+    """
+    Fold statistics of a CSV file chunk by chunk, using pandas' `pd.read_csv`.
+    CSV files do not have nested values, so `nested` does not apply.
+    """
+    with pd.read_csv(target, parse_dates=False, keep_default_na=False, chunksize=chunksize) as reader:
+        return fold_statistics(reader)
+
+
+def _scan_ndjson(
+    target, chunksize: int = SCAN_CHUNK_ROWS, nested: NestedStrategy = NestedStrategy.RELATIONAL
+) -> t.Dict[str, ColumnStatistics]:
+    """
+    Fold statistics of an NDJSON file, decoding it line by line using `orjson`.
+    Records are not aligned into dense frames, in order to handle sparse keys efficiently.
+
+    With the `flatten` strategy, records are flattened like the sample, see `TablePlus`,
+    so both arrive at the same columns.
+    """
+    records: t.Iterable[t.Dict[str, t.Any]] = read_ndjson(target)
+    if nested is NestedStrategy.FLATTEN:
+        records = map(flatten_record, records)
+    return fold_records(records, chunksize=chunksize)
+
+
+scan_funcs_by_ext: t.Dict[str, t.Callable[..., t.Dict[str, ColumnStatistics]]] = {
+    ".csv": _scan_csv,
+    ".ndjson": _scan_ndjson,
+}
 
 
 def _generate_records(df: pd.DataFrame):
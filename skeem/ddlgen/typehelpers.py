@@ -1,13 +1,42 @@
 import datetime
+import itertools
+import logging
 import typing as t
+from collections import OrderedDict
 from decimal import Decimal, InvalidOperation
 
 import dateutil.parser
+import numpy as np
 import pandas as pd
-from ddlgenerator.typehelpers import _complex_enough_to_be_date, _digits_only
+from ddlgenerator.typehelpers import _complex_enough_to_be_date, _digits_only, is_scalar
+
+from skeem.cardinality import CardinalityEstimator, is_unique
+from skeem.settings import SCAN_CHUNK_ROWS
+
+logger = logging.getLogger(__name__)
 
 CoercionType = t.Union[str, int, float, bool, Decimal, datetime.datetime]
 
+# Order of preference, from the most specific to the least restrictive type.
+PREFERENCE = (datetime.datetime, bool, int, Decimal, float, str)
+
+BOOLEAN_WORDS = ["0", "false", "f", "n", "no", "1", "true", "t", "y", "yes"]
+
+# Lengths of digit-only strings which may represent dates, like `20141010`.
+DATE_DIGITS_LENGTHS = [4, 6, 8, 12, 14, 17]
+
+# Types of homogeneous columns, as reported by `pd.api.types.infer_dtype`.
+INFERRED_DTYPE_KINDS = {
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "floating": Decimal,
+    "decimal": Decimal,
+    "mixed-integer-float": Decimal,
+    "datetime": datetime.datetime,
+    "datetime64": datetime.datetime,
+}
+
 
 def coerce_to_specific(datum: CoercionType) -> t.Optional[CoercionType]:
     """
@@ -143,3 +172,483 @@ def best_coercable(data):
                     worst = coerced
     # print("worst:", worst, type(worst))  # noqa: ERA001
     return worst
+
+
+def infer_column(series: pd.Series) -> t.Dict[str, t.Any]:
+    """
+    Infer type, nullability, string length, and uniqueness of a column at once.
+
+    The outcome resembles what reducing the results of `coerce_to_specific` using
+    `best_representative` on each value would yield, but values are classified by
+    vectorized operations per column instead. Only date candidates which pandas
+    can not parse as ISO 8601 fall back to `dateutil`.
+
+    >>> infer_column(pd.Series(["1", "010", None], dtype=object))
+    {'sample_datum': 10, 'str_length': 3, 'is_nullable': True, 'is_unique': True}
+    >>> infer_column(pd.Series([0.42, 13.7], dtype=object))["sample_datum"]
+    Decimal('99.99')
+    >>> infer_column(pd.Series(["2014-10-31T09:22:56", ""], dtype=object))["sample_datum"]
+    datetime.datetime(2014, 10, 31, 9, 22, 56)
+    >>> infer_column(pd.Series(["yes", "no", "yes"], dtype=object))
+    {'sample_datum': True, 'str_length': 3, 'is_nullable': False, 'is_unique': False}
+    >>> infer_column(pd.Series(["0704.0001", 42], dtype=object))["sample_datum"]
+    '0704.0001'
+    """
+    nulls = series.isna()
+    values = series[~nulls]
+
+    kinds, blanks = _classify(values)
+    if kinds:
+        kind = max(kinds, key=PREFERENCE.index)
+        sample_datum = _representative(kind, kinds[kind])
+    else:
+        sample_datum = None
+
+    return {
+        "sample_datum": sample_datum,
+        "str_length": int(values.astype(str).str.len().max()) if len(values) else 0,
+        "is_nullable": bool(nulls.any() or blanks),
+        "is_unique": bool(nulls.sum() <= 1 and is_unique(values)),
+    }
+
+
+def infer_columns(df: pd.DataFrame) -> t.List[t.Tuple[t.Dict[str, t.Any], t.Optional[t.Any]]]:
+    """
+    Infer all columns of a DataFrame, see `infer_column`, and report their first nested value, if any.
+    This is the unit of work when inferring column types in parallel.
+    """
+    return [(infer_column(series), nested_example(series)) for _, series in df.items()]
+
+
+def is_nested_column(series: pd.Series) -> bool:
+    """
+    Whether all values of a column are nested objects, or whether all of them are arrays.
+
+    >>> is_nested_column(pd.Series([{"x": 1}, None], dtype=object))
+    True
+    >>> is_nested_column(pd.Series([[1, 2], []], dtype=object))
+    True
+    >>> is_nested_column(pd.Series([{"x": 1}, [1, 2]], dtype=object))
+    False
+    >>> is_nested_column(pd.Series([{"x": 1}, "foo"], dtype=object))
+    False
+    """
+    values = series.dropna()
+    if not len(values):
+        return False
+    kinds = set(values.map(type))
+    return kinds <= {dict} or kinds <= {list}
+
+
+def nested_example(series: pd.Series) -> t.Optional[t.Any]:
+    """
+    Return the first non-scalar value of a column, like a list or a dictionary, if any.
+
+    >>> nested_example(pd.Series([1, [2, 3]], dtype=object))
+    [2, 3]
+    >>> nested_example(pd.Series(["foo", "bar"], dtype=object))
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) in INFERRED_DTYPE_KINDS:
+        return None
+    nested = series[~series.map(is_scalar).astype(bool)]
+    if nested.empty:
+        return None
+    return nested.iloc[0]
+
+
+class ColumnStatistics:
+    """
+    Fold type, nullability, string length, and uniqueness of a column incrementally,
+    chunk by chunk, in order to infer the column type from the whole resource.
+
+    Memory usage does not depend on the number of rows: Only a representative value
+    is retained per column, and uniqueness is decided by a `CardinalityEstimator`.
+
+    `presence` counts the records which include the column, out of `rows` records, in
+    order to account for sparse keys. For columns of nested objects, `objects` counts
+    the values which are objects, and `children` are the statistics of their keys.
+    For columns of arrays, `arrays` counts the values which are arrays, and `items`
+    are the statistics of their elements.
+
+    >>> stats = ColumnStatistics()
+    >>> stats.update(pd.Series(["1", "2"], dtype=object))
+    >>> stats.update(pd.Series(["3.14", None], dtype=object))
+    >>> stats.to_column()
+    {'sample_datum': '3.14', 'str_length': 4, 'is_nullable': True, 'is_unique': True}
+    """
+
+    def __init__(self, estimator: t.Callable[[], CardinalityEstimator] = CardinalityEstimator):
+        self.sample_datum: t.Optional[CoercionType] = None
+        self.str_length = 0
+        self.is_nullable = False
+        self.nulls = 0
+        self.cardinality = estimator()
+        self.example: t.Optional[t.Any] = None
+        self.presence = 0
+        self.rows = 0
+        self.objects = 0
+        self.children: t.Dict[str, ColumnStatistics] = OrderedDict()
+        self.arrays = 0
+        self.items: t.Optional[ColumnStatistics] = None
+
+    @property
+    def is_unique(self) -> bool:
+        missing = max(0, self.rows - self.presence)
+        return self.nulls + missing <= 1 and self.cardinality.is_unique
+
+    @property
+    def is_object(self) -> bool:
+        """
+        Whether all values of the column are nested objects.
+        """
+        return self.objects > 0 and self.objects == self.presence - self.nulls
+
+    @property
+    def is_array(self) -> bool:
+        """
+        Whether all values of the column are arrays.
+        """
+        return self.arrays > 0 and self.arrays == self.presence - self.nulls
+
+    def update(self, series: pd.Series):
+        """
+        Fold the values of another chunk into the statistics.
+        """
+        nulls = series.isna()
+        values = series[~nulls]
+        self.nulls += int(nulls.sum())
+        self.presence += len(series)
+
+        if self.example is None:
+            self.example = nested_example(values)
+
+        kinds, blanks = _classify(values)
+        if kinds:
+            kind = max(kinds, key=PREFERENCE.index)
+            self.sample_datum = merge_representatives(self.sample_datum, _representative(kind, kinds[kind]))
+
+        if len(values):
+            self.str_length = max(self.str_length, int(values.astype(str).str.len().max()))
+        self.is_nullable = self.is_nullable or bool(nulls.any() or blanks)
+        self.cardinality.update(values)
+
+    def to_column(self) -> t.Dict[str, t.Any]:
+        """
+        Return the statistics in the format of `infer_column`.
+        """
+        return {
+            "sample_datum": self.sample_datum,
+            "str_length": self.str_length,
+            "is_nullable": self.is_nullable,
+            "is_unique": self.is_unique,
+        }
+
+
+def fold_statistics(chunks: t.Iterable[pd.DataFrame]) -> t.Dict[str, ColumnStatistics]:
+    """
+    Fold the column statistics of all chunks of a resource.
+    Columns which are missing from any of the chunks are nullable.
+
+    >>> statistics = fold_statistics([pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3], "b": ["foo"]})])
+    >>> {name: stats.to_column()["is_nullable"] for name, stats in statistics.items()}
+    {'a': False, 'b': True}
+    """
+    statistics: t.Dict[str, ColumnStatistics] = OrderedDict()
+    rows = 0
+    for chunk in chunks:
+        chunk = chunk.astype(object)
+        for col_name, stats in statistics.items():
+            if col_name not in chunk:
+                stats.is_nullable = True
+        for col_name, series in chunk.items():
+            if col_name not in statistics:
+                statistics[col_name] = ColumnStatistics()
+                statistics[col_name].is_nullable = rows > 0
+            statistics[col_name].update(series)
+        rows += len(chunk)
+    for stats in statistics.values():
+        stats.rows = rows
+    return statistics
+
+
+def fold_records(
+    records: t.Iterable[t.Mapping[str, t.Any]], chunksize: int = SCAN_CHUNK_ROWS
+) -> t.Dict[str, ColumnStatistics]:
+    """
+    Fold the column statistics of all records of a resource, without aligning them into a dense frame.
+
+    Per chunk of records, only the values which are present are collected per key, so memory
+    usage depends on the number of values, not on the number of records times the number of
+    keys. Keys which are missing from any record are nullable, decided by their presence count.
+
+    Nested objects and arrays are traversed once, folding the statistics of each path: Objects
+    into the statistics of their keys, see `children`, and arrays into the statistics of their
+    elements, see `items`.
+
+    >>> statistics = fold_records([{"a": 1, "o": {"x": 1}}, {"b": "foo", "o": {"x": 2, "y": True}}])
+    >>> {name: stats.to_column()["is_nullable"] for name, stats in statistics.items()}
+    {'a': True, 'o': False, 'b': True}
+    >>> {name: stats.presence for name, stats in statistics["o"].children.items()}
+    {'x': 2, 'y': 1}
+    >>> statistics = fold_records([{"l": [{"x": 1}, {"x": 2, "y": [3.5]}]}, {"l": []}])
+    >>> statistics["l"].is_array, statistics["l"].items.presence, statistics["l"].items.children["y"].items.sample_datum
+    (True, 2, Decimal('9.9'))
+    """
+    statistics: t.Dict[str, ColumnStatistics] = OrderedDict()
+    rows = 0
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            break
+        values: t.Dict[ColumnStatistics, t.List[t.Any]] = {}
+        for record in chunk:
+            for key, value in record.items():
+                stats = statistics.get(key)
+                if stats is None:
+                    stats = statistics[key] = ColumnStatistics()
+                _collect_value(value, stats, values)
+        for stats, present in values.items():
+            stats.update(pd.Series(present, dtype=object))
+        rows += len(chunk)
+    _apply_presence(statistics, rows)
+    return statistics
+
+
+def _collect_value(value: t.Any, stats: ColumnStatistics, values: t.Dict[ColumnStatistics, t.List[t.Any]]):
+    """
+    Collect a value per path, and recurse into nested objects and arrays.
+    """
+    values.setdefault(stats, []).append(value)
+    if isinstance(value, dict):
+        stats.objects += 1
+        for key, child in value.items():
+            child_stats = stats.children.get(key)
+            if child_stats is None:
+                child_stats = stats.children[key] = ColumnStatistics()
+            _collect_value(child, child_stats, values)
+    elif isinstance(value, list):
+        stats.arrays += 1
+        if stats.items is None:
+            stats.items = ColumnStatistics()
+        for item in value:
+            _collect_value(item, stats.items, values)
+
+
+def _apply_presence(statistics: t.Dict[str, ColumnStatistics], rows: int):
+    """
+    Columns which are missing from any record, or from any nested object, are nullable.
+    """
+    for stats in statistics.values():
+        _apply_presence_path(stats, rows)
+
+
+def _apply_presence_path(stats: ColumnStatistics, rows: int):
+    stats.rows = rows
+    stats.is_nullable = stats.is_nullable or stats.presence < rows
+    _apply_presence(stats.children, stats.objects)
+    if stats.items is not None:
+        _apply_presence_path(stats.items, stats.items.presence)
+
+
+def merge_representatives(left: t.Optional[CoercionType], right: t.Optional[CoercionType]) -> t.Optional[CoercionType]:
+    """
+    Merge the representative values of two chunks of a column, like `best_coercable` does per value.
+
+    >>> merge_representatives(42, "foo")
+    'foo'
+    >>> merge_representatives(-1000, 42)
+    -1000
+    >>> merge_representatives(Decimal("99.9"), Decimal("9.999"))
+    Decimal('99.999')
+    >>> merge_representatives(None, True)
+    True
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    left_pref, right_pref = PREFERENCE.index(type(left)), PREFERENCE.index(type(right))
+    if left_pref != right_pref:
+        return left if left_pref > right_pref else right
+    if isinstance(left, Decimal):
+        return _worst_decimal(pd.Series([left, right], dtype=object))
+    if isinstance(left, int) and not isinstance(left, bool):
+        return max(left, t.cast(int, right), key=abs)
+    if isinstance(left, str):
+        return max(left, t.cast(str, right), key=len)
+    return left
+
+
+def _classify(values: pd.Series) -> t.Tuple[t.Dict[type, pd.Series], bool]:
+    """
+    Group non-null values by the most specific type they can be coerced into.
+    Also report whether there are blank strings, which count as null values.
+    """
+    kind = INFERRED_DTYPE_KINDS.get(pd.api.types.infer_dtype(values, skipna=False))
+    if kind is str:
+        return _classify_strings(values)
+    if kind is not None:
+        return {kind: values}, False
+
+    # Mixed types need to be dispatched per value.
+    groups: t.Dict[type, t.List[pd.Series]] = {}
+    blanks = False
+    for kind, group in values.groupby(values.map(_kind_of), sort=False):
+        if kind is str:
+            string_kinds, blanks = _classify_strings(group)
+            for string_kind, string_values in string_kinds.items():
+                groups.setdefault(string_kind, []).append(string_values)
+        else:
+            groups.setdefault(kind, []).append(group)
+    return {kind: pd.concat(group) for kind, group in groups.items()}, blanks
+
+
+def _kind_of(value: t.Any) -> type:
+    if isinstance(value, (bool, np.bool_)):
+        return bool
+    if isinstance(value, (int, np.integer)):
+        return int
+    if isinstance(value, (float, Decimal, np.floating)):
+        return Decimal
+    if isinstance(value, (datetime.datetime, np.datetime64)):
+        return datetime.datetime
+    return str
+
+
+def _classify_strings(values: pd.Series) -> t.Tuple[t.Dict[type, pd.Series], bool]:
+    """
+    Classify string values into datetimes, integers, booleans, and strings.
+
+    Like the patched `coerce_to_specific` handling, strings looking like decimals,
+    like `"0704.0001"`, are kept as strings.
+    """
+    values = values.astype(str)
+    stripped = values.str.strip()
+    blank = stripped == ""
+    values, stripped = values[~blank], stripped[~blank]
+    if values.empty:
+        return {}, bool(blank.any())
+
+    is_int = stripped.str.fullmatch(r"[+-]?\d+(?:_\d+)*")
+    is_bool = stripped.str.lower().isin(BOOLEAN_WORDS) & ~is_int
+
+    clean = stripped.str.lstrip("-").str.lstrip("0").str.rstrip(".")
+    is_complex = clean.str.count(_complex_enough_to_be_date.pattern) >= 2
+    is_date_digits = clean.str.fullmatch(r"\d+") & clean.str.len().isin(DATE_DIGITS_LENGTHS)
+    is_date_candidate = (is_complex | is_date_digits) & stripped.str.contains(r"\d")
+
+    # When there are plain strings, the column is a string column anyway.
+    is_str = ~(is_date_candidate | is_int | is_bool)
+    if is_str.any():
+        return {str: values}, bool(blank.any())
+
+    kinds: t.Dict[type, pd.Series] = {}
+    is_date = pd.Series(False, index=values.index)
+    if is_date_candidate.any():
+        has_ints = bool((is_int & ~is_date_candidate).any())
+        dates = _parse_dates(stripped[is_date_candidate], is_complex[is_date_candidate], has_ints=has_ints)
+        if dates is None:
+            return {str: values}, bool(blank.any())
+        is_date[dates.index] = True
+        kinds[datetime.datetime] = dates
+    is_int &= ~is_date
+    if is_int.any():
+        kinds[int] = stripped[is_int].map(int)
+    if is_bool.any():
+        kinds[bool] = stripped[is_bool].str.lower().isin(BOOLEAN_WORDS[5:])
+    return kinds, bool(blank.any())
+
+
+def _parse_dates(candidates: pd.Series, is_complex: pd.Series, has_ints: bool = False) -> t.Optional[pd.Series]:
+    """
+    Parse date candidates, and return the values which are dates.
+    Return `None` as soon as a value is found which is neither a date nor an integer.
+
+    Values are parsed as ISO 8601 in one go. The remaining ones, and digit-only values
+    which are ambiguous, are parsed by `coerce_to_specific`, once per distinct value.
+    When the column has integers anyway, short digit-only values do not need to be
+    parsed, because they are integers, or dates, which are outranked by integers.
+    """
+    try:
+        parsed = pd.to_datetime(candidates, format="ISO8601", errors="coerce", utc=True)
+    except (ValueError, OverflowError):
+        parsed = pd.Series(pd.NaT, index=candidates.index, dtype="datetime64[ns, UTC]")
+
+    # Digit-only values are only dates when within a sensible range, and not today.
+    # `dateutil` fills in the current day when only the year is given, so those are years of the past.
+    digits = candidates.str.lstrip("-").str.lstrip("0").str.rstrip(".")
+    is_year = ~is_complex & (digits.str.len() == 4)
+    today = pd.Timestamp.now(tz="UTC").normalize()
+    sensible = (parsed.dt.year > 1700) & (parsed.dt.year < 2150) & (parsed.dt.normalize() != today)
+    sensible &= ~is_year | (parsed.dt.year != today.year)
+    is_date = parsed.notna() & (is_complex | sensible)
+
+    # Ambiguous values are not decided by pandas.
+    unresolved = parsed.isna() | (~is_complex & ~is_year & (digits.str.len() != 8))
+    is_date &= ~unresolved
+    dates = parsed[is_date]
+    resolved = {}
+    for complex_, group in [(True, unresolved & is_complex), (False, unresolved & ~is_complex)]:
+        for value in candidates[group].unique():
+            if not complex_ and has_ints and len(value) < 10:
+                continue
+            coerced = coerce_to_specific(value)
+            if isinstance(coerced, datetime.datetime):
+                resolved[value] = coerced
+            elif isinstance(coerced, int) and not isinstance(coerced, bool):
+                has_ints = True
+            else:
+                return None
+    if resolved:
+        more = candidates[unresolved & candidates.isin(list(resolved))].map(resolved)
+        dates = pd.concat([dates.astype(object), more]) if len(dates) else more
+    return dates
+
+
+def _representative(kind: type, values: pd.Series) -> CoercionType:
+    """
+    Reduce values of the same kind to a single representative value,
+    which is used by `_fill_metadata_from_sample` to select the SQL type.
+    """
+    if kind is datetime.datetime:
+        value = pd.Timestamp(values.iloc[0]).to_pydatetime()
+        return value.replace(tzinfo=None)
+    if kind is bool:
+        return bool(values.iloc[0])
+    if kind is int:
+        return int(max(values.max(), values.min(), key=abs))
+    if kind is Decimal:
+        return _worst_decimal(values)
+    values = values.astype(str)
+    return values.iloc[int(values.str.len().argmax())]
+
+
+def _worst_decimal(values: pd.Series) -> Decimal:
+    """
+    Compute a 9-filled decimal with enough digits before and after the decimal point
+    to accommodate all values, like `worst_decimal` does for a pair of values.
+
+    >>> _worst_decimal(pd.Series([762.1, -1.983, 1e-05], dtype=object))
+    Decimal('999.99999')
+    """
+    text = values.astype(str).str.lstrip("+-")
+    parts = text.str.extract(r"^(\d*)(\.?)(\d*)$")
+    regular = parts[0].notna()
+    integral = parts[0][regular].str.lstrip("0").str.len()
+    integral = integral.where(parts[1][regular] == ".", integral.clip(lower=1))
+    b4 = list(integral)
+    after = list(parts[2][regular].str.len())
+
+    # Values like `1e-05` are rare, so computing them individually is fine.
+    for value in text[~regular]:
+        number = Decimal(value)
+        if number.is_finite():
+            exponent = t.cast(int, number.as_tuple().exponent)
+            b4.append(len(number.as_tuple().digits) + exponent)
+            after.append(max(-exponent, 0))
+
+    places_b4, places_after = max(b4 + [0]), max(after + [0])
+    if not places_b4 and not places_after:
+        return Decimal(0)
+    return Decimal("9" * places_b4 + "." + "9" * places_after)
@@ -1,2 +1,6 @@
 class UnknownContentType(Exception):
     pass
+
+
+class UndecidedContentType(Exception):
+    pass
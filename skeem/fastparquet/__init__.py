@@ -0,0 +1,3 @@
+from skeem.fastparquet import monkey
+
+monkey.activate()
@@ -1,3 +1,5 @@
+import contextvars
+
 import fastparquet.cencoding as encoding
 import numpy as np
 import pandas as pd
@@ -8,6 +10,10 @@ from fastparquet.core import read_data_page, read_data_page_v2, read_dictionary_
 
 from skeem.settings import PEEK_LINES
 
+# How many values `read_col` will decode at most. It can be adjusted per context, because
+# `read_col` is invoked by fastparquet, so there is no other way to pass the sample size.
+READ_COL_LIMIT: contextvars.ContextVar[int] = contextvars.ContextVar("READ_COL_LIMIT", default=PEEK_LINES)
+
 
 def read_col(column, schema_helper, infile, use_cat=False, selfmade=False, assign=None, catdef=None, row_filter=None):
     """Using the given metadata, read one column in one row-group.
@@ -170,5 +176,5 @@ def read_col(column, schema_helper, infile, use_cat=False, selfmade=False, assig
         num += len(defi) if defi is not None else len(val)
 
         # PATCH for Skeem: Terminate `read_col` early, in order to not load the whole file.
-        if num >= PEEK_LINES:
+        if num >= READ_COL_LIMIT.get():
             break
@@ -0,0 +1,238 @@
+import io
+import logging
+import struct
+import typing as t
+from pathlib import Path
+
+import pandas as pd
+from fastparquet import ParquetFile, parquet_thrift
+from fastparquet.cencoding import ThriftObject
+from frictionless import Field, Schema, fields
+
+import skeem.cardinality
+import skeem.io
+from skeem.autopk import infer_pk_from_names
+from skeem.fastparquet.core import READ_COL_LIMIT
+from skeem.settings import PARQUET_FOOTER_BYTES, PEEK_LINES
+
+logger = logging.getLogger(__name__)
+
+PARQUET_MAGIC = b"PAR1"
+
+ConvertedType = parquet_thrift.ConvertedType
+FieldRepetitionType = parquet_thrift.FieldRepetitionType
+PhysicalType = parquet_thrift.Type
+
+
+def read_footer(reader: t.Callable[[int], bytes]) -> bytes:
+    """
+    Read the footer of a Parquet file, i.e. its metadata section, without touching any data pages.
+
+    `reader` is a function which returns the last N bytes of the file. It will be invoked
+    once, or twice when the footer is larger than `PARQUET_FOOTER_BYTES`.
+
+    The returned buffer is `<metadata><length><PAR1>`, which is enough for
+    `fastparquet.ParquetFile` to decode the schema and the row group statistics.
+    """
+    tail = reader(PARQUET_FOOTER_BYTES)
+    if len(tail) < 8 or tail[-4:] != PARQUET_MAGIC:
+        raise ValueError("Unable to read Parquet footer. Reason: Magic bytes not found")
+    footer_size = struct.unpack("<I", tail[-8:-4])[0] + 8
+    if footer_size > len(tail):
+        logger.info(f"Parquet footer is larger than {PARQUET_FOOTER_BYTES} bytes, reading {footer_size} bytes")
+        tail = reader(footer_size)
+    return tail[-footer_size:]
+
+
+class ParquetSchema:
+    """
+    Infer table schema from the metadata of a Parquet file.
+
+    The column types are derived from the physical and logical types within the
+    file's schema, and the primary key is inferred from column names and row group
+    statistics. Only columns with ambiguous types, like `BYTE_ARRAY` without any
+    annotation, need a tiny sample of data, which is acquired from `source`.
+    """
+
+    def __init__(
+        self, footer: bytes, source: t.Optional[t.Union[t.IO, Path, str]] = None, peek_lines: int = PEEK_LINES
+    ):
+        self.pf = ParquetFile(io.BytesIO(footer))
+        self.source = source
+        self.peek_lines = peek_lines
+
+    @property
+    def columns(self) -> t.List[str]:
+        """
+        Column names, index columns first, like pandas and frictionless would present them.
+        """
+        index_columns = [
+            column for column in self.pf.pandas_metadata.get("index_columns", []) if isinstance(column, str)
+        ]
+        columns = list(self.pf.columns)
+        return [column for column in index_columns if column in columns] + [
+            column for column in columns if column not in index_columns
+        ]
+
+    def dtype(self, column: str):
+        """
+        The pandas dtype fastparquet would use when reading the column.
+        """
+        return pd.api.types.pandas_dtype(self.pf.dtypes[column])
+
+    def schema_element(self, column: str) -> ThriftObject:
+        return self.pf.schema.schema_element([column])
+
+    def is_ambiguous(self, column: str) -> bool:
+        """
+        Whether the column type can not be derived from the Parquet schema alone.
+        """
+        se = self.schema_element(column)
+        if se.num_children:
+            return False
+        return (
+            se.type in [PhysicalType.BYTE_ARRAY, PhysicalType.FIXED_LEN_BYTE_ARRAY]
+            and se.converted_type is None
+            and not self._has_logical_type(se)
+        )
+
+    def to_frictionless(self) -> Schema:
+        """
+        Converge Parquet metadata into frictionless `Schema` instance.
+        """
+        ambiguous = [column for column in self.columns if self.is_ambiguous(column)]
+        sample = self.sample(ambiguous) if ambiguous else pd.DataFrame()
+
+        schema = Schema()
+        for column in self.columns:
+            if column in sample:
+                field = self._field_from_sample(column, sample[column])
+            else:
+                field = self._field_from_metadata(column)
+            se = self.schema_element(column)
+            field.required = se.repetition_type == FieldRepetitionType.REQUIRED
+            schema.add_field(field)
+        return schema
+
+    def infer_pk(self) -> t.Optional[str]:
+        """
+        Attempt to infer primary key from column names, statistics, or a tiny sample of the first column.
+        """
+        columns = self.columns
+        logger.info(f"Decoded list of column names: {columns}")
+        pk = infer_pk_from_names(columns)
+        if pk is not None or not columns:
+            return pk
+
+        # If the values of the first column are unique, use that as primary key.
+        column = columns[0]
+        if self.dtype(column).kind in ["f", "M"]:
+            return None
+        is_unique = self._is_unique_by_statistics(column)
+        if is_unique is None and self.source is not None:
+            series = self.sample([column])[column]
+            try:
+                is_unique = series.isna().sum() <= 1 and skeem.cardinality.is_unique(series)
+            except Exception as ex:
+                logger.info(f"WARNING: Unable to use '{column}' as primary key. Uniqueness check failed. Reason: {ex}")
+        if is_unique:
+            return column
+        return None
+
+    def sample(self, columns: t.List[str]) -> pd.DataFrame:
+        """
+        Read a tiny sample of data, only for the given columns.
+        """
+        if self.source is None:
+            raise ValueError(f"Unable to sample columns {columns} without data source")
+        logger.info(f"Reading sample of {self.peek_lines} records for columns {columns}")
+        if isinstance(self.source, (Path, str)):
+            with skeem.io.open(self.source) as f:
+                return self._head(f, columns)
+        return self._head(self.source, columns)
+
+    def _head(self, source: t.IO, columns: t.List[str]) -> pd.DataFrame:
+        pf = ParquetFile(source)
+        token = READ_COL_LIMIT.set(self.peek_lines)
+        try:
+            return pf.head(self.peek_lines, columns=columns)
+        finally:
+            READ_COL_LIMIT.reset(token)
+
+    def _is_unique_by_statistics(self, column: str) -> t.Optional[bool]:
+        """
+        Decide uniqueness by comparing `distinct_count` with the number of rows.
+        Distinct counts can not be added up across row groups, so this only works for a single one.
+        """
+        statistics = self.pf.statistics
+        distinct_counts = statistics["distinct_count"].get(column, [])
+        null_counts = statistics["null_count"].get(column, [])
+        if len(self.pf.row_groups) != 1 or None in distinct_counts:
+            return None
+        if any(null_counts):
+            return False
+        return distinct_counts[0] == self.pf.count()
+
+    def _field_from_metadata(self, column: str) -> Field:
+        se = self.schema_element(column)
+        logical = se.logicalType
+        converted = se.converted_type
+
+        # Nested types.
+        if converted == ConvertedType.LIST or (logical is not None and logical.LIST is not None):
+            return fields.ArrayField(name=column)
+        if se.num_children or converted in [ConvertedType.MAP, ConvertedType.MAP_KEY_VALUE]:
+            return fields.ObjectField(name=column)
+        if converted in [ConvertedType.JSON, ConvertedType.BSON] or (
+            logical is not None and (logical.JSON is not None or logical.BSON is not None)
+        ):
+            return fields.ObjectField(name=column)
+
+        # Temporal types.
+        if converted == ConvertedType.DATE or (logical is not None and logical.DATE is not None):
+            return fields.DateField(name=column)
+        if converted in [ConvertedType.TIME_MILLIS, ConvertedType.TIME_MICROS] or (
+            logical is not None and logical.TIME is not None
+        ):
+            return fields.TimeField(name=column)
+
+        # Decimal types are stored as integers or byte arrays.
+        if converted == ConvertedType.DECIMAL or (logical is not None and logical.DECIMAL is not None):
+            return fields.NumberField(name=column)
+
+        # Everything else can be derived from the pandas dtype fastparquet would use.
+        dtype = self.dtype(column)
+        if dtype.kind in ["i", "u"]:
+            return fields.IntegerField(name=column)
+        if dtype.kind == "f":
+            return fields.NumberField(name=column)
+        if dtype.kind == "b":
+            return fields.BooleanField(name=column)
+        if dtype.kind == "M":
+            return fields.DatetimeField(name=column)
+        if dtype.kind == "m":
+            return fields.DurationField(name=column)
+        return fields.StringField(name=column)
+
+    @staticmethod
+    def _field_from_sample(column: str, series: pd.Series) -> Field:
+        """
+        Un-annotated byte arrays are strings, when all sampled values decode as UTF-8.
+        """
+        for value in series.dropna():
+            if isinstance(value, bytes):
+                try:
+                    value.decode("utf-8")
+                except UnicodeDecodeError:
+                    return fields.AnyField(name=column)
+        return fields.StringField(name=column)
+
+    @staticmethod
+    def _has_logical_type(se: ThriftObject) -> bool:
+        logical = se.logicalType
+        if logical is None:
+            return False
+        return any(
+            getattr(logical, name) is not None
+            for name in ["STRING", "ENUM", "DECIMAL", "JSON", "BSON", "UUID", "DATE", "TIME", "TIMESTAMP"]
+        )
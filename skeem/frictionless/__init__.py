@@ -0,0 +1,3 @@
+from skeem.frictionless import monkey
+
+monkey.activate()
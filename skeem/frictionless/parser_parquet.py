@@ -0,0 +1,25 @@
+def read_cell_stream_create(self):
+    """
+    Patch to frictionless Parquet reader to apply the sample size of the resource.
+    """
+    from frictionless.formats import ParquetControl
+    from frictionless.platform import platform
+    from frictionless.resources import TableResource
+
+    control = ParquetControl.from_dialect(self.resource.dialect)
+    handle = self.resource.normpath
+    if self.resource.remote:
+        handles = platform.pandas.io.common.get_handle(self.resource.normpath, "rb", is_text=False)
+        handle = handles.handle
+    pq = platform.pyarrow_parquet
+    table = pq.read_table(
+        handle,
+        columns=control.columns,
+        filters=control.filters or None,
+    )
+    df = table.to_pandas(categories=control.categories or None)
+    # TODO: Submit patch to upstream.
+    # PATCH for Skeem: Propagate the detector, so the pandas parser does not truncate
+    #                  the data to the default sample size of 100 rows.
+    with TableResource(data=df, format="pandas", detector=self.resource.detector) as resource:
+        yield from resource.cell_stream
@@ -1,19 +1,26 @@
 import io
+import itertools
+import json
 import logging
+import random
+import re
+import shutil
 import tempfile
 import typing as t
 from collections import OrderedDict
 from pathlib import Path
 
-import fsspec
-import pandas as pd
-from fsspec.implementations.local import LocalFileOpener
-from fsspec.spec import AbstractBufferedFile
-
-from skeem.settings import PEEK_BYTES, PEEK_LINES
-from skeem.types import ContentType, ContentTypeGroup
+from skeem.settings import (
+    DATASET_BLOCK_BYTES,
+    DATASET_SAMPLE_MAX_POINTS,
+    PEEK_LINES,
+    SAMPLE_SEED,
+    SAMPLE_SEGMENTS,
+)
+from skeem.types import Compression, ContentType, ContentTypeGroup, SamplingStrategy
 
 if t.TYPE_CHECKING:
+    import pandas as pd
     import xarray
 
 
@@ -22,30 +29,204 @@ logger = logging.getLogger(__name__)
 
 BytesString = t.Union[bytes, str]
 BytesStringList = t.List[BytesString]
+AnyLine = t.TypeVar("AnyLine", bytes, str)
 
 
-def open(path: t.Union[Path, str]):  # noqa: A001
+def open(path: t.Union[Path, str], compression: t.Optional[Compression] = None):  # noqa: A001
     """
     Access a plethora of resources using `fsspec`.
+
+    Compressed resources are decompressed transparently while reading, using the
+    compression format derived from the filename extension, or the given one.
     """
+    import fsspec
+
     path = str(path)
+    kwargs = fsspec_options(path)
+
+    compression = compression or Compression.from_filename(path)
+    if compression is not None:
+        kwargs["compression"] = codec_name(compression)
+    fs = fsspec.open(path, mode="rb", **kwargs).open()
+    return fs
+
+
+def open_random_access(path: t.Union[Path, str]) -> t.IO:
+    """
+    Open a resource for random access, like gridded datasets, without reading it as a whole.
+
+    Local files are opened directly, so that they can be memory-mapped by path, see
+    `dataset_path`. Remote resources are opened using `fsspec` with a block cache, so
+    that only the blocks needed for the header and for the sample will be fetched.
+    """
+    import fsspec
+    from fsspec.implementations.local import LocalFileSystem
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+    if isinstance(fs, LocalFileSystem):
+        return Path(fspath).open("rb")
+    return fs.open(fspath, mode="rb", cache_type="blockcache", block_size=DATASET_BLOCK_BYTES)
+
+
+def dataset_path(data: t.IO[t.Any]) -> t.Optional[str]:
+    """
+    Return the path of a file object when it refers to a local file, in order to open it by path.
+    """
+    name = getattr(data, "name", None)
+    if isinstance(name, str) and Path(name).is_file():
+        return name
+    return None
+
+
+def netcdf_engine(data: t.IO[t.Any]) -> str:
+    """
+    Select the `xarray` backend engine for reading NetCDF data by its byte signature.
+    NetCDF4 files are HDF5 files, while NetCDF3 files can be read using SciPy.
+    """
+    from skeem.sniff import HDF5_MAGIC
+
+    data.seek(0)
+    magic = data.read(len(HDF5_MAGIC))
+    data.seek(0)
+    return "h5netcdf" if magic == HDF5_MAGIC else "scipy"
+
+
+def decompress(data: t.IO[t.Any], compression: Compression) -> t.IO[t.Any]:
+    """
+    Wrap a stream into a decompressing stream, which decompresses data incrementally while reading.
+    """
+    import fsspec.compression
+
+    return fsspec.compression.compr[codec_name(compression)](data, mode="rb")
+
+
+def codec_name(compression: Compression) -> str:
+    """
+    Resolve name of the `fsspec` codec for compression format, and croak when it is not available.
+    """
+    import fsspec.compression
+
+    if compression.value not in fsspec.compression.compr:
+        raise ValueError(
+            f"Decompressing '{compression.value}' needs an additional package. "
+            f"Please install it using `pip install 'skeem[compression]'`."
+        )
+    return compression.value
+
+
+def expand_paths(
+    inputs: t.Iterable[t.Union[Path, str]], manifest: t.Optional[t.Union[Path, str]] = None
+) -> t.List[str]:
+    """
+    Resolve a list of input paths, URLs, and glob patterns, and an optional
+    manifest file containing one input per line, into a list of resources.
+
+    Glob patterns are expanded using `fsspec`, so they work on remote
+    file systems like S3 or GCS as well.
+    """
+    import fsspec
+
+    items = [str(item) for item in inputs]
+    if manifest is not None:
+        with fsspec.open(str(manifest), mode="rt", **fsspec_options(str(manifest))) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    items.append(line)
+
+    paths: t.List[str] = []
+    for item in items:
+        if fsspec.core.has_magic(item):
+            fs, _ = fsspec.core.url_to_fs(item, **fsspec_options(item))
+            matches = sorted(fs.glob(item))
+            if not matches:
+                logger.info(f"WARNING: No resources found for pattern {item}")
+            paths += [fs.unstrip_protocol(match) if "://" in item else match for match in matches]
+        else:
+            paths.append(item)
+    return paths
+
+
+def fsspec_options(path: str) -> t.Dict[str, t.Any]:
+    """
+    Compute `fsspec` storage options for accessing a resource.
+    """
     kwargs: t.Dict[str, t.Any] = {}
     if path.startswith("s3"):
         kwargs["anon"] = True
+    return kwargs
 
-    # TODO: Why isn't compression selected transparently?
-    if path.endswith(".gz"):
-        kwargs["compression"] = "gzip"
-    fs = fsspec.open(path, mode="rb", **kwargs).open()
-    return fs
+
+def fsspec_size(path: t.Union[Path, str]) -> int:
+    """
+    Inquire the size of a resource, without reading any data.
+    """
+    import fsspec
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+    return fs.size(fspath)
+
+
+def fsspec_info(path: t.Union[Path, str]) -> t.Dict[str, t.Any]:
+    """
+    Inquire metadata of a resource, like its size, ETag, or modification time, without reading any data.
+    """
+    import fsspec
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+    return fs.info(fspath)
+
+
+def read_tail(path: t.Union[Path, str], nbytes: int, size: t.Optional[int] = None) -> bytes:
+    """
+    Read the last bytes of a resource, using a single ranged request.
+
+    On remote file systems like HTTP, S3, or GCS, this will only transfer the
+    requested amount of bytes, instead of prefetching whole blocks of data.
+    """
+    import fsspec
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+    if size is None:
+        size = fs.size(fspath)
+    start = max(0, size - nbytes)
+    logger.info(f"Reading {size - start} bytes from the end of {path}")
+    return fs.cat_file(fspath, start=start, end=size)
+
+
+def stream_read_tail(data: t.IO[t.Any], nbytes: int) -> bytes:
+    """
+    Read the last bytes of a stream. Non-seekable streams need to be consumed as a whole.
+    """
+    if hasattr(data, "seekable") and data.seekable():
+        data.seek(0, io.SEEK_END)
+        size = data.tell()
+        data.seek(max(0, size - nbytes))
+        return data.read()
+    payload = data.read()
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return payload[-nbytes:]
 
 
 def peek(
-    data: t.IO[t.Any], content_type: t.Optional[ContentType] = None, peek_bytes: int = None, peek_lines: int = None
+    data: t.IO[t.Any],
+    content_type: t.Optional[ContentType] = None,
+    peek_bytes: int = None,
+    peek_lines: int = None,
+    address: t.Optional[str] = None,
 ) -> t.IO:
     """
     Only peek at the first bytes/lines of data.
+
+    For JSON documents, `address` selects the records from a nested node, see `json_path_segments`.
     """
+    from fsspec.implementations.local import LocalFileOpener
+    from fsspec.spec import AbstractBufferedFile
 
     # Only optionally seek to the file's beginning.
     # if hasattr(data, "seekable") and data.seekable():  # noqa: ERA001
@@ -55,9 +236,9 @@ def peek(
         logger.info(f"WARNING: Hitting a speed bump by needing to read file of type {content_type} as a whole")
         return io.BytesIO(data.read())
     else:
+        payload: BytesString
         if content_type is ContentType.JSON:
-            logger.info("WARNING: Hitting a speed bump by needing to read JSON document as a whole")
-            payload = data.read()
+            payload = json_peek(data, nrecords=peek_lines or PEEK_LINES, path=address)
         else:
             empty: t.Union[bytes, str]
             is_binary = False
@@ -68,7 +249,7 @@ def peek(
                     is_binary = data.mode == 1
                 else:
                     raise ValueError(f"Unsupported type for data.mode={data.mode}, type={type(data.mode)}")
-            if isinstance(data, io.BytesIO) or is_binary:
+            if isinstance(data, io.BufferedIOBase) or is_binary:
                 empty = b""  # type: ignore[assignment]
             else:
                 empty = ""
@@ -81,7 +262,7 @@ def peek(
                 payload = data
             elif hasattr(data, "readlines"):
                 # https://lwn.net/Articles/816415/
-                payload = empty.join(data.readlines(peek_bytes))  # type: ignore[arg-type]
+                payload = empty.join(data.readlines(peek_bytes)[:peek_lines])  # type: ignore[arg-type]
             else:
                 raise TypeError(f"No method for peeking at data, type={type(data).__name__}")
 
@@ -115,9 +296,13 @@ def fsspec_peek(
     more_data = data.read(1)
     is_partial_read = more_data != "" and more_data != b""
 
-    # Strip last line, only if it is incomplete.
+    # Strip last line, only if it is incomplete. When the first line is longer than
+    # the amount of bytes, complete it, in order to receive at least one line.
     if is_partial_read:
-        lines = strip_incomplete_line(lines)
+        complete_lines = strip_incomplete_line(lines)
+        if lines and not complete_lines:
+            complete_lines = [lines[0] + more_data + data.readline()]
+        lines = complete_lines
 
     # Trim to requested amount of lines.
     lines = lines[:peek_lines]
@@ -128,19 +313,446 @@ def fsspec_peek(
     return payload
 
 
+def fsspec_peek_ranged(
+    path: t.Union[Path, str], peek_bytes: int = None, peek_lines: int = None, max_bytes: int = None
+) -> bytes:
+    """
+    Peek at the first lines of a resource using exact ranged reads, instead of relying
+    on the block size and read-ahead caching of the corresponding `fsspec` file system,
+    which often prefetches several megabytes from HTTP, S3, or GCS.
+
+    Start by reading `peek_bytes`, and double the range until `peek_lines` complete lines
+    have been received, the end of the resource has been reached, or the byte budget
+    `max_bytes` is exhausted. Subsequent requests only fetch the missing range.
+    """
+    import fsspec
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+
+    # Inquiring the size upfront avoids requesting ranges beyond the end of the resource.
+    size = fs.size(fspath)
+
+    payload = b""
+    length = peek_bytes
+    while True:
+        # Compute the end of the next range. `None` means to read until the end of the resource.
+        end = length
+        if max_bytes is not None:
+            end = max_bytes if end is None else min(end, max_bytes)
+        if size is not None and end is not None:
+            end = min(end, size)
+
+        requested = None if end is None else end - len(payload)
+        logger.info(f"Reading bytes {len(payload)}-{end} of {path}")
+        chunk = fs.cat_file(fspath, start=len(payload), end=end) if requested != 0 else b""
+
+        # When the server does not honor range requests, it will respond with the whole resource.
+        if requested is not None and len(chunk) > requested:
+            logger.info("WARNING: Range request not honored, received whole resource")
+            payload = chunk
+            is_eof = True
+            break
+
+        payload += chunk
+        is_eof = requested is None or len(chunk) < requested or (size is not None and len(payload) >= size)
+        is_budget_exhausted = max_bytes is not None and len(payload) >= max_bytes
+        has_enough_lines = peek_lines is None or payload.count(b"\n") >= peek_lines
+        if is_eof or is_budget_exhausted or has_enough_lines or length is None:
+            break
+        length *= 2
+
+    lines: BytesStringList = payload.splitlines(keepends=True)  # type: ignore[assignment]
+
+    # Strip last line, only if it is incomplete.
+    if lines and not is_eof:
+        lines = strip_incomplete_line(lines)
+
+    # Trim to requested amount of lines.
+    lines = lines[:peek_lines]
+    logger.info(f"Received {len(lines)} lines")
+
+    return b"".join(lines)  # type: ignore[arg-type]
+
+
+def fsspec_sample_ranged(
+    path: t.Union[Path, str],
+    strategy: SamplingStrategy,
+    peek_bytes: int,
+    peek_lines: int,
+    max_bytes: int,
+) -> bytes:
+    """
+    Sample lines from multiple segments of a resource using exact ranged reads,
+    see `sample_ranged`.
+    """
+    import fsspec
+
+    path = str(path)
+    fs, fspath = fsspec.core.url_to_fs(path, **fsspec_options(path))
+
+    def read_range(start: int, end: int) -> bytes:
+        logger.info(f"Reading bytes {start}-{end} of {path}")
+        return fs.cat_file(fspath, start=start, end=end)
+
+    return sample_ranged(
+        read_range,
+        size=fs.size(fspath),
+        strategy=strategy,
+        peek_bytes=peek_bytes,
+        peek_lines=peek_lines,
+        max_bytes=max_bytes,
+    )
+
+
+def stream_sample(
+    data: t.IO[t.Any],
+    strategy: SamplingStrategy,
+    peek_bytes: int,
+    peek_lines: int,
+    max_bytes: int,
+) -> bytes:
+    """
+    Sample lines from multiple segments of a seekable stream, see `sample_ranged`.
+    """
+    data.seek(0, io.SEEK_END)
+    size = data.tell()
+
+    def read_range(start: int, end: int) -> bytes:
+        data.seek(start)
+        payload = data.read(end - start)
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return payload
+
+    try:
+        return sample_ranged(
+            read_range,
+            size=size,
+            strategy=strategy,
+            peek_bytes=peek_bytes,
+            peek_lines=peek_lines,
+            max_bytes=max_bytes,
+        )
+    finally:
+        data.seek(0)
+
+
+def is_seekable(data: t.Any) -> bool:
+    """
+    Whether a stream can be read from arbitrary offsets. Text files can not, because
+    their offsets are opaque numbers.
+    """
+    return hasattr(data, "seekable") and data.seekable() and not isinstance(data, io.TextIOWrapper)
+
+
+class ReplayReader(io.RawIOBase):
+    """
+    Read from a stream, replaying bytes which have been consumed from it already.
+    """
+
+    mode = "rb"
+
+    def __init__(self, prefix: bytes, data: t.IO[bytes]):
+        self.prefix = prefix
+        self.data = data
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        if self.prefix:
+            size = min(len(buffer), len(self.prefix))
+            buffer[:size] = self.prefix[:size]
+            self.prefix = self.prefix[size:]
+            return size
+        chunk = self.data.read(len(buffer))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+    def close(self):
+        self.data.close()
+        super().close()
+
+
+def read_prefix(data: t.IO[t.Any], nbytes: int) -> t.Tuple[bytes, t.IO[t.Any]]:
+    """
+    Read the first bytes of a stream, and return them together with a stream which
+    will yield the same bytes again, so that consuming them does not cost extra I/O.
+
+    Seekable streams are rewound, others are wrapped into a `ReplayReader`.
+    """
+    if is_seekable(data):
+        position = data.tell()
+        prefix = data.read(nbytes)
+        data.seek(position)
+    else:
+        prefix = data.read(nbytes)
+        if isinstance(prefix, str):
+            data = io.StringIO(prefix + data.read())
+        else:
+            data = io.BufferedReader(ReplayReader(prefix, data))
+    if isinstance(prefix, str):
+        prefix = prefix.encode()
+    return prefix, data
+
+
+def read_lines_prefix(data: t.IO[t.Any], nbytes: int) -> bytes:
+    """
+    Read about the first `nbytes` bytes of a stream, completing the last line, so that
+    no line is truncated. This does not need to consume the stream as a whole.
+    """
+    payload = data.read(nbytes)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    if payload and not payload.endswith(b"\n"):
+        rest = data.readline()
+        payload += rest.encode() if isinstance(rest, str) else rest
+    return payload
+
+
+def sample_ranged(
+    read_range: t.Callable[[int, int], bytes],
+    size: int,
+    strategy: SamplingStrategy,
+    peek_bytes: int,
+    peek_lines: int,
+    max_bytes: int,
+    segments: int = SAMPLE_SEGMENTS,
+    seed: int = SAMPLE_SEED,
+) -> bytes:
+    """
+    Sample lines from multiple segments of a line-based resource, in order to catch
+    type changes deep within the resource, without reading it entirely.
+
+    When the resource fits into the byte budget `max_bytes`, it is read as a whole, and
+    lines are selected from all of them. Otherwise, the byte budget and the number of
+    lines are distributed evenly across segments, which are read at evenly spaced offsets
+    (`stride`), at random offsets within each stride (`reservoir`), or from the beginning
+    and the end of the resource (`tail+head`). Segments which do not start at a line
+    boundary skip their first, partial, line.
+
+    The first segment always starts at the beginning of the resource, so the header line
+    of CSV files is retained. Segments never overlap, so no line is sampled twice.
+    """
+    if size <= max_bytes:
+        lines = read_range(0, size).splitlines(keepends=True)
+        return b"".join(ensure_newline(sample_lines(lines, peek_lines, strategy, seed=seed)))
+
+    count = 2 if strategy is SamplingStrategy.TAIL_HEAD else max(1, min(segments, peek_lines))
+    stride = size // count
+    segment_bytes = max(1, max_bytes // count)
+    segment_peek_bytes = max(1, min(peek_bytes // count, segment_bytes))
+    rng = random.Random(seed)  # noqa: S311
+
+    sample: t.List[bytes] = []
+    offset = 0
+    for index in range(count):
+        nlines = peek_lines // count + (1 if index < peek_lines % count else 0)
+        if index == 0:
+            offset = 0
+        else:
+            # Each segment reads at most `segment_bytes`, so start the next one beyond them,
+            # in order to never sample the same lines twice.
+            previous = offset + segment_bytes
+            if strategy is SamplingStrategy.RESERVOIR:
+                offset = index * stride + rng.randrange(max(1, stride - segment_bytes))
+            else:
+                offset = index * stride
+            offset = max(offset, previous)
+            if offset >= size:
+                break
+        lines = read_lines_at(
+            read_range,
+            size=size,
+            offset=offset,
+            peek_lines=nlines,
+            peek_bytes=segment_peek_bytes,
+            max_bytes=segment_bytes,
+            from_end=strategy is SamplingStrategy.TAIL_HEAD and index > 0,
+        )
+        sample += ensure_newline(lines)
+
+    logger.info(f"Sampled {len(sample)} lines from {count} segments using strategy '{strategy.value}'")
+    return b"".join(sample)
+
+
+def read_lines_at(
+    read_range: t.Callable[[int, int], bytes],
+    size: int,
+    offset: int,
+    peek_lines: int,
+    peek_bytes: int,
+    max_bytes: int,
+    from_end: bool = False,
+) -> t.List[bytes]:
+    """
+    Read `peek_lines` complete lines starting at `offset`, or the last lines of the resource
+    when `from_end` is given. Like `fsspec_peek_ranged`, start by reading `peek_bytes`, and
+    double the range until enough lines have been received, or the byte budget `max_bytes`
+    is exhausted. Subsequent requests only fetch the missing range.
+    """
+    payload = b""
+    # Ranges not starting at the beginning of the resource include the preceding byte,
+    # in order to tell whether the first line is complete.
+    start = end = size if from_end else max(0, offset - 1)
+    length = peek_bytes
+    while True:
+        length = min(length, max_bytes)
+        if from_end:
+            start, missing = max(0, size - length - 1), start
+            payload = read_range(start, missing) + payload
+        else:
+            end, missing = min(start + length + (start > 0), size), end
+            payload += read_range(missing, end)
+
+        lines = payload.splitlines(keepends=True)
+
+        # Skip the first, partial or empty, line, and strip the last line when it is incomplete.
+        if start > 0:
+            lines = lines[1:]
+        if lines and end < size:
+            lines = t.cast(t.List[bytes], strip_incomplete_line(t.cast(BytesStringList, lines)))
+
+        is_bounded = start == 0 if from_end else end >= size
+        if len(lines) >= peek_lines or length >= max_bytes or is_bounded:
+            break
+        length *= 2
+
+    if from_end:
+        return lines[-peek_lines:]
+    return lines[:peek_lines]
+
+
+def sample_lines(
+    lines: t.List[AnyLine], nlines: int, strategy: SamplingStrategy, seed: int = SAMPLE_SEED
+) -> t.List[AnyLine]:
+    """
+    Select `nlines` lines using the given sampling strategy, always retaining the first line.
+
+    >>> lines = [str(i) for i in range(10)]
+    >>> sample_lines(lines, 4, SamplingStrategy.HEAD)
+    ['0', '1', '2', '3']
+    >>> sample_lines(lines, 4, SamplingStrategy.STRIDE)
+    ['0', '2', '5', '7']
+    >>> sample_lines(lines, 4, SamplingStrategy.TAIL_HEAD)
+    ['0', '1', '8', '9']
+    >>> len(sample_lines(lines, 4, SamplingStrategy.RESERVOIR))
+    4
+    """
+    if len(lines) <= nlines:
+        return lines
+    if strategy is SamplingStrategy.HEAD or nlines <= 1:
+        return lines[:nlines]
+    if strategy is SamplingStrategy.TAIL_HEAD:
+        head = nlines - nlines // 2
+        return lines[:head] + lines[len(lines) - (nlines - head) :]
+    if strategy is SamplingStrategy.STRIDE:
+        indexes = [index * len(lines) // nlines for index in range(nlines)]
+    else:
+        rng = random.Random(seed)  # noqa: S311
+        indexes = [0] + sorted(rng.sample(range(1, len(lines)), nlines - 1))
+    return [lines[index] for index in indexes]
+
+
+def ensure_newline(lines: t.List[bytes]) -> t.List[bytes]:
+    """
+    Terminate the last line with a newline character, so that sampled segments can be concatenated.
+    """
+    if lines and not lines[-1].endswith(b"\n"):
+        lines = lines[:-1] + [lines[-1] + b"\n"]
+    return lines
+
+
 def dataset_to_dataframe(
     ds: "xarray.Dataset",
     peek_lines: int,
-) -> pd.DataFrame:
+    max_points: int = DATASET_SAMPLE_MAX_POINTS,
+) -> "pd.DataFrame":
+    """
+    Sample the first `peek_lines` records without missing values of an `xarray.Dataset`.
+
+    Instead of converting the whole dataset, which builds the Cartesian product of all
+    dimensions in memory, small windows of grid points are selected using `isel`, and
+    converted one by one, in the same order `Dataset.to_dataframe()` would produce
+    them. Variables are loaded lazily, so only the selected windows are read.
+
+    In order to skip over missing values, at most `max_points` grid points are visited.
+    When all of them have missing values, the first window is sampled as-is.
+    """
+    import numpy as np
+    import pandas as pd
+
     logger.info(f"Dataset:\n{ds}")
-    df = ds.to_dataframe().dropna()
-    logger.debug(f"DataFrame:\n{df}")
     logger.info(f"Reading {peek_lines} records of `xarray.Dataset`")
-    df = df[:peek_lines]
+
+    # Index dimensions without coordinates by position, so that windows keep their offsets.
+    ds = ds.assign_coords({dim: np.arange(size) for dim, size in ds.sizes.items() if dim not in ds.coords})
+    frames = []
+    first = None
+    count = 0
+    for window in dataset_windows(ds.sizes, size=peek_lines, max_points=max_points):
+        df = ds.isel(window).to_dataframe()
+        if first is None:
+            first = df
+        df = df.dropna()
+        frames.append(df)
+        count += len(df)
+        if count >= peek_lines:
+            break
+    if count == 0 and first is not None:
+        logger.info("WARNING: Unable to find records without missing values, sampling them as-is")
+        frames = [first]
+    df = pd.concat(frames).iloc[:peek_lines]
+    logger.debug(f"DataFrame:\n{df}")
     df = df.reset_index()
     return df
 
 
+def dataset_windows(
+    sizes: t.Mapping[t.Hashable, int], size: int, max_points: int = DATASET_SAMPLE_MAX_POINTS
+) -> t.Iterator[t.Dict[t.Hashable, slice]]:
+    """
+    Partition the grid of a dataset into windows of up to `size` grid points, in row-major order,
+    suitable for `Dataset.isel`. Stop after visiting `max_points` grid points.
+
+    Trailing dimensions which fit into a window are selected as a whole. The dimension
+    before them is stepped through, and all leading dimensions are iterated point by point.
+
+    >>> windows = list(dataset_windows({"time": 2, "lat": 3, "lon": 4}, size=8))
+    >>> len(windows)
+    4
+    >>> windows[1]
+    {'time': slice(0, 1, None), 'lat': slice(2, 4, None)}
+    """
+    import numpy as np
+
+    dims = list(sizes)
+    index = len(dims)
+    block = 1
+    while index > 0 and block * sizes[dims[index - 1]] <= size:
+        index -= 1
+        block *= sizes[dims[index]]
+
+    # The whole grid fits into a single window.
+    if index == 0:
+        yield {}
+        return
+
+    dim = dims[index - 1]
+    step = max(1, size // block)
+    leading = dims[: index - 1]
+    visited = 0
+    for position in np.ndindex(*[sizes[name] for name in leading]):
+        for start in range(0, sizes[dim], step):
+            window = {name: slice(offset, offset + 1) for name, offset in zip(leading, position)}
+            window[dim] = slice(start, start + step)
+            yield window
+            visited += min(step, sizes[dim] - start) * block
+            if visited >= max_points:
+                return
+
+
 def strip_incomplete_line(lines: BytesStringList) -> BytesStringList:
     """
     Strip last line, only if it is incomplete.
@@ -154,8 +766,18 @@ def strip_incomplete_line(lines: BytesStringList) -> BytesStringList:
     return lines
 
 
+def json_peek(data: t.Union[t.IO, t.Iterable], nrecords: int = PEEK_LINES, path: t.Optional[str] = None) -> bytes:
+    """
+    Only peek at the first records of a JSON document, and serialize them into a JSON document again.
+
+    The document is parsed incrementally, so only the bytes up to the last sampled record will be read.
+    """
+    records = json_get_first_records(data, nrecords=nrecords, path=path)
+    return json.dumps(records).encode()
+
+
 def json_get_first_records(
-    data: t.Union[t.IO, t.Iterable], nrecords: int = 5
+    data: t.Union[t.IO, t.Iterable], nrecords: int = 5, path: t.Optional[str] = None
 ) -> t.List[t.OrderedDict[t.AnyStr, t.Any]]:
     """
     Read JSON data lazily, without loading the whole document into memory.
@@ -163,11 +785,18 @@ def json_get_first_records(
     - From a "list of objects" JSON document, get only the first N records.
     - From a "single object" JSON document, get only the first record.
 
+    When `path` is given, like `data.items[*]`, records are selected from the nested
+    node at this path, see `json_path_segments`.
+
+    `json_stream` uses its Rust tokenizer, when `json-stream-rs-tokenizer` is installed.
+
     TODO: Raise from nrecords=5 to nrecords=100?
     """
     import json_stream
     from json_stream.base import StreamingJSONList, StreamingJSONObject
 
+    segments = json_path_segments(path)
+
     try:
         stream = json_stream.load(data)
     except StopIteration as ex:
@@ -175,44 +804,171 @@ def json_get_first_records(
     except Exception as ex:
         raise ValueError(f"Unable to parse JSON document in streaming mode. Reason: {ex}") from ex
 
+    # Descend into the node at the given path, skipping over preceding nodes without materializing them.
+    for segment in segments:
+        if isinstance(stream, StreamingJSONList) and isinstance(segment, str) and segment.isdigit():
+            segment = int(segment)
+        try:
+            stream = stream[segment]
+        except (IndexError, KeyError, TypeError) as ex:
+            raise ValueError(f"Unable to select JSON path '{path}'. Reason: Segment '{segment}' not found") from ex
+
     if isinstance(stream, StreamingJSONList):
         records = []
         for index in range(nrecords):
             try:
-                record = OrderedDict(stream[index].items())
+                record = OrderedDict(json_stream.to_standard_types(stream[index]).items())
                 records.append(record)
             except IndexError:
                 break
         return records
 
     elif isinstance(stream, StreamingJSONObject):
-        record = OrderedDict(stream.items())
+        record = OrderedDict(json_stream.to_standard_types(stream).items())
         records = [record]
         return records
 
+    if segments:
+        raise ValueError(f"Unable to select JSON path '{path}'. Reason: Node is neither object nor array")
     return []  # pragma: no cover
 
 
-def read_lineprotocol(data: t.IO[t.Any]):
+def json_path_segments(path: t.Optional[str]) -> t.List[t.Union[str, int]]:
+    """
+    Split a path selecting the records of a nested JSON document into its segments.
+
+    Object keys are separated by dots, array indexes are enclosed in brackets. A trailing
+    wildcard `[*]`, selecting all items of an array, is optional. A leading `$` is ignored.
+    Paths starting with a slash are JSON pointers, see RFC 6901.
+
+    >>> json_path_segments("data.items[*]")
+    ['data', 'items']
+    >>> json_path_segments("$.results[0].rows")
+    ['results', 0, 'rows']
+    >>> json_path_segments("/results/0/a~1b")
+    ['results', '0', 'a/b']
+    """
+    if not path:
+        return []
+    if path.startswith("/"):
+        return [segment.replace("~1", "/").replace("~0", "~") for segment in path[1:].split("/")]
+    if path.startswith("$"):
+        path = path[1:]
+    segments: t.List[t.Union[str, int]] = []
+    position = 0
+    wildcard = False
+    for match in re.finditer(r"\.?([^.\[\]]+)|\[(\d+|\*)\]", path):
+        if match.start() != position:
+            break
+        if wildcard:
+            raise ValueError(f"Invalid JSON path '{path}'. Wildcards are only supported at the end of the path")
+        key, index = match.groups()
+        if key is not None:
+            segments.append(key)
+        elif index == "*":
+            wildcard = True
+        else:
+            segments.append(int(index))
+        position = match.end()
+    if position != len(path):
+        raise ValueError(f"Invalid JSON path '{path}'")
+    return segments
+
+
+def json_decoder() -> t.Callable[[BytesString], t.Any]:
+    """
+    Return the fastest available JSON decoder function, `orjson.loads`, falling back to `json.loads`.
+    """
+    try:
+        import orjson
+
+        return orjson.loads
+    except ImportError:  # pragma: no cover
+        return json.loads
+
+
+def read_ndjson(data: t.Iterable[BytesString], nrows: t.Optional[int] = None) -> t.Iterator[t.Dict[str, t.Any]]:
+    """
+    Decode records of NDJSON data line by line, reading at most `nrows` records.
+
+    In contrast to `pd.read_json`, values are not coerced, and records are not aligned.
+    Empty lines are skipped.
+
+    >>> list(read_ndjson([b'{"id": 1}\\n', b"\\n", b'{"id": 2, "name": "foo"}\\n'], nrows=5))
+    [{'id': 1}, {'id': 2, 'name': 'foo'}]
+    """
+    if nrows is not None and nrows <= 0:
+        return
+    loads = json_decoder()
+    count = 0
+    for line in data:
+        if not line.strip():
+            continue
+        yield loads(line)
+        count += 1
+        if nrows is not None and count >= nrows:
+            break
+
+
+def records_to_columns(records: t.Iterable[t.Dict[str, t.Any]]) -> t.Dict[str, t.List[t.Any]]:
+    """
+    Converge records to column-oriented arrays, filling in `None` for missing keys.
+    Columns are ordered by first appearance of their keys.
+
+    >>> records_to_columns([{"a": 1}, {"b": "foo"}, {"a": 2}])
+    {'a': [1, None, 2], 'b': [None, 'foo', None]}
+    """
+    columns: t.Dict[str, t.List[t.Any]] = {}
+    index = 0
+    for index, record in enumerate(records, start=1):
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = []
+            # Only pad columns when they are visited, so sparse keys do not need to be visited per record.
+            if len(column) < index - 1:
+                column.extend([None] * (index - 1 - len(column)))
+            column.append(value)
+    for column in columns.values():
+        if len(column) < index:
+            column.extend([None] * (index - len(column)))
+    return columns
+
+
+def ndjson_to_dataframe(data: t.Iterable[BytesString], nrows: t.Optional[int] = None) -> "pd.DataFrame":
+    """
+    Decode NDJSON data into a pandas DataFrame of Python objects, without coercing values.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(records_to_columns(read_ndjson(data, nrows=nrows)), dtype=object)
+
+
+def read_lineprotocol(data: t.IO[t.Any], peek_lines: t.Optional[int] = None, peek_bytes: t.Optional[int] = None):
     """
     Read stream of InfluxDB line protocol and decode raw data.
 
+    Only decode the first `peek_lines` lines, within a budget of `peek_bytes` bytes.
+
     https://docs.influxdata.com/influxdb/latest/reference/syntax/line-protocol/
     """
     from line_protocol_parser import LineFormatError, parse_line
 
-    for line in data.readlines(PEEK_BYTES):
+    lines = data if peek_bytes is None else data.readlines(peek_bytes)
+    for line in itertools.islice(lines, peek_lines):
         try:
             yield parse_line(line)
         except LineFormatError as ex:
             logger.info(f"WARNING: Line protocol item {line} invalid. Reason: {ex}")
 
 
-def records_from_lineprotocol(data: t.IO[t.Any]):
+def records_from_lineprotocol(
+    data: t.IO[t.Any], peek_lines: t.Optional[int] = None, peek_bytes: t.Optional[int] = None
+):
     """
     Read stream of InfluxDB line protocol and generate `OrderedDict` records.
     """
-    for lp in read_lineprotocol(data=data):
+    for lp in read_lineprotocol(data=data, peek_lines=peek_lines, peek_bytes=peek_bytes):
         record = OrderedDict()
         record["time"] = lp["time"]
         for tag, value in lp["tags"].items():
@@ -222,11 +978,15 @@ def records_from_lineprotocol(data: t.IO[t.Any]):
         yield record
 
 
-def dataframe_from_lineprotocol(data: t.IO[t.Any]):
+def dataframe_from_lineprotocol(
+    data: t.IO[t.Any], peek_lines: t.Optional[int] = None, peek_bytes: t.Optional[int] = None
+):
     """
     Read stream of InfluxDB line protocol into pandas DataFrame.
     """
-    records = records_from_lineprotocol(data)
+    import pandas as pd
+
+    records = records_from_lineprotocol(data, peek_lines=peek_lines, peek_bytes=peek_bytes)
     return pd.DataFrame(records)
 
 
@@ -235,17 +995,24 @@ def to_tempfile(data: t.IO[t.Any], suffix: t.Optional[str] = None) -> t.IO:
     Write a buffer to a temporary file.
     """
     tmp = tempfile.NamedTemporaryFile(suffix=suffix)
-    tmp.write(data.read())
+    shutil.copyfileobj(data, tmp)
     tmp.seek(0)
     return tmp
 
 
-def to_dataframe(data: t.Union[t.IO], content_type: ContentType, address: t.Any = None) -> pd.DataFrame:
+def to_dataframe(
+    data: t.Union[t.IO],
+    content_type: ContentType,
+    address: t.Any = None,
+    peek_lines: int = PEEK_LINES,
+    peek_bytes: t.Optional[int] = None,
+) -> "pd.DataFrame":
     """
     Converge data to pandas DataFrame, trying to peek at the first lines/records of data only.
 
     This machinery is currently used by `skeem.autopk`.
     """
+    import pandas as pd
 
     if data is None:
         raise ValueError("Unable to operate on empty data")
@@ -259,23 +1026,22 @@ def to_dataframe(data: t.Union[t.IO], content_type: ContentType, address: t.Any
         )
 
     if content_type is ContentType.CSV:
-        df = pd.read_csv(data, nrows=PEEK_LINES)
+        df = pd.read_csv(data, nrows=peek_lines)
 
     # Only load the first record(s) from a regular JSON document.
     elif content_type is ContentType.JSON:
-        records = json_get_first_records(data, nrecords=PEEK_LINES)
+        records = json_get_first_records(data, nrecords=peek_lines)
         df = pd.DataFrame.from_records(data=records)
 
     elif content_type is ContentType.LINEPROTOCOL:
-        # TODO: Review: No `PEEK_LINES` is used here?
-        df = dataframe_from_lineprotocol(data=data)
+        df = dataframe_from_lineprotocol(data=data, peek_lines=peek_lines, peek_bytes=peek_bytes)
 
     elif content_type.is_ndjson():
-        df = pd.read_json(data, lines=True, nrows=PEEK_LINES)
+        df = ndjson_to_dataframe(data, nrows=peek_lines).infer_objects()
 
     elif content_type in [ContentType.ODS, ContentType.XLSX]:
         sheet_name = address or 0
-        df = pd.read_excel(data, sheet_name=sheet_name, nrows=PEEK_LINES)
+        df = pd.read_excel(data, sheet_name=sheet_name, nrows=peek_lines)
 
     else:
         raise ValueError(f"Unable to process content type: {content_type}")
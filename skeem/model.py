@@ -1,22 +1,63 @@
 import dataclasses
+import io
+import json
 import logging
 import typing as t
 from pathlib import Path
 
 import skeem.io
-from skeem.settings import PEEK_BYTES, PEEK_LINES
-from skeem.types import ContentType
+import skeem.sniff
+from skeem.exception import UndecidedContentType, UnknownContentType
+from skeem.settings import PEEK_BYTES_MAX, PEEK_BYTES_PER_LINE, PEEK_LINES, SNIFF_BYTES, SNIFF_BYTES_MAX
+from skeem.types import Compression, ContentType, ContentTypeGroup, NestedStrategy, SamplingStrategy
 from skeem.util.sql import sql_canonicalize, sql_pretty
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass
+class SamplingConfig:
+    """
+    Manage how much data to read from a resource, and how to select it.
+
+    `rows` is the number of lines/records to sample, and `bytes` is the byte budget
+    for acquiring them. `strategy` selects which lines of line-based resources will
+    be sampled. Other resources are always sampled from their beginning.
+
+    When `full_scan` is enabled, the column types are inferred from the whole resource
+    instead, reading it in chunks, where supported.
+    """
+
+    rows: int = PEEK_LINES
+    bytes: int = PEEK_BYTES_MAX  # noqa: A003
+    strategy: t.Union[SamplingStrategy, str] = SamplingStrategy.HEAD
+    full_scan: bool = False
+
+    def __post_init__(self):
+        if self.rows < 1:
+            raise ValueError(f"Sample size must be at least one row, got: {self.rows}")
+        if self.bytes < 1:
+            raise ValueError(f"Sample size must be at least one byte, got: {self.bytes}")
+        self.strategy = SamplingStrategy(self.strategy)
+
+    @property
+    def chunk_bytes(self) -> int:
+        """
+        How many bytes to read initially, estimated from the number of rows, within the byte budget.
+        """
+        return min(self.rows * PEEK_BYTES_PER_LINE, self.bytes)
+
+
 @dataclasses.dataclass
 class Resource:
     """
     A wrapper around input data.
 
     Data is either provided as `data`/`address`, or via `path`.
+
+    `address` selects a sub-resource, like a sheet of a spreadsheet, or the records
+    of a nested JSON document, using a path like `results[*]`, or a JSON pointer
+    like `/results`.
     """
 
     data: t.Optional[t.Union[t.IO[t.Any], None]] = None
@@ -24,59 +65,219 @@ class Resource:
     path: t.Optional[t.Union[Path, str]] = None
     content_type: t.Optional[t.Union[ContentType, str]] = None
     type: t.Optional[ContentType] = None  # noqa: A003
+    compression: t.Optional[Compression] = None
+    sampling: SamplingConfig = dataclasses.field(default_factory=SamplingConfig)
 
     def detect_type(self):
         """
         Introspect input data and derive content type.
-        Currently, the implementation only looks at the filename extension.
 
-        # TODO: Implement introspection-based content type detection using "magic" and friends.
+        The content type is either specified, or derived from the filename extension,
+        also of compressed files like `data.ndjson.zst`. Otherwise, it is detected from
+        the first bytes of data, using byte signatures and heuristics, see `sniff`.
         """
 
         # Default values.
         self.path = self.path or None
+        if self.path and self.compression is None:
+            self.compression = Compression.from_filename(self.path)
+
+        # Use specified content type, by mimetype or short name.
+        if self.content_type:
+            self.type = ContentType.from_name(self.content_type)
+            logger.info(f"Using specified type: {self.type}")
+            return
+
+        # Derive content type from file extension, or detect it from data.
+        if self.path:
+            try:
+                self.type = ContentType.from_filename(self.path)
+                logger.info(f"Detected type from filename: {self.type}")
+            except UnknownContentType:
+                try:
+                    detected = self.sniff()
+                except Exception as ex:
+                    logger.info(f"WARNING: Unable to detect type from data. Reason: {ex}")
+                    detected = False
+                if not detected:
+                    raise
+            if self.type is ContentType.GZIP:
+                self.sniff()
+            return
 
         # Croak if content type can not be derived.
-        if not self.path and not self.content_type:
+        if self.data is None or not self.sniff():
             raise NotImplementedError(
-                "Introspection-based content type detection not implemented yet. "
+                "Unable to detect content type. "
                 "Please specify input filename, `content_type` parameter, or `--content-type` option."
             )
 
-        # Derive content type from file extension or mimetype / short name.
-        if self.path:
-            self.type = ContentType.from_filename(self.path)
-            logger.info(f"Detected type from filename: {self.type}")
-        if self.content_type:
-            self.type = ContentType.from_name(self.content_type)
-            logger.info(f"Using specified type: {self.type}")
+    def sniff(self) -> bool:
+        """
+        Detect content type from the first bytes of data, see `skeem.sniff`.
+
+        Compressed data is decompressed incrementally, in order to detect the content
+        type of its payload. The bytes read for detecting the content type will be
+        replayed when peeking into the data, so detection costs no extra I/O.
+
+        When the first bytes are not enough to decide, for example because the first
+        line is longer than them, the prefix is grown, up to `SNIFF_BYTES_MAX` bytes.
+        """
+        if self.data is not None:
+            data = self.data
+        else:
+            data = skeem.io.open(t.cast(t.Union[Path, str], self.path), compression=self.compression)
+        prefix, data = skeem.io.read_prefix(data, SNIFF_BYTES)
+        compression = skeem.sniff.sniff_compression(prefix)
+        if compression is not None:
+            logger.info(f"Detected compression from data: {compression}, decompressing payload")
+            self.compression = compression
+            data = skeem.io.decompress(data, compression)
+            prefix, data = skeem.io.read_prefix(data, SNIFF_BYTES)
+        nbytes = SNIFF_BYTES
+        while True:
+            complete = len(prefix) < nbytes
+            if not complete and nbytes >= SNIFF_BYTES_MAX:
+                logger.info(f"WARNING: Detecting type from first {nbytes} bytes of data, which are truncated")
+                complete = True
+            try:
+                type_ = skeem.sniff.sniff(prefix, complete=complete)
+                break
+            except UndecidedContentType:
+                nbytes = min(nbytes * 4, SNIFF_BYTES_MAX)
+                logger.info(f"Unable to detect type from first bytes of data, reading {nbytes} bytes")
+                prefix, data = skeem.io.read_prefix(data, nbytes)
+        if type_ is None or type_ is ContentType.GZIP:
+            logger.info("WARNING: Unable to detect type from data")
+            if self.data is None:
+                data.close()
+            return False
+        self.data = data
+        self.type = type_
+        logger.info(f"Detected type from data: {self.type}")
+        return True
 
     def peek(self) -> t.IO:
         """
-        Open a resource and peek only at the first bytes of data.
+        Open a resource and peek only at the first bytes of data, or sample
+        lines across the resource, according to the sampling configuration.
         """
+        sampling = self.sampling
+        strategy = t.cast(SamplingStrategy, sampling.strategy)
+        options = {"peek_bytes": sampling.chunk_bytes, "peek_lines": sampling.rows, "max_bytes": sampling.bytes}
+
+        # Open gridded datasets for random access, so that only the sample will be read.
+        if self.data is None and self.path is not None and self.is_random_accessible():
+            self.data = skeem.io.open_random_access(self.path)
+            return self.data
+
+        # Peek into line-based resources using exact ranged reads.
+        if self.data is None and self.path is not None and self.is_range_readable():
+            if strategy is SamplingStrategy.HEAD or self.type not in ContentTypeGroup.LINE_BASED:
+                payload = skeem.io.fsspec_peek_ranged(self.path, **options)
+            else:
+                payload = skeem.io.fsspec_sample_ranged(self.path, strategy=strategy, **options)
+            return io.BytesIO(payload)
 
         # Access a plethora of resources using `fsspec` and friends.
         if self.data is None and self.path is not None:
-            self.data = skeem.io.open(self.path)
+            self.data = skeem.io.open(self.path, compression=self.compression)
 
         # Sanity checks
         if self.data is None:
             raise ValueError(f"Unable to open resource: {self}")
 
-        # Peek into the first bytes/lines of data.
-        return skeem.io.peek(data=self.data, content_type=self.type, peek_bytes=PEEK_BYTES, peek_lines=PEEK_LINES)
+        # Sample lines across seekable streams.
+        if strategy is not SamplingStrategy.HEAD:
+            if self.path is None and self.type in ContentTypeGroup.LINE_BASED and skeem.io.is_seekable(self.data):
+                return io.BytesIO(skeem.io.stream_sample(self.data, strategy=strategy, **options))
+            logger.info(f"WARNING: Sampling strategy '{strategy.value}' not supported for {self.type}, using 'head'")
+
+        # Peek into the first bytes/lines of data. In-memory buffers can be read up to the byte budget.
+        peek_bytes = sampling.bytes if isinstance(self.data, io.BytesIO) else sampling.chunk_bytes
+        return skeem.io.peek(
+            data=self.data,
+            content_type=self.type,
+            peek_bytes=peek_bytes,
+            peek_lines=sampling.rows,
+            address=self.address,
+        )
+
+    def open(self) -> t.IO:  # noqa: A003
+        """
+        Open the resource for reading it as a whole, from its beginning.
+        """
+        if self.path is not None:
+            return skeem.io.open(self.path, compression=self.compression)
+        if self.data is not None and skeem.io.is_seekable(self.data):
+            self.data.seek(0)
+            return self.data
+        raise ValueError(f"Unable to read resource from its beginning: {self}")
+
+    def is_random_accessible(self) -> bool:
+        """
+        Whether the resource is a gridded dataset, which can be opened for random access.
+        This is not the case for compressed resources.
+        """
+        if self.type not in ContentTypeGroup.DATASET:
+            return False
+        return self.compression is None and Compression.from_filename(str(self.path)) is None
+
+    def is_range_readable(self) -> bool:
+        """
+        Whether the first lines of the resource can be acquired by reading byte ranges.
+
+        This is not the case for binary formats, which need to be read as a whole, for
+        JSON documents, which are parsed incrementally instead, and for compressed resources.
+        """
+        if self.type in ContentTypeGroup.NO_PARTIAL or self.type in [ContentType.JSON, ContentType.GZIP]:
+            return False
+        return self.compression is None and Compression.from_filename(str(self.path)) is None
 
 
 @dataclasses.dataclass
 class SqlTarget:
     """
     Manage SQL target definition metadata.
+
+    `nested` selects how nested objects of JSON-like resources are mapped to columns.
     """
 
     dialect: t.Optional[str] = None
     table_name: t.Optional[str] = None
     primary_key: t.Optional[str] = None
+    nested: t.Union[NestedStrategy, str] = NestedStrategy.RELATIONAL
+
+    def __post_init__(self):
+        self.nested = NestedStrategy(self.nested)
+
+
+@dataclasses.dataclass
+class InferredSchema:
+    """
+    Manage the dialect-neutral result of inferring the schema, which can be serialized
+    to SQL DDL statements for multiple SQL dialects.
+
+    The `ddlgen` backend provides a `TablePlus` instance as `table`, which wraps the SQLAlchemy
+    `Table` instance as `table.table`. The `frictionless` and `parquet` backends provide a
+    frictionless `Schema` instance as `schema`.
+
+    When available, `sample` is the pandas DataFrame of the sample the schema has been
+    inferred from, consisting of `sample_rows` records, acquired by reading `sample_bytes`.
+    """
+
+    table: t.Optional[t.Any] = None
+    schema: t.Optional[t.Any] = None
+    sample: t.Optional[t.Any] = None
+    sample_rows: t.Optional[int] = None
+    sample_bytes: t.Optional[int] = None
+
+    def dispose(self):
+        """
+        Release the SQLAlchemy table, so that tables of the same name can be inferred again.
+        """
+        if self.table is not None:
+            self.table.dispose()
 
 
 @dataclasses.dataclass
@@ -94,3 +295,125 @@ class SqlResult:
     @property
     def pretty(self) -> str:
         return sql_pretty(self.sql)
+
+
+@dataclasses.dataclass
+class ColumnReport:
+    """
+    Manage the inferred type and the statistics of a single column.
+
+    `type` maps SQL dialect names to the SQL type of the column. The statistics are
+    derived from the sample, or from all records when scanning the whole resource.
+    `cardinality` is the number of distinct values, estimated beyond a threshold.
+    """
+
+    name: str
+    type: t.Dict[str, str]  # noqa: A003
+    nullable: bool
+    max_length: t.Optional[int] = None
+    unique: t.Optional[bool] = None
+    cardinality: t.Optional[int] = None
+    sample_values: t.List[t.Any] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class InferenceReport:
+    """
+    Manage the structured result of inferring the schema, including column statistics,
+    the size of the sample, SQL DDL statements per dialect, and timings per stage.
+    """
+
+    table_name: t.Optional[str]
+    primary_key: t.Optional[str]
+    backend: t.Optional[str]
+    content_type: t.Optional[str]
+    sample_rows: t.Optional[int]
+    sample_bytes: t.Optional[int]
+    columns: t.List[ColumnReport]
+    ddl: t.Dict[str, str]
+    timings: t.Dict[str, float]
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """
+        Serialize report to a dictionary of JSON-compatible values.
+        """
+        return json.loads(self.to_json())
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self), default=_json_default, indent=2)
+
+    def to_yaml(self) -> str:
+        import yaml
+
+        return yaml.safe_dump(self.to_dict(), sort_keys=False, allow_unicode=True)
+
+
+@dataclasses.dataclass
+class StageSpan:
+    """
+    Manage the measurements of a stage of the inference pipeline.
+
+    `wall` and `cpu` are the accumulated wall clock and CPU times in seconds, over `calls`
+    invocations. CPU time of worker processes is not included. `bytes` and `rows` are the
+    amounts of data read and parsed by the stage, when it reports them.
+    """
+
+    name: str
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes: t.Optional[int] = None  # noqa: A003
+    rows: t.Optional[int] = None
+
+    def add(self, bytes: t.Optional[int] = None, rows: t.Optional[int] = None):  # noqa: A002
+        """
+        Account for data read and parsed by the stage.
+        """
+        if bytes is not None:
+            self.bytes = (self.bytes or 0) + bytes
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+
+
+def _json_default(value: t.Any) -> t.Any:
+    """
+    Serialize values of samples, like NumPy scalars, timestamps, and decimals.
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+@dataclasses.dataclass
+class BatchItem:
+    """
+    Manage a single input item of a batch operation.
+
+    When `data` is present, it contains the bytes which have been peeked at already.
+    When `result` is present, it has been served from the cache, using `cache_key`.
+    """
+
+    path: str
+    table_name: t.Optional[str] = None
+    content_type: t.Optional[str] = None
+    data: t.Optional[bytes] = None
+    cache_key: t.Optional[str] = None
+    result: t.Optional[SqlResult] = None
+
+
+@dataclasses.dataclass
+class BatchResult:
+    """
+    Manage the result of a single item of a batch operation, either an SQL DDL statement, or an error.
+    """
+
+    path: str
+    table_name: t.Optional[str] = None
+    result: t.Optional[SqlResult] = None
+    error: t.Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
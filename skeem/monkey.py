@@ -0,0 +1,102 @@
+"""
+Patch 3rd-party modules lazily, right after they have been imported.
+
+Importing the heavy machinery like `ddlgenerator`, `frictionless`, `fastparquet`,
+or `pandas` takes a considerable amount of time. In order to keep the startup time
+of the program short, patches are not applied when importing `skeem`, but when the
+corresponding module is imported for the first time, by a code path which needs it.
+"""
+
+import importlib
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import logging
+import sys
+import threading
+import typing as t
+
+logger = logging.getLogger(__name__)
+
+
+# Which packages patch which 3rd-party package. The patches are applied when importing them.
+PATCHES = {
+    "ddlgenerator": "skeem.ddlgen",
+    "fastparquet": "skeem.fastparquet",
+    "frictionless": "skeem.frictionless",
+    "pandas": "skeem.pandas",
+}
+
+
+class PostImportFinder(importlib.abc.MetaPathFinder):
+    """
+    Invoke a hook after a module has been imported and executed, before it is handed
+    out to the importing code. The module itself is located and loaded by the other
+    finders on `sys.meta_path`.
+    """
+
+    def __init__(self):
+        self.hooks: t.Dict[str, t.Callable[[], None]] = {}
+        self.lock = threading.RLock()
+        self.searching: t.Set[str] = set()
+
+    def register(self, name: str, hook: t.Callable[[], None]):
+        """
+        Register hook for module. When the module has been imported already, invoke the hook right away.
+        """
+        with self.lock:
+            if name in sys.modules:
+                hook()
+            else:
+                self.hooks[name] = hook
+
+    def find_spec(self, fullname, path, target=None) -> t.Optional[importlib.machinery.ModuleSpec]:
+        with self.lock:
+            if fullname not in self.hooks or fullname in self.searching:
+                return None
+            self.searching.add(fullname)
+            try:
+                spec = importlib.util.find_spec(fullname)
+            finally:
+                self.searching.discard(fullname)
+            if spec is None or spec.loader is None or not hasattr(spec.loader, "exec_module"):
+                return None
+            hook = self.hooks.pop(fullname)
+
+        loader = t.cast(importlib.abc.Loader, spec.loader)
+        exec_module = loader.exec_module
+
+        def exec_module_and_patch(module):
+            exec_module(module)
+            logger.debug(f"Patching module: {fullname}")
+            hook()
+
+        loader.exec_module = exec_module_and_patch  # type: ignore[method-assign]
+        return spec
+
+
+finder = PostImportFinder()
+
+
+def activate():
+    """
+    Register patches, to be applied when the corresponding modules will be imported.
+    """
+    if finder not in sys.meta_path:
+        sys.meta_path.insert(0, finder)
+    for name, patch_package in PATCHES.items():
+        finder.register(name, _patcher(patch_package))
+
+
+def _patcher(patch_package: str) -> t.Callable[[], None]:
+    """
+    Patches are applied by importing the corresponding package. When the 3rd-party
+    module has been imported by that package in the first place, the import will
+    return the partially initialized package, which will apply the patches on its
+    own, after it has been initialized completely.
+    """
+
+    def patch():
+        importlib.import_module(patch_package)
+
+    return patch
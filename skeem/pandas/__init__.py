@@ -0,0 +1,3 @@
+from skeem.pandas import monkey
+
+monkey.activate()
@@ -0,0 +1,121 @@
+"""
+Lightweight instrumentation of the inference pipeline, measuring wall clock time, CPU
+time, and the amount of data read and parsed, per stage.
+
+In contrast to `--trace-modules`, the overhead is a few clock readings per stage, so it
+can be used in production, in order to find out where time goes, and to spot regressions.
+"""
+
+import contextlib
+import dataclasses
+import json
+import logging
+import time
+import typing as t
+from pathlib import Path
+
+from skeem.model import StageSpan
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """
+    Record spans around the stages of the inference pipeline.
+
+    Stages which are entered multiple times, for example when serializing SQL DDL
+    for multiple dialects, are accumulated into the same span.
+
+    >>> profiler = Profiler()
+    >>> with profiler.span("peek") as span:
+    ...     span.add(bytes=42, rows=2)
+    >>> profiler.spans["peek"].calls, profiler.spans["peek"].bytes, profiler.spans["peek"].rows
+    (1, 42, 2)
+    """
+
+    def __init__(self) -> None:
+        self.spans: t.Dict[str, StageSpan] = {}
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> t.Generator[StageSpan, None, None]:
+        span = self.spans.setdefault(name, StageSpan(name=name))
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield span
+        finally:
+            span.calls += 1
+            span.wall += time.perf_counter() - wall
+            span.cpu += time.process_time() - cpu
+
+    @property
+    def timings(self) -> t.Dict[str, float]:
+        """
+        The wall clock time per stage, in seconds.
+        """
+        return {name: span.wall for name, span in self.spans.items()}
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        return {
+            "stages": [dataclasses.asdict(span) for span in self.spans.values()],
+            "total": {
+                "wall": sum(span.wall for span in self.spans.values()),
+                "cpu": sum(span.cpu for span in self.spans.values()),
+            },
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_table(self) -> str:
+        """
+        Format spans as a table for humans, with times in milliseconds.
+        """
+        header = ("stage", "calls", "wall [ms]", "cpu [ms]", "rows", "bytes")
+        rows = [
+            (
+                span.name,
+                str(span.calls),
+                f"{span.wall * 1000:.1f}",
+                f"{span.cpu * 1000:.1f}",
+                _optional(span.rows),
+                _optional(span.bytes),
+            )
+            for span in self.spans.values()
+        ]
+        total = self.to_dict()["total"]
+        rows.append(("total", "", f"{total['wall'] * 1000:.1f}", f"{total['cpu'] * 1000:.1f}", "", ""))
+        widths = [max(len(row[index]) for row in [header, *rows]) for index in range(len(header))]
+        lines = []
+        for number, row in enumerate([header, *rows]):
+            if number == 1 or number == len(rows):
+                lines.append("  ".join("-" * width for width in widths))
+            cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            lines.append("  ".join(cells).rstrip())
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def cprofile(path: t.Optional[t.Union[Path, str]]) -> t.Generator[None, None, None]:
+    """
+    Optionally run `cProfile`, and dump its statistics to `path`, for inspecting them
+    using `python -m pstats`, or tools like `snakeviz`.
+    """
+    if path is None:
+        yield
+        return
+
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        logger.info(f"Writing cProfile statistics to {path}")
+        profile.dump_stats(str(path))
+
+
+def _optional(value: t.Optional[int]) -> str:
+    return "" if value is None else f"{value:,}"
@@ -1,12 +1,82 @@
+import typing as t
+
 from skeem.types import ContentType
 
 # How many lines to read from input data.
 PEEK_LINES = 100
 
+# How many bytes to expect per line of input data, in order to estimate how many bytes to read.
+PEEK_BYTES_PER_LINE = 130
+
 # How many bytes to read from input data.
-PEEK_BYTES = PEEK_LINES * 130
+PEEK_BYTES = PEEK_LINES * PEEK_BYTES_PER_LINE
+
+# How many bytes to read at most, when growing the range to acquire `PEEK_LINES` complete lines.
+PEEK_BYTES_MAX = PEEK_BYTES * 64
+
+# How many bytes to read from input data, in order to detect its content type by byte signatures and heuristics.
+SNIFF_BYTES = 8 * 1024
+
+# How many bytes to read at most, when growing the buffer to detect the content type of data with long lines.
+SNIFF_BYTES_MAX = PEEK_BYTES_MAX
+
+# How many distinct values per column to include into the structured inference report.
+REPORT_SAMPLE_VALUES = 5
+
+# How many segments of a resource to read lines from, when using the `stride` or `reservoir` sampling strategies.
+SAMPLE_SEGMENTS = 8
+
+# Seed for the random offsets of the `reservoir` sampling strategy, in order to produce reproducible results.
+SAMPLE_SEED = 42
+
+# How many grid points of gridded datasets like NetCDF or GRIB to visit at most, in order to
+# sample records without missing values. Only small windows of grid points are read at once.
+DATASET_SAMPLE_MAX_POINTS = 1_000_000
+
+# How many bytes to fetch per ranged request, when accessing remote gridded datasets. Fetched blocks are cached.
+DATASET_BLOCK_BYTES = 2 * 1024 * 1024
+
+# How many records to read per chunk, when scanning the whole resource.
+SCAN_CHUNK_ROWS = 10_000
+
+# How many distinct values per column to count exactly, in order to decide about uniqueness.
+# Beyond that, the number of distinct values is estimated using HyperLogLog.
+CARDINALITY_EXACT_MAX = 10_000
+
+# Precision of the HyperLogLog estimator, i.e. it uses `2 ** CARDINALITY_PRECISION` registers,
+# with a standard error of `1.04 / sqrt(2 ** CARDINALITY_PRECISION)`, about 0.8%.
+CARDINALITY_PRECISION = 14
 
 # Which content types to route to the "frictionless" backend.
-FRICTIONLESS_CONTENT_TYPES = [
+FRICTIONLESS_CONTENT_TYPES: t.List[ContentType] = []
+
+# Which content types to route to the "parquet" backend, which only reads the file footer.
+PARQUET_CONTENT_TYPES = [
     ContentType.PARQUET,
 ]
+
+# How many bytes to read from the end of Parquet files, in order to decode the footer.
+# When the footer is larger, a second ranged read will be issued.
+PARQUET_FOOTER_BYTES = 64 * 1024
+
+# How many columns to infer per task, when inferring column types of wide tables in parallel.
+PARALLEL_COLUMNS_PER_TASK = 50
+
+# How many resources to read concurrently in batch mode.
+BATCH_IO_WORKERS = 8
+
+# Which modules to import into the "forkserver" process, in order to import the heavy machinery only once,
+# instead of importing it within each worker process.
+FORKSERVER_PRELOAD = [
+    "skeem.autopk",
+    "skeem.core",
+    "skeem.ddlgen.ddlgenerator",
+    "skeem.ddlgen.sources",
+    "frictionless",
+]
+
+# How long to keep inference results in the persistent cache, in seconds.
+CACHE_TTL = 7 * 24 * 60 * 60
+
+# How many bytes the persistent cache may use. Beyond that, least recently used entries are evicted.
+CACHE_MAX_BYTES = 64 * 1024 * 1024
@@ -0,0 +1,222 @@
+import csv
+import io
+import json
+import logging
+import re
+import struct
+import typing as t
+import zlib
+
+import skeem.io
+from skeem.exception import UndecidedContentType
+from skeem.types import Compression, ContentType
+
+logger = logging.getLogger(__name__)
+
+
+GRIB_MAGIC = b"GRIB"
+HDF5_MAGIC = b"\x89HDF\r\n\x1a\n"
+NETCDF_MAGICS = [b"CDF\x01", b"CDF\x02", b"CDF\x05"]
+PARQUET_MAGIC = b"PAR1"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Byte signatures of compression formats. Snappy is recognized by the stream identifier of its framing format.
+COMPRESSION_MAGICS = {
+    Compression.BZ2: b"BZh",
+    Compression.GZIP: b"\x1f\x8b",
+    Compression.LZ4: b"\x04\x22\x4d\x18",
+    Compression.SNAPPY: b"\xff\x06\x00\x00sNaPpY",
+    Compression.XZ: b"\xfd7zXZ\x00",
+    Compression.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+
+ODS_MIMETYPE = b"application/vnd.oasis.opendocument.spreadsheet"
+
+# A line of InfluxDB line protocol: `measurement[,tag=value...] field=value[,field=value...] [timestamp]`.
+# Commas, spaces, and equal signs within names and values are escaped using backslashes.
+LINEPROTOCOL_LINE = re.compile(
+    r"""
+    ^(?:[^\s,\\]|\\.)+                              # measurement
+    (?:,(?:[^\s,=\\]|\\.)+=(?:[^\s,\\]|\\.)+)*      # tag set
+    \s(?:[^\s,=\\]|\\.)+=\S                         # first field
+    """,
+    re.VERBOSE,
+)
+
+
+def sniff(buffer: bytes, complete: bool = True) -> t.Optional[ContentType]:
+    """
+    Detect content type from the first bytes of data, using byte signatures of binary
+    formats, and heuristics for text formats.
+
+    For compressed data, the content type of the payload is detected, as far as the
+    codec is available. `ContentType.GZIP` is returned when it can not be determined.
+
+    When the buffer is only a prefix of the data, signalled by `complete=False`, and
+    it is too short to decide about its content type, `UndecidedContentType` is raised,
+    so that the caller can try again using a longer prefix, see `sniff_text`.
+
+    >>> sniff(b"PAR1")
+    <ContentType.PARQUET: 'PARQUET'>
+    >>> sniff(b'{"id": 1}\\n{"id": 2}\\n')
+    <ContentType.NDJSON: 'NDJSON'>
+    >>> sniff(b"id,name\\n1,foo\\n")
+    <ContentType.CSV: 'CSV'>
+    """
+    compression = sniff_compression(buffer)
+    if compression is not None:
+        return sniff(decompress_prefix(buffer, compression), complete=complete) or ContentType.GZIP
+    if buffer.startswith(PARQUET_MAGIC):
+        return ContentType.PARQUET
+    if buffer.startswith(HDF5_MAGIC) or buffer[:4] in NETCDF_MAGICS:
+        return ContentType.NETCDF
+    if buffer.startswith(GRIB_MAGIC):
+        return ContentType.GRIB2
+    if buffer.startswith(ZIP_MAGIC):
+        return sniff_zip(buffer)
+    return sniff_text(buffer, complete=complete)
+
+
+def sniff_compression(buffer: bytes) -> t.Optional[Compression]:
+    """
+    Detect compression format from the first bytes of data.
+
+    >>> sniff_compression(b"\\x28\\xb5\\x2f\\xfd\\x00")
+    <Compression.ZSTD: 'zstd'>
+    >>> sniff_compression(b"id,name") is None
+    True
+    """
+    for compression, magic in COMPRESSION_MAGICS.items():
+        if buffer.startswith(magic):
+            return compression
+    return None
+
+
+def decompress_prefix(buffer: bytes, compression: Compression) -> bytes:
+    """
+    Decompress the first bytes of a compressed stream, as far as they are available.
+
+    Block-based formats like bz2 will not yield any data before a whole block of
+    up to 900 kB has been received.
+    """
+    try:
+        reader = skeem.io.decompress(io.BytesIO(buffer), compression)
+    except ValueError as ex:
+        logger.info(f"WARNING: {ex}")
+        return b""
+    chunks = []
+    try:
+        while chunk := reader.read(1024):
+            chunks.append(chunk)
+    except Exception as ex:
+        # The buffer is usually truncated, so decompression ends prematurely.
+        logger.debug(f"Decompressing prefix ended prematurely. Reason: {ex}")
+    return b"".join(chunks)
+
+
+def sniff_zip(buffer: bytes) -> t.Optional[ContentType]:
+    """
+    Distinguish between XLSX and ODS files, by inspecting the local file headers of the ZIP archive.
+
+    ODS files start with an uncompressed `mimetype` entry. XLSX files have a
+    `[Content_Types].xml` entry, and their workbook is stored within `xl/`.
+    """
+    for name, content in zip_entries(buffer):
+        if name == b"mimetype" and content.startswith(ODS_MIMETYPE):
+            return ContentType.ODS
+        if name.startswith(b"xl/"):
+            return ContentType.XLSX
+        if name == b"[Content_Types].xml" and b"spreadsheetml" in content:
+            return ContentType.XLSX
+    return None
+
+
+def zip_entries(buffer: bytes) -> t.Generator[t.Tuple[bytes, bytes], None, None]:
+    """
+    Iterate the names and decompressed contents of ZIP archive entries within the first bytes of an archive.
+    Contents of entries which are truncated may be incomplete, and contents of entries
+    using unknown compression methods are empty.
+    """
+    offset = 0
+    while buffer.startswith(ZIP_MAGIC, offset) and offset + 30 <= len(buffer):
+        flags, method, compressed_size, name_length, extra_length = struct.unpack_from(
+            "<2xHH8xI4xHH", buffer, offset + 4
+        )
+        name_start = offset + 30
+        data_start = name_start + name_length + extra_length
+        name = buffer[name_start : name_start + name_length]
+
+        # When sizes are stored after the data, within a data descriptor, the next entry is located by scanning.
+        if flags & 0x08:
+            data_end = buffer.find(ZIP_MAGIC, data_start)
+            if data_end == -1:
+                data_end = len(buffer)
+        else:
+            data_end = data_start + compressed_size
+        data = buffer[data_start:data_end]
+
+        content = b""
+        if method == 0:
+            content = data
+        elif method == 8:
+            try:
+                content = zlib.decompressobj(wbits=-zlib.MAX_WBITS).decompress(data)
+            except zlib.error:
+                pass
+        yield name, content
+        offset = data_end
+
+
+def sniff_text(buffer: bytes, complete: bool = True) -> t.Optional[ContentType]:
+    """
+    Distinguish between JSON documents, NDJSON, InfluxDB line protocol, and CSV, using heuristics.
+
+    Only complete lines are considered, because the buffer is usually truncated. When the
+    buffer is truncated, and does not include a second line, for example because the first
+    NDJSON record is longer than the buffer, it is not possible to tell a JSON document
+    from NDJSON, so `UndecidedContentType` is raised.
+    """
+    if b"\x00" in buffer:
+        return None
+    try:
+        text = buffer.decode("utf-8-sig")
+    except UnicodeDecodeError as ex:
+        # The buffer may end within a multibyte character.
+        text = buffer[: ex.start].decode("utf-8-sig", errors="ignore")
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not complete and len(lines) < 2:
+        raise UndecidedContentType("Unable to detect content type from less than two lines")
+    more = len(lines) > 1
+    if more and not text.endswith("\n"):
+        lines = lines[:-1]
+    if not lines:
+        return None
+
+    head = lines[0].lstrip()
+    if head.startswith("["):
+        return ContentType.JSON
+    if head.startswith("{"):
+        # A single JSON object, even on a single line, is a JSON document.
+        # NDJSON needs a second line, which may be truncated.
+        if more and all(_is_json_object(line) for line in lines):
+            return ContentType.NDJSON
+        return ContentType.JSON
+    if head.startswith("<"):
+        # HTML and XML documents are not supported.
+        return None
+    if all(LINEPROTOCOL_LINE.match(line) for line in lines if not line.startswith("#")):
+        return ContentType.LINEPROTOCOL
+    try:
+        dialect = csv.Sniffer().sniff("\n".join(lines[:20]), delimiters=",;\t|")
+    except csv.Error:
+        return None
+    if dialect.delimiter in lines[0]:
+        return ContentType.CSV
+    return None
+
+
+def _is_json_object(line: str) -> bool:
+    try:
+        return isinstance(json.loads(line), dict)
+    except ValueError:
+        return False
@@ -101,13 +101,24 @@ class ContentType(Enum):
 
         >>> ContentType.from_filename("foo.csv")
         <ContentType.CSV: 'CSV'>
+
+        >>> ContentType.from_filename("foo.ndjson.zst")
+        <ContentType.NDJSON: 'NDJSON'>
         """
         mimetype: t.Union[str, None]
         filename = str(filename)
-        if filename.endswith(".gz"):
-            mimetype = "application/gzip"
-        else:
-            mimetype, _ = mimetypes.guess_type(filename, strict=False)
+
+        # Compressed files: Derive content type of the payload from the inner filename extension.
+        compression = Compression.from_filename(filename)
+        if compression is not None:
+            try:
+                return cls.from_filename(Compression.strip_suffix(filename))
+            except UnknownContentType:
+                if compression is Compression.GZIP:
+                    return ContentType.GZIP
+                raise UnknownContentType(f"Unable to guess content type from '{filename}'") from None
+
+        mimetype, _ = mimetypes.guess_type(filename, strict=False)
         if mimetype is None:
             raise UnknownContentType(f"Unable to guess content type from '{filename}'")
         return ContentTypeMime(mimetype).content_type
@@ -224,6 +235,12 @@ class ContentTypeGroup:
         ContentType.NETCDF,
     ]
 
+    # Gridded datasets, which are opened for random access, instead of being read as a whole.
+    DATASET = [
+        ContentType.GRIB2,
+        ContentType.NETCDF,
+    ]
+
     # All "binary" files must not be read partially, but as a whole instead.
     NO_PARTIAL = [
         ContentType.GRIB2,
@@ -239,6 +256,112 @@ class ContentTypeGroup:
         ContentType.NDJSON,
     ]
 
+    # Line-based formats, which can be sampled from arbitrary offsets.
+    LINE_BASED = [
+        ContentType.CSV,
+        ContentType.JSONL,
+        ContentType.LDJSON,
+        ContentType.LINEPROTOCOL,
+        ContentType.NDJSON,
+    ]
+
+
+class Compression(Enum):
+    """
+    Manage supported compression formats, using the codec names of `fsspec`.
+    """
+
+    BZ2 = "bz2"
+    GZIP = "gzip"
+    LZ4 = "lz4"
+    SNAPPY = "snappy"
+    XZ = "xz"
+    ZSTD = "zstd"
+
+    @classmethod
+    def values(cls):
+        return enum_values(cls)
+
+    @classmethod
+    def from_filename(cls, filename: t.Union[Path, str]) -> t.Optional["Compression"]:
+        """
+        Derive compression format from filename extension.
+
+        >>> Compression.from_filename("foo.ndjson.zst")
+        <Compression.ZSTD: 'zstd'>
+        >>> Compression.from_filename("foo.csv") is None
+        True
+        """
+        suffix = Path(str(filename).split("?")[0]).suffix.lower()
+        for item in cls:
+            if suffix in CompressionSuffix[item.name].value:
+                return item
+        return None
+
+    @staticmethod
+    def strip_suffix(filename: t.Union[Path, str]) -> str:
+        """
+        Remove the compression extension from filename, in order to derive the content type of its payload.
+
+        >>> Compression.strip_suffix("foo.csv.bz2")
+        'foo.csv'
+        """
+        filename = str(filename)
+        suffix = Path(filename.split("?")[0]).suffix
+        return filename[: filename.rindex(suffix)]
+
+
+class CompressionSuffix(Enum):
+    """
+    Manage compression format -> file extension suffix mapping.
+    """
+
+    BZ2 = [".bz2"]
+    GZIP = [".gz", ".gzip"]
+    LZ4 = [".lz4"]
+    SNAPPY = [".sz", ".snappy"]
+    XZ = [".xz", ".lzma"]
+    ZSTD = [".zst", ".zstd"]
+
+
+class SamplingStrategy(Enum):
+    """
+    How to select the lines of a resource which are used for inferring its schema.
+
+    - head: The first lines.
+    - reservoir: Lines from random offsets across the resource.
+    - stride: Lines from evenly spaced offsets across the resource.
+    - tail+head: The first and the last lines.
+    """
+
+    HEAD = "head"
+    RESERVOIR = "reservoir"
+    STRIDE = "stride"
+    TAIL_HEAD = "tail+head"
+
+    @classmethod
+    def values(cls):
+        return enum_values(cls)
+
+
+class NestedStrategy(Enum):
+    """
+    How to map nested objects of JSON-like resources to SQL columns.
+
+    - relational: Unnest objects into the columns of the parent table, and lists into child tables.
+    - flatten: Flatten objects into one column per path, like `meta.user`.
+    - object: Map objects and arrays to native nested types, i.e. `OBJECT(DYNAMIC)` with typed
+      subcolumns, and `ARRAY(...)` on CrateDB, and `JSONB`, and arrays of scalar values on PostgreSQL.
+    """
+
+    RELATIONAL = "relational"
+    FLATTEN = "flatten"
+    OBJECT = "object"
+
+    @classmethod
+    def values(cls):
+        return enum_values(cls)
+
 
 class TypeInfo:
     @classmethod
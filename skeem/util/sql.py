@@ -1,6 +1,3 @@
-from sqlformatter.sqlformatter import SQLFormatter
-
-
 def sql_canonicalize(sql: str) -> str:
     """
     Compute canonical representation for SQL statement.
@@ -12,6 +9,8 @@ def sql_pretty(sql: str, reindent: bool = False) -> str:
     """
     Prettify SQL statement.
     """
+    from sqlformatter.sqlformatter import SQLFormatter
+
     sql = sql.strip().replace("\t", "    ")
     return SQLFormatter(
         reindent=reindent, indent_width=2, keyword_case="upper", identifier_case=None, comma_first=False
@@ -6,6 +6,16 @@ import pytest
 import sqlalchemy as sa
 
 
+@pytest.fixture(autouse=True)
+def cache_directory(tmp_path, monkeypatch):
+    """
+    Isolate the persistent cache of inference results per test case.
+    """
+    path = tmp_path / "cache"
+    monkeypatch.setenv("SKEEM_CACHE_DIR", str(path))
+    return path
+
+
 @pytest.fixture
 def ndjson_file_basic():
     return Path("tests/testdata/basic.ndjson")
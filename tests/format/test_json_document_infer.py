@@ -1,4 +1,5 @@
 import io
+import json
 
 import pytest
 from click.testing import CliRunner
@@ -28,6 +29,24 @@ def basic_stream_json_document():
     )
 
 
+@pytest.fixture
+def wrapped_stream_json_document():
+    """
+    A stream of input data. Here, in JSON (document) format, wrapping the records into an object.
+    """
+    return io.BytesIO(
+        json.dumps(
+            {
+                "meta": {"pages": [{"page": index} for index in range(1000)]},
+                "results": [
+                    {"id": 1, "name": "foo", "date": "2014-10-31T09:22:56", "fruits": "apple,banana", "price": 0.42},
+                    {"id": 2, "name": "bar", "date": "2014-10-31T09:22:56", "fruits": "pear", "price": 0.84},
+                ],
+            }
+        ).encode()
+    )
+
+
 def test_json_document_infer_library_success(basic_stream_json_document):
     """
     Verify basic library use.
@@ -104,3 +123,51 @@ def test_json_document_infer_cli_stdin_with_content_type(basic_stream_json_docum
     computed = SqlResult(result.stdout).canonical
     reference = get_basic_sql_reference(table_name=table_name, timestamp_not_null=True)
     assert computed == reference
+
+
+@pytest.mark.parametrize("backend", ["ddlgen", "frictionless"])
+@pytest.mark.parametrize("address", ["results[*]", "$.results", "/results"])
+def test_json_document_infer_address(wrapped_stream_json_document, backend, address):
+    """
+    Records of nested JSON documents are selected using a path or a JSON pointer.
+    """
+    table_name = "foo"
+    sg = SchemaGenerator(
+        resource=Resource(data=wrapped_stream_json_document, content_type="json", address=address),
+        target=SqlTarget(dialect="crate", table_name=table_name),
+        backend=backend,
+    )
+
+    computed = sg.to_sql_ddl().canonical
+    reference = get_basic_sql_reference(table_name=table_name, timestamp_not_null=backend == "ddlgen", backend=backend)
+    assert computed == reference
+
+
+def test_json_document_infer_address_frictionless_index(wrapped_stream_json_document):
+    """
+    The frictionless backend can not select records by array index.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(data=wrapped_stream_json_document, content_type="json", address="results[0]"),
+        target=SqlTarget(dialect="crate", table_name="foo"),
+        backend="frictionless",
+    )
+    with pytest.raises(ValueError) as ex:
+        sg.to_sql_ddl()
+    assert ex.match("Backend 'frictionless' does not support array indexes in JSON paths: results\\[0\\]")
+
+
+def test_json_document_infer_cli_address(tmp_path, wrapped_stream_json_document):
+    """
+    CLI test: Records of nested JSON documents are selected using the `--address` option.
+    """
+    path = tmp_path / "wrapped.json"
+    path.write_bytes(wrapped_stream_json_document.read())
+
+    runner = CliRunner()
+    result = runner.invoke(cli, f"infer-ddl --dialect=crate --address=/results {path}", catch_exceptions=False)
+    assert result.exit_code == 0
+
+    computed = SqlResult(result.stdout).canonical
+    reference = get_basic_sql_reference(table_name="wrapped", timestamp_not_null=True)
+    assert computed == reference
@@ -3,7 +3,7 @@ from click.testing import CliRunner
 
 from skeem.cli import cli
 from skeem.core import SchemaGenerator
-from skeem.model import Resource, SqlResult, SqlTarget
+from skeem.model import Resource, SamplingConfig, SqlResult, SqlTarget
 from skeem.util.data import unwrap
 from tests.util import getcmd
 
@@ -90,3 +90,27 @@ def test_lineprotocol_infer_url(request, url):
 
     computed = SqlResult(result.stdout).canonical
     assert computed == reference
+
+
+def test_lineprotocol_infer_sample_size(tmp_path):
+    """
+    The sample size is not capped by a fixed byte budget, so type changes beyond the
+    default peek window are accounted for, when sampling more rows.
+    """
+    path = tmp_path / "large.lp"
+    with open(path, "w") as f:
+        for index in range(2000):
+            value = f"{index}i" if index < 1500 else f"{index}.5"
+            f.write(f"metrics,sensor=foo value={value} {1414747376000000000 + index}\n")
+    sg = SchemaGenerator(
+        resource=Resource(
+            path=path,
+            content_type="lineprotocol",
+            sampling=SamplingConfig(rows=2000, bytes=10**7),
+        ),
+        target=SqlTarget(dialect="crate", table_name="large_lp"),
+        backend="ddlgen",
+    )
+    inferred = sg.infer()
+    assert inferred.sample_rows == 2000
+    assert '"value" DOUBLE NOT NULL' in sg.to_sql_ddl().canonical
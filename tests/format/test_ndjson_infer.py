@@ -1,9 +1,11 @@
+import io
+
 import pytest
 from click.testing import CliRunner
 
 from skeem.cli import cli
 from skeem.core import SchemaGenerator
-from skeem.model import Resource, SqlResult, SqlTarget
+from skeem.model import Resource, SamplingConfig, SqlResult, SqlTarget
 from skeem.settings import PEEK_BYTES
 from tests.util import BACKENDS, get_basic_sql_reference, getcmd
 
@@ -124,3 +126,34 @@ def test_ndjson_infer_cli_stdin_with_content_type(ndjson_stream_basic, content_t
     computed = SqlResult(result.stdout).canonical
     reference = get_basic_sql_reference(table_name=table_name, backend=backend)
     assert computed == reference
+
+
+@pytest.mark.parametrize("full_scan", [False, True])
+@pytest.mark.parametrize(
+    "value,crate,postgresql",
+    [
+        ('"12.3456"', "STRING", "TEXT"),
+        ('"1990"', "TIMESTAMP WITHOUT TIME ZONE", "TIMESTAMP WITHOUT TIME ZONE"),
+        ('"20210101"', "TIMESTAMP WITHOUT TIME ZONE", "TIMESTAMP WITHOUT TIME ZONE"),
+        ('"42"', "INT", "INTEGER"),
+        ("12.3456", "DOUBLE", "DECIMAL(6, 4)"),
+    ],
+)
+def test_ndjson_infer_string_values(value: str, crate: str, postgresql: str, full_scan: bool):
+    """
+    String values are not converted to numbers before inferring their types, so they
+    yield the same types as string values of JSON documents.
+    """
+    ndjson = f'{{"id": 1, "value": {value}}}\n{{"id": 2, "value": {value}}}\n'.encode()
+    document = f'[{{"id": 1, "value": {value}}}, {{"id": 2, "value": {value}}}]'.encode()
+    for dialect, reference in [("crate", crate), ("postgresql", postgresql)]:
+        for content_type, data in [("ndjson", ndjson), ("json", document)]:
+            sg = SchemaGenerator(
+                resource=Resource(
+                    data=io.BytesIO(data),
+                    content_type=content_type,
+                    sampling=SamplingConfig(full_scan=full_scan),
+                ),
+                target=SqlTarget(dialect=dialect, table_name="foo"),
+            )
+            assert f'"value" {reference} NOT NULL' in sg.to_sql_ddl().canonical
@@ -0,0 +1,172 @@
+import io
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+
+from skeem.cli import cli
+from skeem.core import SchemaGenerator
+from skeem.model import Resource, SamplingConfig, SqlResult, SqlTarget
+
+DATA = b"""
+{"id": 1, "meta": {"user": "foo", "geo": {"lat": 42.42, "lon": 13.37}}, "extra": 1}
+{"id": 2, "meta": {"user": "bar", "agent": "curl"}}
+{"id": 3, "meta": {"user": "baz"}, "other": "qux"}
+""".lstrip()
+
+DATA_ARRAYS = b"""
+{"id": 1, "tags": ["foo", "bar"], "items": [{"sku": "a", "qty": 2}, {"sku": "b", "qty": 1, "price": 1.5}]}
+{"id": 2, "tags": [], "items": [], "matrix": [[1, 2], [3]]}
+""".lstrip()
+
+DATA_MIXED = b"""
+{"id": 1, "meta": 5}
+{"id": 2, "meta": {"user": "foo", "geo": {"lat": 42.42}}}
+{"id": 3}
+{"id": 4, "meta": {"user": "bar"}}
+""".lstrip()
+
+reference_flatten = textwrap.dedent(
+    """
+CREATE TABLE "events" (
+    "id" INT NOT NULL,
+    "meta_user" STRING NOT NULL,
+    "meta_geo_lat" DOUBLE,
+    "meta_geo_lon" DOUBLE,
+    "extra" INT,
+    "meta_agent" STRING,
+    "other" STRING,
+    PRIMARY KEY ("id")
+);
+    """
+).strip()
+
+reference_flatten_mixed = textwrap.dedent(
+    """
+CREATE TABLE "events" (
+    "id" INT NOT NULL,
+    "meta" INT,
+    "meta_user" STRING,
+    "meta_geo_lat" DOUBLE,
+    PRIMARY KEY ("id")
+);
+    """
+).strip()
+
+reference_object_crate = textwrap.dedent(
+    """
+CREATE TABLE "events" (
+    "id" INT NOT NULL,
+    "meta" OBJECT(DYNAMIC) AS ("user" STRING, "geo" OBJECT(DYNAMIC) AS ("lat" DOUBLE, "lon" DOUBLE), "agent" STRING) NOT NULL,
+    "extra" INT,
+    "other" STRING,
+    PRIMARY KEY ("id")
+);
+    """  # noqa: E501
+).strip()
+
+reference_object_postgresql = textwrap.dedent(
+    """
+CREATE TABLE "events" (
+    "id" SERIAL NOT NULL,
+    "meta" JSONB NOT NULL,
+    "extra" INTEGER,
+    "other" TEXT,
+    PRIMARY KEY ("id")
+);
+    """
+).strip()
+
+
+reference_arrays_crate = textwrap.dedent(
+    """
+CREATE TABLE "orders" (
+    "id" INT NOT NULL,
+    "tags" ARRAY(STRING) NOT NULL,
+    "items" ARRAY(OBJECT(DYNAMIC) AS ("sku" STRING, "qty" INT, "price" DOUBLE)) NOT NULL,
+    "matrix" ARRAY(ARRAY(INT)),
+    PRIMARY KEY ("id")
+);
+    """
+).strip()
+
+reference_arrays_postgresql = textwrap.dedent(
+    """
+CREATE TABLE "orders" (
+    "id" SERIAL NOT NULL,
+    "tags" TEXT[] NOT NULL,
+    "items" JSONB NOT NULL,
+    "matrix" JSONB,
+    PRIMARY KEY ("id")
+);
+    """
+).strip()
+
+
+@pytest.mark.parametrize("full_scan", [False, True])
+@pytest.mark.parametrize(
+    "nested,dialect,reference",
+    [
+        ("flatten", "crate", reference_flatten),
+        ("object", "crate", reference_object_crate),
+        ("object", "postgresql", reference_object_postgresql),
+    ],
+)
+def test_ndjson_nested_infer_library(nested: str, dialect: str, reference: str, full_scan: bool):
+    """
+    Nested objects of heterogeneous records are flattened into one column per path,
+    or mapped to object columns. Keys which are missing from any record are nullable.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(data=io.BytesIO(DATA), content_type="ndjson"),
+        target=SqlTarget(dialect=dialect, table_name="events", nested=nested),
+        sampling=SamplingConfig(full_scan=full_scan),
+    )
+    assert sg.to_sql_ddl().canonical == reference
+
+
+def test_ndjson_nested_infer_flatten_mixed():
+    """
+    Keys holding both scalar values and objects are flattened the same way, whether
+    column types are inferred from the sample, or from a full scan of the resource.
+    """
+
+    def infer(full_scan: bool) -> str:
+        sg = SchemaGenerator(
+            resource=Resource(data=io.BytesIO(DATA_MIXED), content_type="ndjson"),
+            target=SqlTarget(dialect="crate", table_name="events", nested="flatten"),
+            sampling=SamplingConfig(full_scan=full_scan),
+        )
+        return sg.to_sql_ddl().canonical
+
+    assert infer(full_scan=True) == infer(full_scan=False) == reference_flatten_mixed
+
+
+@pytest.mark.parametrize("full_scan", [False, True])
+@pytest.mark.parametrize(
+    "dialect,reference", [("crate", reference_arrays_crate), ("postgresql", reference_arrays_postgresql)]
+)
+def test_ndjson_nested_infer_arrays(dialect: str, reference: str, full_scan: bool):
+    """
+    Arrays are mapped to native array types, and objects within arrays to typed objects,
+    instead of unnesting them into child tables.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(data=io.BytesIO(DATA_ARRAYS), content_type="ndjson"),
+        target=SqlTarget(dialect=dialect, table_name="orders", nested="object"),
+        sampling=SamplingConfig(full_scan=full_scan),
+    )
+    assert sg.to_sql_ddl().canonical == reference
+
+
+def test_ndjson_nested_infer_cli(tmp_path):
+    """
+    CLI test: Select how to map nested objects.
+    """
+    path = tmp_path / "events.ndjson"
+    path.write_bytes(DATA)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, args=f"infer-ddl --dialect=crate --nested=object {path}", catch_exceptions=False)
+    assert result.exit_code == 0
+    assert SqlResult(result.stdout).canonical == reference_object_crate
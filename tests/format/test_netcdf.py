@@ -1,9 +1,14 @@
+from unittest import mock
+
+import fsspec
 import pytest
+import xarray as xr
 from click.testing import CliRunner
 
 from skeem.cli import cli
 from skeem.core import SchemaGenerator
 from skeem.model import Resource, SqlResult, SqlTarget
+from skeem.settings import PEEK_LINES
 from skeem.util.data import unwrap
 from tests.util import getcmd
 
@@ -58,3 +63,51 @@ def test_netcdf_infer_url(request, url):
 
     computed = SqlResult(result.stdout).canonical
     assert computed == reference
+
+
+def test_netcdf_infer_local_by_path(netcdf_file_aircraft):
+    """
+    Local files are opened by path, so they can be memory-mapped, instead of being read into memory.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(path=netcdf_file_aircraft),
+        target=SqlTarget(dialect="crate"),
+    )
+    with mock.patch("xarray.open_dataset", wraps=xr.open_dataset) as open_dataset:
+        computed = sg.to_sql_ddl().canonical
+    assert computed == reference
+    assert open_dataset.call_args.args[0] == str(netcdf_file_aircraft.absolute())
+
+
+def test_netcdf_infer_remote(netcdf_file_aircraft):
+    """
+    Remote resources are accessed using `fsspec` file objects, instead of reading them as a whole.
+    """
+    path = "memory://skeem-test/aircraft-track-lear.nc"
+    with fsspec.open(path, "wb") as f:
+        f.write(netcdf_file_aircraft.read_bytes())
+    try:
+        sg = SchemaGenerator(
+            resource=Resource(path=path),
+            target=SqlTarget(dialect="crate"),
+        )
+        with mock.patch("skeem.io.peek") as peek:
+            computed = sg.to_sql_ddl().canonical
+        assert peek.call_count == 0
+        assert computed == reference
+    finally:
+        fsspec.filesystem("memory").rm(path)
+
+
+def test_netcdf_deserialize_once(netcdf_file_aircraft):
+    """
+    The dataset is opened only once, and the first record is not lost.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(path=netcdf_file_aircraft),
+        target=SqlTarget(dialect="crate"),
+    )
+    with mock.patch("xarray.open_dataset", wraps=xr.open_dataset) as open_dataset:
+        sg.to_sql_ddl()
+    assert open_dataset.call_count == 1
+    assert sg.profiler.spans["infer_types"].rows == PEEK_LINES
@@ -1,9 +1,17 @@
+import gzip
+import io
+import textwrap
+from unittest import mock
+
+import pandas as pd
 import pytest
 from click.testing import CliRunner
 
+import skeem.io
 from skeem.cli import cli
 from skeem.core import SchemaGenerator
-from skeem.model import Resource, SqlResult, SqlTarget
+from skeem.model import Resource, SamplingConfig, SqlResult, SqlTarget
+from skeem.util.sql import sql_canonicalize
 from tests.util import get_basic_sql_reference, getcmd
 
 BACKEND = "frictionless"
@@ -75,3 +83,147 @@ def test_parquet_infer_cli_file_with_tablename(parquet_file_basic):
     computed = SqlResult(result.stdout).canonical
     reference = get_basic_sql_reference(table_name=table_name, backend=BACKEND)
     assert computed == reference
+
+
+def test_parquet_infer_footer_only(parquet_file_basic):
+    """
+    Verify the "parquet" backend does not read any data pages.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(
+            path=parquet_file_basic,
+        ),
+        target=SqlTarget(
+            dialect="crate",
+        ),
+    )
+
+    with mock.patch("fastparquet.core.read_col") as read_col:
+        computed = sg.to_sql_ddl().canonical
+    reference = get_basic_sql_reference(table_name="basic", backend=BACKEND)
+    assert computed == reference
+    assert sg.backend == "parquet"
+    assert read_col.call_count == 0
+
+
+def test_parquet_infer_footer_stream(parquet_stream_basic):
+    """
+    Verify the "parquet" backend also works on streams.
+    """
+    table_name = "foo"
+    sg = SchemaGenerator(
+        resource=Resource(
+            data=parquet_stream_basic,
+            content_type="parquet",
+        ),
+        target=SqlTarget(
+            dialect="crate",
+            table_name=table_name,
+        ),
+    )
+
+    computed = sg.to_sql_ddl().canonical
+    reference = get_basic_sql_reference(table_name=table_name, backend=BACKEND)
+    assert computed == reference
+
+
+def test_parquet_infer_footer_ambiguous(tmp_path):
+    """
+    Columns of type `BYTE_ARRAY` without annotation are sampled, in order to decide about their type.
+    The primary key is inferred from the uniqueness of the first column.
+    """
+    path = tmp_path / "ambiguous.parquet"
+    df = pd.DataFrame({"name": ["foo", "bar"], "data": [b"foo", b"bar"], "blob": [b"\xff", b"\xfe"]})
+    df.to_parquet(path, engine="fastparquet", object_encoding={"name": "utf8", "data": "bytes", "blob": "bytes"})
+
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="postgresql"),
+    )
+
+    computed = sg.to_sql_ddl().canonical
+    reference = sql_canonicalize(
+        textwrap.dedent(
+            """
+        CREATE TABLE ambiguous (
+            name TEXT NOT NULL,
+            data TEXT,
+            blob TEXT,
+            PRIMARY KEY (name)
+        );
+        """
+        )
+    ).strip("\n")
+    assert computed == reference
+
+
+def test_parquet_infer_footer_sample_closes_file(tmp_path):
+    """
+    Sampling `BYTE_ARRAY` columns closes the file it has opened.
+    """
+    path = tmp_path / "ambiguous.parquet"
+    df = pd.DataFrame({"name": ["foo", "bar"], "data": [b"foo", b"bar"]})
+    df.to_parquet(path, engine="fastparquet", object_encoding={"name": "utf8", "data": "bytes"})
+
+    handles = []
+    skeem_io_open = skeem.io.open
+
+    def tracking_open(*args, **kwargs):
+        handle = skeem_io_open(*args, **kwargs)
+        handles.append(handle)
+        return handle
+
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="postgresql"),
+    )
+    with mock.patch("skeem.io.open", side_effect=tracking_open):
+        sg.to_sql_ddl()
+
+    assert handles
+    assert all(handle.closed for handle in handles)
+
+
+def test_parquet_infer_compressed(tmp_path, parquet_file_basic):
+    """
+    Compressed Parquet files can not be read from their end, so they are decompressed as a whole.
+    """
+    path = tmp_path / "basic.parquet.gz"
+    path.write_bytes(gzip.compress(parquet_file_basic.read_bytes()))
+
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="crate"),
+    )
+
+    computed = sg.to_sql_ddl().canonical
+    reference = get_basic_sql_reference(table_name="basic", backend=BACKEND)
+    assert computed == reference
+
+
+def test_parquet_infer_frictionless_sample_rows(tmp_path):
+    """
+    The frictionless backend samples as many Parquet rows as requested.
+    """
+    path = tmp_path / "values.parquet"
+    pd.DataFrame({"id": range(300), "value": [float(index) for index in range(300)]}).to_parquet(
+        path, engine="fastparquet"
+    )
+
+    sg = SchemaGenerator(
+        resource=Resource(path=path, sampling=SamplingConfig(rows=300)),
+        target=SqlTarget(dialect="crate"),
+        backend="frictionless",
+    )
+
+    report = sg.to_report(["crate"])
+    assert report.sample_rows == 300
+
+
+def test_parquet_infer_footer_invalid():
+    with pytest.raises(ValueError) as ex:
+        SchemaGenerator(
+            resource=Resource(data=io.BytesIO(b"foobar"), content_type="parquet"),
+            target=SqlTarget(dialect="crate", table_name="foo"),
+        ).to_sql_ddl()
+    assert ex.match("Unable to read Parquet footer. Reason: Magic bytes not found")
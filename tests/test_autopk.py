@@ -1,8 +1,10 @@
 import re
 
+import pandas as pd
 import pytest
 
-from skeem.autopk import infer_pk
+from skeem.autopk import infer_pk, infer_pk_from_statistics
+from skeem.ddlgen.typehelpers import fold_statistics
 from skeem.types import ContentType
 
 
@@ -40,3 +42,42 @@ def test_autopk_content_type_unknown():
     with pytest.raises(NotImplementedError) as ex:
         infer_pk("", ContentType.PARQUET)
     assert ex.match("Failed to infer primary key. Reason: Unable to process content type: ContentType.PARQUET")
+
+
+def test_autopk_first_column_duplicates():
+    """
+    The first column is not used as primary key when it has duplicate values, or more than one NULL value.
+    """
+    assert infer_pk(pd.DataFrame({"foo": [1, 2, 3], "bar": [1, 1, 1]})) == "foo"
+    assert infer_pk(pd.DataFrame({"foo": [1, 2, 1], "bar": [1, 1, 1]})) is None
+    assert infer_pk(pd.DataFrame({"foo": ["a", None, None], "bar": [1, 1, 1]})) is None
+
+
+def test_autopk_statistics():
+    """
+    Infer primary key from column statistics of all records, as acquired by a full scan.
+    """
+    chunks = [pd.DataFrame({"foo": range(start, start + 1_000), "bar": 42}) for start in range(0, 8_000, 1_000)]
+    assert infer_pk_from_statistics(fold_statistics(chunks), ContentType.CSV) == "foo"
+
+    chunks.append(pd.DataFrame({"foo": range(1_000), "bar": 42}))
+    assert infer_pk_from_statistics(fold_statistics(chunks), ContentType.CSV) is None
+    assert infer_pk_from_statistics(fold_statistics([pd.DataFrame({"foo": [0.5, 1.5]})])) is None
+    assert infer_pk_from_statistics(fold_statistics([pd.DataFrame({"bar": [1], "id": [1]})])) == "id"
+
+
+def test_autopk_statistics_estimated():
+    """
+    When uniqueness has only been estimated, because there are more distinct values than
+    can be counted exactly, the first column is not used as primary key. The estimate
+    can not rule out a small fraction of duplicates, which would violate the constraint.
+    """
+    chunks = [pd.DataFrame({"foo": range(start, start + 10_000), "bar": 42}) for start in range(0, 199_500, 10_000)]
+    chunks.append(pd.DataFrame({"foo": range(500), "bar": 42}))
+    statistics = fold_statistics(chunks)
+    assert not statistics["foo"].cardinality.is_exact
+    assert statistics["foo"].is_unique
+    assert infer_pk_from_statistics(statistics, ContentType.CSV) is None
+
+    chunks = [pd.DataFrame({"foo": range(start, start + 5_000), "bar": 42}) for start in range(0, 50_000, 5_000)]
+    assert infer_pk_from_statistics(fold_statistics(chunks), ContentType.CSV) is None
@@ -0,0 +1,174 @@
+import io
+import os
+import shutil
+from unittest import mock
+
+from click.testing import CliRunner
+
+from skeem.cache import InferenceCache, fingerprint
+from skeem.cli import cli
+from skeem.core import SchemaGenerator
+from skeem.model import Resource, SamplingConfig, SqlResult, SqlTarget
+from tests.util import get_basic_sql_reference
+
+
+def test_cache_get_put(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite")
+    assert cache.get("foo") is None
+    cache.put("foo", SqlResult("CREATE TABLE foo"))
+    assert cache.get("foo") == SqlResult("CREATE TABLE foo")
+    cache.clear()
+    assert cache.get("foo") is None
+
+
+def test_cache_refresh(tmp_path):
+    """
+    When refreshing the cache, entries are written, but not read.
+    """
+    InferenceCache(tmp_path / "cache.sqlite").put("foo", "bar")
+    cache = InferenceCache(tmp_path / "cache.sqlite", refresh=True)
+    assert cache.get("foo") is None
+    cache.put("foo", "baz")
+    assert InferenceCache(tmp_path / "cache.sqlite").get("foo") == "baz"
+
+
+def test_cache_ttl(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite", ttl=60)
+    with mock.patch("time.time", return_value=1000.0):
+        cache.put("foo", "bar")
+    with mock.patch("time.time", return_value=1059.0):
+        assert cache.get("foo") == "bar"
+    with mock.patch("time.time", return_value=1061.0):
+        assert cache.get("foo") is None
+
+
+def test_cache_evict_least_recently_used(tmp_path):
+    """
+    Beyond the size limit, least recently used entries are evicted.
+    """
+    cache = InferenceCache(tmp_path / "cache.sqlite", max_bytes=250)
+    with mock.patch("time.time", return_value=1000.0):
+        cache.put("foo", "x" * 100)
+    with mock.patch("time.time", return_value=1001.0):
+        cache.put("bar", "x" * 100)
+    with mock.patch("time.time", return_value=1002.0):
+        assert cache.get("foo") is not None
+    with mock.patch("time.time", return_value=1003.0):
+        cache.put("baz", "x" * 100)
+        assert cache.get("foo") is not None
+        assert cache.get("bar") is None
+        assert cache.get("baz") is not None
+
+
+def test_fingerprint_file(tmp_path, csv_file_basic):
+    """
+    The fingerprint of a file changes when it is modified.
+    """
+    path = tmp_path / "basic.csv"
+    shutil.copy(csv_file_basic, path)
+    first = fingerprint(Resource(path=path))
+    assert fingerprint(Resource(path=path)) == first
+    with open(path, "a") as f:
+        f.write('3,"baz",,"plum",1.23\n')
+    os.utime(path, (1, 1))
+    assert fingerprint(Resource(path=path)) != first
+
+
+def test_fingerprint_stream():
+    """
+    Streams are identified by their content, and replayed afterwards.
+    Streams larger than the byte budget of the sample can not be cached.
+    """
+    resource = Resource(data=io.BytesIO(b"id,name\n1,foo\n"))
+    assert fingerprint(resource) == fingerprint(Resource(data=io.BytesIO(b"id,name\n1,foo\n")))
+    assert resource.data.read() == b"id,name\n1,foo\n"
+
+    resource = Resource(data=io.BytesIO(b"id,name\n1,foo\n"), sampling=SamplingConfig(bytes=10))
+    assert fingerprint(resource) is None
+    assert resource.data.read() == b"id,name\n1,foo\n"
+
+
+def test_schema_generator_cache(tmp_path, ndjson_file_basic):
+    """
+    Results of unchanged resources are served from the cache. The cache key
+    includes the dialect, so other dialects will be inferred again.
+    """
+    cache = InferenceCache(tmp_path / "cache.sqlite")
+
+    def infer(dialect="crate"):
+        sg = SchemaGenerator(resource=Resource(path=ndjson_file_basic), target=SqlTarget(dialect=dialect), cache=cache)
+        with mock.patch.object(sg, "infer", wraps=sg.infer) as infer_:
+            result = sg.to_sql_ddl()
+        return result, infer_.call_count
+
+    assert infer() == (infer()[0], 1)
+    result, calls = infer()
+    assert calls == 0
+    assert result.canonical == get_basic_sql_reference(table_name="basic")
+    assert infer(dialect="postgresql")[1] == 1
+
+
+def test_schema_generator_cache_statistics(tmp_path, ndjson_file_basic):
+    """
+    Column statistics of a full scan are cached, and reused for other dialects.
+    Flattening nested objects needs another scan, because flattened records are scanned.
+    """
+    cache = InferenceCache(tmp_path / "cache.sqlite")
+    sampling = SamplingConfig(full_scan=True)
+    results = {}
+    scan_original = SchemaGenerator._ddlgen_scan
+    with mock.patch.object(SchemaGenerator, "_ddlgen_scan", autospec=True, side_effect=scan_original) as scan:
+        for dialect in ["crate", "postgresql"]:
+            sg = SchemaGenerator(
+                resource=Resource(path=ndjson_file_basic),
+                target=SqlTarget(dialect=dialect),
+                sampling=sampling,
+                cache=cache,
+            )
+            results[dialect] = sg.to_sql_ddl()
+        assert scan.call_count == 1
+        SchemaGenerator(
+            resource=Resource(path=ndjson_file_basic),
+            target=SqlTarget(dialect="crate", nested="flatten"),
+            sampling=sampling,
+            cache=cache,
+        ).to_sql_ddl()
+    assert scan.call_count == 2
+    assert results["crate"].canonical == get_basic_sql_reference(table_name="basic")
+    assert "SERIAL" in results["postgresql"].sql
+
+
+def test_schema_generator_batch_cache(tmp_path, csv_file_basic, ndjson_file_basic):
+    """
+    In batch mode, cached resources are not read at all.
+    """
+    cache = InferenceCache(tmp_path / "cache.sqlite")
+    paths = [csv_file_basic, ndjson_file_basic]
+    first = SchemaGenerator.batch(paths, dialect="crate", workers=0, cache=cache)
+    with mock.patch("skeem.model.Resource.peek") as peek:
+        second = SchemaGenerator.batch(paths, dialect="crate", workers=0, cache=cache)
+    assert peek.call_count == 0
+    assert [item.result for item in second] == [item.result for item in first]
+    assert second[0].result.canonical == get_basic_sql_reference(table_name="basic")
+
+
+def test_infer_ddl_cache_options(cache_directory, ndjson_file_basic):
+    """
+    CLI test: The persistent cache is disabled by default, and can be enabled or refreshed.
+    """
+    runner = CliRunner()
+
+    for options in ["", "--no-cache"]:
+        result = runner.invoke(
+            cli, args=f"infer-ddl --dialect=crate {options} {ndjson_file_basic}", catch_exceptions=False
+        )
+        assert result.exit_code == 0
+        assert not cache_directory.exists()
+
+    for options in ["--cache", "--refresh"]:
+        result = runner.invoke(
+            cli, args=f"infer-ddl --dialect=crate {options} {ndjson_file_basic}", catch_exceptions=False
+        )
+        assert result.exit_code == 0
+        assert 'CREATE TABLE "basic"' in result.stdout
+        assert (cache_directory / "inference.sqlite").exists()
@@ -1,3 +1,6 @@
+import bz2
+import json
+
 import pytest
 from click.testing import CliRunner
 
@@ -6,7 +9,7 @@ from skeem.cli import cli
 
 def test_generic_infer_cli_stdin_without_content_type():
     """
-    CLI test: Reading data from stdin needs a content type.
+    CLI test: Reading data from stdin needs a content type, when it can not be detected.
     """
     runner = CliRunner()
 
@@ -17,4 +20,232 @@ def test_generic_infer_cli_stdin_without_content_type():
             input="",
             catch_exceptions=False,
         )
-    assert ex.match("Introspection-based content type detection not implemented yet.")
+    assert ex.match("Unable to detect content type.")
+
+
+@pytest.mark.parametrize("filename", ["basic.csv", "basic.ndjson", "basic.lp", "basic.parquet"])
+def test_infer_ddl_stdin_detect_content_type(filename):
+    """
+    CLI test: The content type of data from stdin is detected from its first bytes.
+    """
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args="infer-ddl --dialect=postgresql --table-name=foo -",
+        input=open(f"tests/testdata/{filename}", "rb").read(),
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert "CREATE TABLE" in result.stdout
+    assert "price" in result.stdout
+
+
+def test_infer_ddl_quiet(csv_file_basic):
+    """
+    CLI test: Without `--verbose`, no log messages are emitted to stderr.
+    """
+    runner = CliRunner()
+    result = runner.invoke(cli, args=f"infer-ddl --dialect=crate,sqlite {csv_file_basic}", catch_exceptions=False)
+    assert result.exit_code == 0
+    assert result.stderr == ""
+
+
+def test_infer_ddl_multiple_dialects(csv_file_basic):
+    """
+    CLI test: Emit SQL DDL for multiple dialects as JSON map.
+    """
+    runner = CliRunner()
+    result = runner.invoke(cli, args=f"infer-ddl --dialect=crate,postgresql {csv_file_basic}", catch_exceptions=False)
+    assert result.exit_code == 0
+    ddl = json.loads(result.stdout)
+    assert list(ddl) == ["crate", "postgresql"]
+    assert '"price" DOUBLE NOT NULL' in ddl["crate"]
+    assert '"price" DECIMAL(2, 2) NOT NULL' in ddl["postgresql"]
+
+
+def test_infer_ddl_multiple_dialects_output_dir(tmp_path, csv_file_basic):
+    """
+    CLI test: Write one SQL DDL file per dialect.
+    """
+    output_dir = tmp_path / "ddl"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=crate,sqlite --output-dir={output_dir} {csv_file_basic}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    assert sorted(path.name for path in output_dir.iterdir()) == ["basic.crate.sql", "basic.sqlite.sql"]
+    assert (output_dir / "basic.sqlite.sql").read_text().startswith('CREATE TABLE "basic"')
+
+
+def test_infer_ddl_format_json(csv_file_basic):
+    """
+    CLI test: Report inferred schema in JSON format.
+    """
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, args=f"infer-ddl --dialect=crate,postgresql --format=json {csv_file_basic}", catch_exceptions=False
+    )
+    assert result.exit_code == 0
+    report = json.loads(result.stdout)
+    assert report["primary_key"] == "id"
+    assert report["sample_rows"] == 2
+    assert [column["name"] for column in report["columns"]] == ["id", "name", "date", "fruits", "price"]
+    assert report["columns"][4]["type"] == {"crate": "DOUBLE", "postgresql": "DECIMAL(2, 2)"}
+    assert list(report["ddl"]) == ["crate", "postgresql"]
+
+
+def test_infer_ddl_format_yaml(tmp_path, csv_file_basic):
+    """
+    CLI test: Write report of inferred schema in YAML format.
+    """
+    import yaml
+
+    output_dir = tmp_path / "report"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=crate --format=yaml --output-dir={output_dir} {csv_file_basic}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    report = yaml.safe_load((output_dir / "basic.yaml").read_text())
+    assert report["table_name"] == "basic"
+    assert report["columns"][0]["sample_values"] == [1, 2]
+    assert report["ddl"]["crate"].startswith('CREATE TABLE "basic"')
+
+
+def test_infer_ddl_batch_stdout(csv_file_basic, ndjson_file_basic):
+    """
+    CLI test: Emit a combined SQL DDL script for multiple inputs.
+    """
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl-batch --dialect=crate --workers=0 {csv_file_basic} tests/testdata/basic-records.json",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert 'CREATE TABLE "basic"' in result.stdout
+    assert 'CREATE TABLE "basic_records"' in result.stdout
+
+
+def test_infer_ddl_batch_stdout_duplicate_table_name(csv_file_basic, ndjson_file_basic):
+    """
+    CLI test: Inputs sharing the same table name are reported, instead of emitting an invalid SQL DDL script.
+    """
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl-batch --dialect=crate --workers=0 {csv_file_basic} {ndjson_file_basic}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 1
+    assert result.stdout.count('CREATE TABLE "basic"') == 1
+
+
+def test_infer_ddl_batch_output_dir(tmp_path):
+    """
+    CLI test: Write one SQL DDL file per table, using inputs from glob pattern and manifest file.
+    Failing items are reported, and signalled by the exit code.
+    """
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# Comment\ntests/testdata/basic.ndjson\ntests/testdata/non-existent.csv\n")
+    output_dir = tmp_path / "ddl"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl-batch --dialect=crate --workers=0 --manifest={manifest} --output-dir={output_dir} "
+        f"'tests/testdata/basic-*.json'",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 1
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        "basic-document.sql",
+        "basic-nested.sql",
+        "basic-records.sql",
+        "basic.sql",
+    ]
+    assert "PRIMARY KEY" in (output_dir / "basic.sql").read_text()
+
+
+@pytest.mark.parametrize("strategy,expected", [("head", '"value" INT'), ("stride", '"value" STRING')])
+def test_infer_ddl_sample_strategy(tmp_path, strategy, expected):
+    """
+    CLI test: Sample lines across the input file, in order to catch type changes deep within the data.
+    """
+    path = tmp_path / "values.csv"
+    path.write_text("id,value\n" + "".join(f"{index},{index if index < 800 else 'foo'}\n" for index in range(1000)))
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=crate --sample-rows=10 --sample-bytes=800 --sample-strategy={strategy} {path}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert expected in result.stdout
+
+
+@pytest.mark.parametrize("suffix", ["csv", "ndjson"])
+def test_infer_ddl_full_scan(tmp_path, suffix):
+    """
+    CLI test: Infer column types from all records, catching type changes and NULL values deep within the data.
+    """
+    path = tmp_path / f"values.{suffix}"
+    records = [{"id": index, "value": index if index < 900 else index + 0.5} for index in range(1000)]
+    records[950]["id"] = None
+    if suffix == "csv":
+        path.write_text(
+            "id,value\n"
+            + "".join(f"{'' if record['id'] is None else record['id']},{record['value']}\n" for record in records)
+        )
+    else:
+        path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=postgresql --full-scan {path}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert '"id" INTEGER,' in result.stdout
+    assert '"value" DECIMAL(4, 1) NOT NULL' in result.stdout
+
+
+def test_infer_ddl_workers(tmp_path):
+    """
+    CLI test: Infer column types of a wide table in parallel.
+    """
+    path = tmp_path / "wide.csv"
+    columns = [f"value_{index}" for index in range(120)]
+    path.write_text(",".join(columns) + "\n" + ",".join(str(index) for index in range(120)) + "\n")
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=postgresql --workers=2 {path}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert result.stdout.count(" INTEGER NOT NULL") == 120
+    assert '"value_119" INTEGER NOT NULL' in result.stdout
+
+
+@pytest.mark.parametrize("full_scan", [False, True])
+def test_infer_ddl_compressed(tmp_path, full_scan):
+    """
+    CLI test: Infer SQL DDL from a compressed file, deriving the content type from its double extension.
+    """
+    path = tmp_path / "data.ndjson.bz2"
+    path.write_bytes(bz2.compress(open("tests/testdata/basic.ndjson", "rb").read()))
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=postgresql {'--full-scan' if full_scan else ''} {path}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert 'CREATE TABLE "data"' in result.stdout
+    assert '"price" DECIMAL(2, 2) NOT NULL' in result.stdout
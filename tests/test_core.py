@@ -1,11 +1,15 @@
 import io
+import logging
+import lzma
+from unittest import mock
 
 import pandas as pd
 import pytest
 
 from skeem.autopk import infer_pk
 from skeem.core import SchemaGenerator
-from skeem.model import Resource, SqlTarget
+from skeem.model import Resource, SamplingConfig, SqlTarget
+from tests.util import get_basic_sql_reference
 
 
 def test_schema_generator_without_dialect():
@@ -30,7 +34,7 @@ def test_schema_generator_without_content_type():
             target=SqlTarget(dialect="postgresql"),
         )
         sg.to_sql_ddl()
-    assert ex.match("Introspection-based content type detection not implemented yet")
+    assert ex.match("Unable to detect content type")
 
 
 def test_schema_generator_invalid_content_type():
@@ -74,3 +78,176 @@ def test_infer_pk_from_dataframe():
     df = pd.DataFrame.from_dict(data=data)
     pk = infer_pk(df)
     assert pk == "id"
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_schema_generator_batch(csv_file_basic, ndjson_file_basic, parquet_file_basic, workers):
+    """
+    Infer SQL DDL for multiple resources, with per-item error reporting.
+    """
+    results = SchemaGenerator.batch(
+        [csv_file_basic, ndjson_file_basic, "tests/testdata/non-existent.csv", parquet_file_basic],
+        dialect="crate",
+        workers=workers,
+    )
+    assert [result.path for result in results] == [
+        "tests/testdata/basic.csv",
+        "tests/testdata/basic.ndjson",
+        "tests/testdata/non-existent.csv",
+        "tests/testdata/basic.parquet",
+    ]
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[0].result.canonical == get_basic_sql_reference(table_name="basic")
+    assert results[1].result.canonical == get_basic_sql_reference(table_name="basic")
+    assert results[2].error.startswith("FileNotFoundError")
+    assert results[3].result.canonical == get_basic_sql_reference(table_name="basic", backend="frictionless")
+
+
+def test_schema_generator_batch_worker_failure(csv_file_basic, ndjson_file_basic):
+    """
+    When a worker fails, for example because its process crashed, the error is
+    reported for the corresponding item, and the other results are retained.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    from skeem.core import _batch_infer
+
+    def batch_infer(item, *args, **kwargs):
+        if item.path == str(ndjson_file_basic):
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        return _batch_infer(item, *args, **kwargs)
+
+    with mock.patch("skeem.core._batch_infer", side_effect=batch_infer):
+        results = SchemaGenerator.batch([csv_file_basic, ndjson_file_basic], dialect="crate", workers=0)
+    assert [result.ok for result in results] == [True, False]
+    assert results[0].result.canonical == get_basic_sql_reference(table_name="basic")
+    assert results[1].table_name == "basic"
+    assert results[1].error.startswith("BrokenProcessPool: A process in the process pool was terminated abruptly")
+
+
+def test_schema_generator_frictionless_sample_only(tmp_path):
+    """
+    The `frictionless` backend reads only the sample rows, for inferring both the schema and the primary key.
+    """
+    from frictionless.table import Row
+
+    path = tmp_path / "items.csv"
+    path.write_text("id,name\n" + "".join(f"{index},foo-{index}\n" for index in range(1_000)))
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="crate"),
+        backend="frictionless",
+        sampling=SamplingConfig(rows=10),
+    )
+    with mock.patch("frictionless.resources.table.Row", side_effect=Row) as row:
+        result = sg.to_sql_ddl()
+    # The sample rows are read from the resource, and converted to a DataFrame.
+    assert row.call_count == 2 * 10
+    assert sg.target.primary_key == "id"
+    assert result.canonical == "CREATE TABLE items (\n    id INT NOT NULL,\n    name STRING,\n    PRIMARY KEY (id)\n);"
+
+
+def test_schema_generator_frictionless_compressed_sample_only(tmp_path):
+    """
+    The `frictionless` backend decompresses only the sample of line-based resources, up to a complete line.
+    """
+    path = tmp_path / "items.csv.xz"
+    payload = "id,name\n" + "".join(f"{index},foo-{index}\n" for index in range(100_000))
+    path.write_bytes(lzma.compress(payload.encode()))
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="crate"),
+        backend="frictionless",
+        sampling=SamplingConfig(rows=10, bytes=1_000),
+    )
+    report = sg.to_report(["crate"])
+    assert 1_000 <= report.sample_bytes < 1_020
+    assert report.primary_key == "id"
+
+
+def test_schema_generator_frictionless_compressed_document(tmp_path, caplog):
+    """
+    The `frictionless` backend decompresses documents as a whole, signalling the speed bump.
+    """
+    path = tmp_path / "items.json.xz"
+    path.write_bytes(lzma.compress(b'[{"id": 1, "name": "foo"}, {"id": 2, "name": "bar"}]'))
+    sg = SchemaGenerator(
+        resource=Resource(path=path),
+        target=SqlTarget(dialect="crate"),
+        backend="frictionless",
+    )
+    with caplog.at_level(logging.INFO):
+        report = sg.to_report(["crate"])
+    assert report.sample_rows == 2
+    assert "WARNING: Hitting a speed bump by needing to decompress resource as a whole" in caplog.text
+
+
+@pytest.mark.parametrize("backend", ["ddlgen", "frictionless"])
+def test_schema_generator_multiple_dialects(csv_file_basic, backend):
+    """
+    Infer the schema once, and generate SQL DDL statements for multiple dialects.
+    """
+    sg = SchemaGenerator(resource=Resource(path=csv_file_basic), target=SqlTarget(dialect="crate"), backend=backend)
+    with mock.patch.object(sg, "infer", wraps=sg.infer) as infer:
+        results = sg.to_sql_ddl_dialects(["crate", "postgresql", "sqlite"])
+    assert infer.call_count == 1
+    assert list(results) == ["crate", "postgresql", "sqlite"]
+    assert results["crate"].canonical == get_basic_sql_reference(table_name="basic", backend=backend)
+    assert "SERIAL" in results["postgresql"].sql
+    assert "SERIAL" not in results["sqlite"].sql
+
+
+def test_schema_generator_infer_table(csv_file_basic):
+    """
+    The `ddlgen` backend exposes the dialect-neutral SQLAlchemy table.
+    """
+    import sqlalchemy as sa
+
+    sg = SchemaGenerator(resource=Resource(path=csv_file_basic), target=SqlTarget(dialect="crate"))
+    inferred = sg.infer()
+    try:
+        assert isinstance(inferred.table.table, sa.Table)
+        assert [column.name for column in inferred.table.table.columns] == ["id", "name", "date", "fruits", "price"]
+    finally:
+        inferred.dispose()
+
+
+@pytest.mark.parametrize("backend", ["ddlgen", "frictionless"])
+def test_schema_generator_report(csv_file_basic, backend):
+    """
+    Report the inferred schema including column statistics, the sample size, and stage timings.
+    """
+    sg = SchemaGenerator(resource=Resource(path=csv_file_basic), target=SqlTarget(dialect="crate"), backend=backend)
+    report = sg.to_report(["crate", "postgresql"])
+    assert report.table_name == "basic"
+    assert report.primary_key == "id"
+    assert report.backend == backend
+    assert report.content_type == "CSV"
+    assert report.sample_rows == 2
+    assert report.sample_bytes == 97
+    assert [column.name for column in report.columns] == ["id", "name", "date", "fruits", "price"]
+    assert report.columns[0].type == {"crate": "INT", "postgresql": "INTEGER"}
+    assert report.columns[0].nullable is False
+    assert report.columns[0].unique is True
+    assert report.columns[0].sample_values == [1, 2]
+    assert report.columns[1].max_length == 3
+    assert report.columns[2].nullable is True
+    assert report.to_dict()["columns"][2]["sample_values"] == ["2014-10-31T09:22:56"]
+    assert report.ddl["crate"] == sg.to_sql_ddl_dialects(["crate"])["crate"].pretty
+    assert {"detect", "infer_types", "serialize"} <= set(report.timings)
+
+
+def test_schema_generator_report_full_scan(csv_file_basic):
+    """
+    When scanning the whole resource, the number of records and the cardinality are reported from all records.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(path=csv_file_basic),
+        target=SqlTarget(dialect="crate"),
+        sampling=SamplingConfig(full_scan=True),
+    )
+    report = sg.to_report()
+    assert list(report.ddl) == ["crate"]
+    assert report.sample_rows == 2
+    assert report.columns[0].cardinality == 2
+    assert "scan" in report.timings
@@ -0,0 +1,262 @@
+import datetime as dt
+import io
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy_cratedb.dialect import CrateDialect
+
+from skeem.cardinality import CardinalityEstimator
+from skeem.ddlgen.ddlgenerator import NestedArray, NestedObject, TablePlus
+from skeem.ddlgen.reshape import flatten_record, wrap_nested
+from skeem.ddlgen.sources import SourcePlus, _eval_ndjson
+from skeem.ddlgen.typehelpers import ColumnStatistics, fold_records, fold_statistics, infer_column
+from skeem.types import NestedStrategy
+
+
+def determine_types(records, statistics=None, executor=None, nested=NestedStrategy.RELATIONAL):
+    table = TablePlus.__new__(TablePlus)
+    table.data = [OrderedDict(record) for record in records]
+    table.statistics = statistics
+    table.executor = executor
+    table.nested = nested
+    table.varying_length_text = True
+    table.data_size_cushion = 0
+    table._determine_types()
+    return table
+
+
+def test_determine_types_columnar():
+    """
+    Verify column types, nullability, and uniqueness, inferred column by column.
+    """
+    records = [
+        {
+            "id": i,
+            "name": f"name {i}",
+            "timestamp": (dt.datetime(2023, 1, 1) + dt.timedelta(minutes=i)).isoformat(),
+            "price": i / 8,
+            "flag": "yes" if i % 2 else "no",
+            "code": str(i).zfill(6),
+            "bigint": i * 10_000_000_000,
+        }
+        for i in range(10_000)
+    ]
+    records[42]["name"] = ""
+    del records[4242]["price"]
+
+    table = determine_types(records)
+    columns = table.columns
+    assert list(columns) == ["id", "name", "timestamp", "price", "flag", "code", "bigint"]
+    assert columns["id"]["satype"] is sa.Integer
+    assert isinstance(columns["name"]["satype"], sa.Text)
+    assert columns["timestamp"]["satype"] is sa.DateTime
+    assert isinstance(columns["price"]["satype"], sa.DECIMAL)
+    assert (columns["price"]["satype"].precision, columns["price"]["satype"].scale) == (7, 3)
+    assert columns["flag"]["satype"] is sa.Boolean
+    assert columns["code"]["satype"] is sa.Integer
+    assert columns["bigint"]["satype"] is sa.BigInteger
+
+    assert [name for name, column in columns.items() if column["is_nullable"]] == ["name", "price"]
+    assert [name for name, column in columns.items() if column["is_unique"]] == [
+        "id",
+        "name",
+        "timestamp",
+        "price",
+        "code",
+        "bigint",
+    ]
+
+
+def test_determine_types_dateutil_not_per_value():
+    """
+    Only ambiguous values are parsed using `dateutil`, once per distinct value.
+    """
+    records = [{"date": value, "number": str(i)} for i, value in enumerate(["Jan 17 2012", "2014-10-31"] * 500)]
+    with mock.patch("dateutil.parser.parse", wraps=dt.datetime) as parse:
+        parse.side_effect = lambda value: dt.datetime(2012, 1, 17)
+        table = determine_types(records)
+    assert table.columns["date"]["satype"] is sa.DateTime
+    assert table.columns["number"]["satype"] is sa.Integer
+    assert parse.call_count == 1
+
+
+def test_determine_types_nested():
+    """
+    Nested values are stored as strings, and annotated with a comment.
+    """
+    table = determine_types([{"tags": ["foo", "bar"]}, {"tags": ["foo", "bar"]}])
+    assert isinstance(table.columns["tags"]["satype"], sa.Text)
+    assert table.columns["tags"]["is_unique"] is False
+    assert table.comments["tags"].startswith("nested values! example:")
+
+
+def test_infer_column_mixed():
+    """
+    Mixed types resolve to the least restrictive type.
+    """
+    assert infer_column(pd.Series([1, "2", 3.5], dtype=object))["sample_datum"] == Decimal("9.9")
+    assert infer_column(pd.Series([True, "no", 42], dtype=object))["sample_datum"] == 42
+    assert infer_column(pd.Series(["2014-10-31", "foo"], dtype=object))["sample_datum"] == "2014-10-31"
+    assert infer_column(pd.Series([None, ""], dtype=object)) == {
+        "sample_datum": None,
+        "str_length": 0,
+        "is_nullable": True,
+        "is_unique": True,
+    }
+
+
+def test_determine_types_scan():
+    """
+    Column types are inferred from all chunks of the resource, not only from the sample.
+    """
+    records = [{"id": i, "amount": i, "name": "foo"} for i in range(10)]
+    chunks = [
+        pd.DataFrame(records),
+        pd.DataFrame([{"id": 10, "amount": 10.25, "name": None, "late": "bar"}]),
+        pd.DataFrame([{"id": 11, "amount": 11, "name": "foobar"}]),
+    ]
+    table = determine_types(records[:2], statistics=fold_statistics(chunks))
+    columns = table.columns
+    assert list(columns) == ["id", "amount", "name", "late"]
+    assert columns["id"]["satype"] is sa.Integer
+    assert isinstance(columns["amount"]["satype"], sa.DECIMAL)
+    assert columns["name"]["str_length"] == 6
+    assert [name for name, column in columns.items() if column["is_nullable"]] == ["name", "late"]
+    assert [name for name, column in columns.items() if column["is_unique"]] == ["id", "amount"]
+
+
+def test_fold_records_sparse():
+    """
+    Records are folded without aligning them, and keys which are missing from any record are nullable.
+    """
+    records = [{"id": i, f"key_{i % 1_000}": i} for i in range(3_000)]
+    records[42]["meta"] = {"user": "foo", "geo": {"lat": 1.5}}
+    records[43]["meta"] = {"user": "bar"}
+    statistics = fold_records(records, chunksize=1_000)
+    assert len(statistics) == 1_002
+    assert statistics["id"].presence == statistics["id"].rows == 3_000
+    assert statistics["id"].to_column()["is_nullable"] is False
+    assert statistics["id"].is_unique is True
+    assert statistics["key_42"].presence == 3
+    assert statistics["key_42"].to_column()["is_nullable"] is True
+    assert statistics["key_42"].is_unique is False
+
+    meta = statistics["meta"]
+    assert meta.is_object is True
+    assert meta.objects == 2
+    assert meta.children["user"].is_nullable is False
+    assert meta.children["geo"].is_nullable is True
+    flat = fold_records(map(flatten_record, records), chunksize=1_000)
+    assert [col_name for col_name in flat if col_name.startswith("meta.")] == ["meta.user", "meta.geo.lat"]
+    assert flat["meta.user"].is_nullable is True
+    assert flat["meta.geo.lat"].is_nullable is True
+    assert meta.children["user"].is_nullable is False
+
+
+def test_determine_types_nested_object():
+    """
+    With the `object` strategy, columns of nested objects and arrays are mapped to nested types,
+    inferred from the statistics of each path, without a comment. Columns which also contain
+    other values are stored as strings.
+    """
+    records = [
+        {"meta": {"user": "foo", "geo": {"lat": 1.5}}, "tags": ["foo"], "mixed": {"user": "foo"}},
+        {"meta": None, "tags": [], "mixed": "bar"},
+    ]
+    table = determine_types([wrap_nested(record) for record in records], nested=NestedStrategy.OBJECT)
+    assert isinstance(table.columns["meta"]["satype"], NestedObject)
+    assert table.columns["meta"]["is_nullable"] is True
+    assert isinstance(table.columns["tags"]["satype"], NestedArray)
+    assert table.columns["tags"]["is_nullable"] is False
+    assert "meta" not in table.comments
+    assert "tags" not in table.comments
+    assert isinstance(table.columns["mixed"]["satype"], sa.Text)
+    assert table.comments["mixed"].startswith("nested values! example:")
+
+    meta = sa.Column("meta", table.columns["meta"]["satype"])
+    assert str(meta.type.compile(dialect=CrateDialect())) == (
+        'OBJECT(DYNAMIC) AS ("user" STRING, "geo" OBJECT(DYNAMIC) AS ("lat" DOUBLE))'
+    )
+    assert str(meta.type.compile(dialect=postgresql.dialect())) == "JSONB"
+    assert str(meta.type.compile(dialect=sqlite.dialect())) == "JSON"
+
+
+def test_nested_array_types():
+    """
+    Arrays are mapped to `ARRAY(...)` on CrateDB, and to arrays of scalar values, or `JSONB`, on PostgreSQL.
+    """
+    tags = NestedArray(sa.Text())
+    items = NestedArray(NestedObject({"sku": sa.Text(), "qty": sa.Integer()}))
+    assert str(tags.compile(dialect=CrateDialect())) == "ARRAY(STRING)"
+    assert str(tags.compile(dialect=postgresql.dialect())) == "TEXT[]"
+    assert str(tags.compile(dialect=sqlite.dialect())) == "JSON"
+    assert str(items.compile(dialect=CrateDialect())) == 'ARRAY(OBJECT(DYNAMIC) AS ("sku" STRING, "qty" INT))'
+    assert str(items.compile(dialect=postgresql.dialect())) == "JSONB"
+
+
+def test_column_statistics_equivalent():
+    """
+    Folding column statistics chunk by chunk yields the same outcome as inferring the whole column.
+    """
+
+    def outcome(column):
+        # The SQL type of string columns is sized by `str_length`, the representative value does not matter.
+        datum = column.pop("sample_datum")
+        return type(datum), None if isinstance(datum, str) else datum, column
+
+    series = pd.Series(["1", "-42", "", "3.5", None, "2014-10-31", "yes"] * 3, dtype=object)
+    for end in range(1, len(series)):
+        stats = ColumnStatistics()
+        for start in range(0, end, 2):
+            stats.update(series[start : min(start + 2, end)])
+        assert outcome(stats.to_column()) == outcome(infer_column(series[:end]))
+
+
+def test_column_statistics_cardinality():
+    """
+    Uniqueness is decided by a cardinality estimator, which degrades to HyperLogLog beyond a threshold.
+    """
+    stats = ColumnStatistics(estimator=lambda: CardinalityEstimator(exact_max=1_000))
+    for start in range(0, 100_000, 10_000):
+        stats.update(pd.Series(range(start, start + 10_000), dtype=object))
+    assert stats.cardinality.is_exact is False
+    assert stats.cardinality.registers.nbytes == 2**14
+    assert abs(stats.cardinality.cardinality - 100_000) < 100_000 * 0.03
+    assert stats.is_unique is True
+
+    stats.update(pd.Series(range(10_000), dtype=object))
+    assert stats.is_unique is False
+
+
+def test_determine_types_parallel():
+    """
+    Column types of wide tables are inferred in slices of columns, and merged in order.
+    """
+    records = [
+        {f"{kind}_{index}": value for index in range(40) for kind, value in [("int", i), ("str", f"foo{i}")]}
+        for i in range(10)
+    ]
+    executor = mock.Mock(wraps=ThreadPoolExecutor(max_workers=2))
+    parallel = determine_types(records, executor=executor)
+    sequential = determine_types(records)
+    assert executor.map.call_count == 1
+    assert {name: repr(column) for name, column in parallel.columns.items()} == {
+        name: repr(column) for name, column in sequential.columns.items()
+    }
+
+
+def test_source_deserialize_once():
+    """
+    Each deserializer is invoked only once per resource, and the record consumed
+    for probing the deserializer is not lost.
+    """
+    data = io.StringIO('{"id": 1}\n{"id": 2}\n')
+    with mock.patch("skeem.ddlgen.sources._eval_ndjson", wraps=_eval_ndjson) as deserializer:
+        records = list(SourcePlus(data, ext=".ndjson"))
+    assert deserializer.call_count == 1
+    assert records == [{"id": 1}, {"id": 2}]
@@ -1,11 +1,25 @@
 import io
+import json
+from unittest import mock
 
+import fsspec
 import pandas as pd
 import pandas._testing as tm
 import pytest
+from fsspec.implementations.memory import MemoryFileSystem
 
-from skeem.io import peek, to_dataframe
-from skeem.types import ContentType
+from skeem.io import (
+    dataset_to_dataframe,
+    fsspec_peek_ranged,
+    fsspec_sample_ranged,
+    json_get_first_records,
+    ndjson_to_dataframe,
+    peek,
+    read_ndjson,
+    stream_sample,
+    to_dataframe,
+)
+from skeem.types import ContentType, SamplingStrategy
 
 
 def test_peek_success():
@@ -48,6 +62,56 @@ def test_peek_stream_partial(basic_stream_csv):
     )
 
 
+def test_peek_json_streaming():
+    """
+    Peeking into a JSON document only reads the bytes up to the last sampled record.
+    """
+    document = json.dumps([{"id": index, "tags": ["foo"]} for index in range(100_000)]).encode()
+    data = io.BytesIO(document)
+    records = json.loads(peek(data=data, content_type=ContentType.JSON, peek_lines=3).read())
+    assert records == [{"id": 0, "tags": ["foo"]}, {"id": 1, "tags": ["foo"]}, {"id": 2, "tags": ["foo"]}]
+    assert data.tell() < len(document) / 10
+
+
+def test_json_get_first_records_path():
+    """
+    Records can be selected from nested nodes of a JSON document.
+    """
+    document = b'{"meta": {"skip": [1, 2]}, "data": {"items": [{"id": 1, "nested": {"foo": "bar"}}, {"id": 2}]}}'
+    records = json_get_first_records(io.BytesIO(document), path="data.items[*]")
+    assert records == [{"id": 1, "nested": {"foo": "bar"}}, {"id": 2}]
+    assert json_get_first_records(io.BytesIO(document), path="$.data.items[1]") == [{"id": 2}]
+    assert json_get_first_records(io.BytesIO(document), path="/data/items/1") == [{"id": 2}]
+
+    with pytest.raises(ValueError) as ex:
+        json_get_first_records(io.BytesIO(document), path="data.unknown")
+    assert ex.match("Unable to select JSON path 'data.unknown'. Reason: Segment 'unknown' not found")
+
+    with pytest.raises(ValueError) as ex:
+        json_get_first_records(io.BytesIO(document), path="data[*].items")
+    assert ex.match("Wildcards are only supported at the end of the path")
+
+
+def test_read_ndjson_fallback():
+    """
+    Without `orjson`, NDJSON data is decoded using the `json` module of the standard library.
+    """
+    data = b'{"id": 1, "price": 1.0}\n\n{"id": 2, "name": "foo"}\n{"id": 3}\n'
+    with mock.patch.dict("sys.modules", {"orjson": None}):
+        fallback = list(read_ndjson(io.BytesIO(data), nrows=2))
+    assert fallback == list(read_ndjson(io.BytesIO(data), nrows=2))
+    assert fallback == [{"id": 1, "price": 1.0}, {"id": 2, "name": "foo"}]
+
+
+def test_ndjson_to_dataframe():
+    """
+    NDJSON records are converged to columns without coercing values, and missing keys are `None`.
+    """
+    df = ndjson_to_dataframe(io.BytesIO(b'{"id": 1, "price": 1.0}\n{"id": 2, "name": "foo"}\n'))
+    assert df.to_dict(orient="list") == {"id": [1, 2], "price": [1.0, None], "name": [None, "foo"]}
+    assert isinstance(df["price"][0], float)
+
+
 def test_to_dataframe_csv(csv_file_basic):
     data = io.BytesIO(csv_file_basic.read_bytes())
     records = [
@@ -85,3 +149,160 @@ def test_to_dataframe_grib2():
     with pytest.raises(ValueError) as ex:
         to_dataframe(data=io.BytesIO(), content_type=ContentType.GRIB2)
     assert ex.match("Unable to process content type: ContentType.GRIB2")
+
+
+def test_dataset_to_dataframe_windows():
+    """
+    Large grids are sampled by converting small windows, not the whole dataset.
+    The grid has 24 million points, without allocating memory for them.
+    """
+    xr = pytest.importorskip("xarray")
+    import numpy as np
+
+    shape = (200, 300, 400)
+    ds = xr.Dataset(
+        {"temperature": (["time", "lat", "lon"], np.broadcast_to(np.float32(21.5), shape))},
+        coords={"time": np.arange(200), "lat": np.linspace(-90, 90, 300), "lon": np.linspace(-180, 180, 400)},
+    )
+    to_dataframe_original = xr.Dataset.to_dataframe
+    with mock.patch.object(xr.Dataset, "to_dataframe", autospec=True, side_effect=to_dataframe_original) as convert:
+        df = dataset_to_dataframe(ds, peek_lines=100)
+    assert max(call.args[0].temperature.size for call in convert.call_args_list) <= 100
+    assert list(df.columns) == ["time", "lat", "lon", "temperature"]
+    assert len(df) == 100
+    assert df["lon"].iloc[99] == ds.lon[99]
+
+
+def test_dataset_to_dataframe_missing_values():
+    """
+    Grid points with missing values are skipped, like `Dataset.to_dataframe().dropna()`.
+    When no grid point without missing values can be found, missing values are sampled as-is.
+    """
+    xr = pytest.importorskip("xarray")
+    import numpy as np
+
+    data = np.full((4, 50), np.nan)
+    data[2, 10:] = 42.42
+    ds = xr.Dataset({"value": (["y", "x"], data)})
+    expected = ds.to_dataframe().dropna().iloc[:20].reset_index()
+    pd.testing.assert_frame_equal(dataset_to_dataframe(ds, peek_lines=20), expected)
+
+    ds = xr.Dataset({"value": (["y", "x"], np.full((4, 50), np.nan))})
+    df = dataset_to_dataframe(ds, peek_lines=20, max_points=100)
+    assert len(df) == 20
+    assert df["value"].isna().all()
+
+
+@pytest.fixture
+def memory_file_lines():
+    """
+    A file with 100 lines of 8 bytes each, on the `fsspec` memory file system.
+    """
+    path = "memory://skeem-test/lines.csv"
+    payload = "".join(f"{index:03d},foo\n" for index in range(100)).encode()
+    with fsspec.open(path, "wb") as f:
+        f.write(payload)
+    yield path
+    fsspec.filesystem("memory").rm(path)
+
+
+def test_fsspec_peek_ranged_exact(memory_file_lines):
+    """
+    When the first range already contains enough lines, only one request is issued.
+    """
+    with mock.patch.object(MemoryFileSystem, "cat_file", autospec=True, side_effect=MemoryFileSystem.cat_file) as cat:
+        payload = fsspec_peek_ranged(memory_file_lines, peek_bytes=44, peek_lines=5)
+    assert payload == b"000,foo\n001,foo\n002,foo\n003,foo\n004,foo\n"
+    assert cat.call_count == 1
+    assert cat.call_args.kwargs == {"start": 0, "end": 44}
+
+
+def test_fsspec_peek_ranged_grow(memory_file_lines):
+    """
+    The range is doubled until enough complete lines have been received, only fetching missing bytes.
+    """
+    with mock.patch.object(MemoryFileSystem, "cat_file", autospec=True, side_effect=MemoryFileSystem.cat_file) as cat:
+        payload = fsspec_peek_ranged(memory_file_lines, peek_bytes=10, peek_lines=7)
+    assert payload.splitlines() == [f"{index:03d},foo".encode() for index in range(7)]
+    assert [call.kwargs for call in cat.call_args_list] == [
+        {"start": 0, "end": 10},
+        {"start": 10, "end": 20},
+        {"start": 20, "end": 40},
+        {"start": 40, "end": 80},
+    ]
+
+
+def test_fsspec_peek_ranged_budget(memory_file_lines):
+    """
+    The byte budget is honored, and incomplete lines are stripped.
+    """
+    payload = fsspec_peek_ranged(memory_file_lines, peek_bytes=10, peek_lines=50, max_bytes=30)
+    assert payload == b"000,foo\n001,foo\n002,foo\n"
+
+
+def test_fsspec_peek_ranged_eof(memory_file_lines):
+    """
+    Reading stops at the end of the resource, and the last line is retained.
+    """
+    payload = fsspec_peek_ranged(memory_file_lines, peek_bytes=10, peek_lines=500)
+    assert len(payload) == 800
+    assert payload.endswith(b"099,foo\n")
+
+
+@pytest.mark.parametrize("strategy", [SamplingStrategy.STRIDE, SamplingStrategy.RESERVOIR])
+def test_fsspec_sample_ranged_segments(memory_file_lines, strategy):
+    """
+    Lines are sampled from segments spread across the resource, retaining the first line.
+    """
+    payload = fsspec_sample_ranged(memory_file_lines, strategy=strategy, peek_bytes=16, peek_lines=8, max_bytes=128)
+    lines = payload.splitlines()
+    assert len(lines) == 8
+    assert lines[0] == b"000,foo"
+    assert all(line.endswith(b",foo") and len(line) == 7 for line in lines)
+    assert int(lines[-1][:3]) >= 80
+    assert lines == sorted(lines)
+
+
+def test_fsspec_sample_ranged_tail_head(memory_file_lines):
+    """
+    Lines are sampled from the beginning and the end of the resource.
+    """
+    payload = fsspec_sample_ranged(
+        memory_file_lines, strategy=SamplingStrategy.TAIL_HEAD, peek_bytes=16, peek_lines=6, max_bytes=64
+    )
+    assert payload == b"000,foo\n001,foo\n002,foo\n097,foo\n098,foo\n099,foo\n"
+
+
+def test_fsspec_sample_ranged_small(memory_file_lines):
+    """
+    Resources within the byte budget are read as a whole, and lines are selected from all of them.
+    """
+    payload = fsspec_sample_ranged(
+        memory_file_lines, strategy=SamplingStrategy.STRIDE, peek_bytes=16, peek_lines=4, max_bytes=1000
+    )
+    assert payload == b"000,foo\n025,foo\n050,foo\n075,foo\n"
+
+
+@pytest.mark.parametrize("strategy", [SamplingStrategy.STRIDE, SamplingStrategy.RESERVOIR, SamplingStrategy.TAIL_HEAD])
+@pytest.mark.parametrize("nlines", [2, 5, 9, 17, 40])
+@pytest.mark.parametrize("max_bytes", [4, 9, 17, 33])
+def test_stream_sample_no_duplicates(strategy, nlines, max_bytes):
+    """
+    Segments of small resources never overlap, so no line is sampled twice.
+    Otherwise, duplicate values would defeat the uniqueness check of primary key candidates.
+    """
+    data = io.BytesIO("".join(f"{index}\n" for index in range(nlines)).encode())
+    payload = stream_sample(data, strategy=strategy, peek_bytes=4, peek_lines=100, max_bytes=max_bytes)
+    lines = payload.splitlines()
+    assert len(lines) == len(set(lines))
+    assert lines == sorted(lines, key=int)
+
+
+def test_stream_sample():
+    """
+    Seekable streams are sampled the same way, and are rewound afterwards.
+    """
+    data = io.BytesIO("".join(f"{index:03d},foo\n" for index in range(100)).encode())
+    payload = stream_sample(data, strategy=SamplingStrategy.TAIL_HEAD, peek_bytes=16, peek_lines=4, max_bytes=32)
+    assert payload == b"000,foo\n001,foo\n098,foo\n099,foo\n"
+    assert data.tell() == 0
@@ -1,10 +1,15 @@
+import bz2
+import gzip
 import io
+import lzma
 import re
 import typing as t
 
+import fsspec.compression
 import pytest
 
-from skeem.model import Resource
+from skeem.model import Resource, SamplingConfig
+from skeem.types import Compression, ContentType, SamplingStrategy
 
 
 @pytest.mark.parametrize("indata", ["foo", b"foo", io.StringIO("foo"), io.BytesIO(b"foo")])
@@ -64,3 +69,155 @@ def test_resource_peek_url_failure_host_not_found():
     with pytest.raises(FileNotFoundError) as ex:
         resource.peek()
     assert ex.match(re.escape("https://example-unknown.org/foo.csv"))
+
+
+def test_sampling_config_defaults():
+    sampling = SamplingConfig(strategy="tail+head")
+    assert sampling.strategy is SamplingStrategy.TAIL_HEAD
+    assert sampling.rows == 100
+
+
+@pytest.mark.parametrize("kwargs", [{"rows": 0}, {"bytes": -1}, {"strategy": "foo"}])
+def test_sampling_config_invalid(kwargs):
+    with pytest.raises(ValueError):
+        SamplingConfig(**kwargs)
+
+
+@pytest.mark.parametrize("strategy,found", [("head", False), ("stride", True), ("tail+head", True)])
+def test_resource_peek_sampling_strategy(strategy, found):
+    """
+    A type change deep within a line-based resource is only caught when sampling across the resource.
+    """
+    data = b"id,value\n" + b"".join(f"{index},{index if index < 800 else 'foo'}\n".encode() for index in range(1000))
+    resource = Resource(data=io.BytesIO(data), content_type="csv")
+    resource.sampling = SamplingConfig(rows=10, bytes=800, strategy=strategy)
+    resource.detect_type()
+    lines = resource.peek().read().splitlines()
+    assert lines[0] == b"id,value"
+    assert len(lines) == 10
+    assert any(line.endswith(b",foo") for line in lines) is found
+
+
+class UnseekableStream(io.RawIOBase):
+    """
+    A stream which can only be read once, like stdin, counting the bytes read from it.
+    """
+
+    def __init__(self, payload: bytes):
+        self.payload = io.BytesIO(payload)
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.payload.read(len(buffer))
+        buffer[: len(chunk)] = chunk
+        self.bytes_read += len(chunk)
+        return len(chunk)
+
+
+def test_resource_detect_type_from_data():
+    """
+    The content type of data without filename is detected from its first bytes, which are
+    replayed when peeking into the data afterwards, so detection costs no extra I/O.
+    """
+    payload = b"id,name\n" + b"".join(f"{index},foo\n".encode() for index in range(100_000))
+    stream = UnseekableStream(payload)
+    resource = Resource(data=stream)
+    resource.detect_type()
+    assert resource.type is ContentType.CSV
+    lines = resource.peek().read().splitlines()
+    assert lines[:2] == [b"id,name", b"0,foo"]
+    assert len(lines) == 100
+    assert stream.bytes_read < len(payload)
+
+
+def test_resource_detect_type_gzip(tmp_path):
+    """
+    The content type of gzip-compressed files is detected from their payload.
+    """
+    path = tmp_path / "data.gz"
+    path.write_bytes(gzip.compress(b'{"id": 1}\n{"id": 2}\n'))
+    for resource in [Resource(path=path), Resource(data=io.BytesIO(path.read_bytes()))]:
+        resource.detect_type()
+        assert resource.type is ContentType.NDJSON
+        assert resource.peek().read() == b'{"id": 1}\n{"id": 2}\n'
+
+
+@pytest.mark.parametrize("source", ["path", "stream"])
+def test_resource_detect_type_long_first_line(tmp_path, source):
+    """
+    When the first NDJSON record is longer than the first bytes read for detecting the
+    content type, more bytes are read, instead of guessing a JSON document.
+    """
+    payload = b'{"id": 1, "text": "' + b"x" * 20_000 + b'"}\n{"id": 2, "text": "y"}\n'
+    path = tmp_path / "data"
+    path.write_bytes(payload)
+    resource = Resource(path=path) if source == "path" else Resource(data=UnseekableStream(payload))
+    resource.detect_type()
+    assert resource.type is ContentType.NDJSON
+    assert resource.peek().read().startswith(b'{"id": 1, "text": "xxx')
+
+
+def test_resource_detect_type_without_extension(tmp_path):
+    """
+    The content type of files without a known filename extension is detected from their first bytes.
+    """
+    path = tmp_path / "data"
+    path.write_bytes(b"basic,id=1 price=0.42 1414747376000000000\n")
+    resource = Resource(path=path)
+    resource.detect_type()
+    assert resource.type is ContentType.LINEPROTOCOL
+
+
+@pytest.mark.parametrize(
+    "suffix,compress,compression",
+    [(".csv.bz2", bz2.compress, Compression.BZ2), (".csv.xz", lzma.compress, Compression.XZ)],
+)
+def test_resource_compressed_file(tmp_path, suffix, compress, compression):
+    """
+    Compressed files are decompressed transparently, deriving the content type of the payload from the filename.
+    """
+    payload = b"id,name\n" + b"".join(f"{index},foo\n".encode() for index in range(1_000))
+    path = tmp_path / f"data{suffix}"
+    path.write_bytes(compress(payload))
+    resource = Resource(path=path)
+    resource.detect_type()
+    assert resource.type is ContentType.CSV
+    assert resource.compression is compression
+    assert resource.is_range_readable() is False
+    lines = resource.peek().read().splitlines()
+    assert lines[:2] == [b"id,name", b"0,foo"]
+    assert len(lines) == 100
+    assert resource.open().read() == payload
+
+
+def test_resource_compressed_stream_incremental():
+    """
+    Compressed streams are detected by magic bytes, and only decompressed as far as needed for peeking.
+    """
+    payload = b"".join(f'{{"id": {index}, "value": {index * 7919 % 10007}}}\n'.encode() for index in range(100_000))
+    compressed = lzma.compress(payload)
+    stream = UnseekableStream(compressed)
+    resource = Resource(data=stream)
+    resource.detect_type()
+    assert resource.type is ContentType.NDJSON
+    assert resource.compression is Compression.XZ
+    assert len(resource.peek().read().splitlines()) == 100
+    assert stream.bytes_read < len(compressed) / 2
+
+
+def test_resource_compressed_codec_unavailable(tmp_path, monkeypatch):
+    """
+    Decompressing formats whose codec is not installed croaks with an installation hint.
+    """
+    monkeypatch.delitem(fsspec.compression.compr, "zstd", raising=False)
+    path = tmp_path / "data.ndjson.zst"
+    path.write_bytes(b"\x28\xb5\x2f\xfd")
+    resource = Resource(path=path)
+    resource.detect_type()
+    assert resource.type is ContentType.NDJSON
+    with pytest.raises(ValueError) as ex:
+        resource.peek()
+    assert ex.match("Decompressing 'zstd' needs an additional package")
@@ -0,0 +1,73 @@
+import json
+import pstats
+
+from click.testing import CliRunner
+
+from skeem.cli import cli
+from skeem.core import SchemaGenerator
+from skeem.model import Resource, SamplingConfig, SqlTarget
+from skeem.profiling import Profiler
+
+
+def test_profiler_span_accumulate():
+    """
+    Stages which are entered multiple times are accumulated into the same span.
+    """
+    profiler = Profiler()
+    for _ in range(2):
+        with profiler.span("serialize") as span:
+            span.add(bytes=10)
+    span = profiler.spans["serialize"]
+    assert span.calls == 2
+    assert span.bytes == 20
+    assert span.rows is None
+    assert span.wall > 0
+    assert profiler.timings == {"serialize": span.wall}
+
+
+def test_profiler_table():
+    profiler = Profiler()
+    with profiler.span("peek") as span:
+        span.add(bytes=12345, rows=100)
+    lines = profiler.to_table().splitlines()
+    assert lines[0].split() == ["stage", "calls", "wall", "[ms]", "cpu", "[ms]", "rows", "bytes"]
+    assert lines[2].split()[0:2] == ["peek", "1"]
+    assert lines[2].split()[-2:] == ["100", "12,345"]
+    assert lines[-1].startswith("total")
+
+
+def test_schema_generator_profile(ndjson_file_basic):
+    """
+    Each stage of the inference pipeline is recorded, including the amount of data it processed.
+    """
+    sg = SchemaGenerator(
+        resource=Resource(path=ndjson_file_basic),
+        target=SqlTarget(dialect="crate"),
+        sampling=SamplingConfig(full_scan=True),
+    )
+    sg.to_sql_ddl_dialects(["crate", "postgresql"])
+    spans = sg.profiler.spans
+    assert list(spans) == ["detect", "peek", "scan", "infer_pk", "deserialize", "infer_types", "serialize"]
+    assert spans["peek"].bytes == ndjson_file_basic.stat().st_size
+    assert spans["scan"].rows == 2
+    assert spans["infer_types"].rows == 2
+    assert spans["serialize"].calls == 2
+
+
+def test_infer_ddl_profile(tmp_path, csv_file_basic):
+    """
+    CLI test: Display profile on stderr, and write JSON report and cProfile statistics to files.
+    """
+    report = tmp_path / "profile.json"
+    dump = tmp_path / "profile.prof"
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        args=f"infer-ddl --dialect=crate --profile --profile-report={report} --profile-dump={dump} {csv_file_basic}",
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0
+    assert result.stdout.startswith('CREATE TABLE "basic"')
+    assert "infer_types" in result.stderr
+    assert [stage["name"] for stage in json.loads(report.read_text())["stages"]][-2:] == ["serialize", "pretty"]
+    assert pstats.Stats(str(dump)).total_calls > 0
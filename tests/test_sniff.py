@@ -0,0 +1,105 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from skeem.exception import UndecidedContentType
+from skeem.settings import SNIFF_BYTES
+from skeem.sniff import sniff, sniff_compression
+from skeem.types import Compression, ContentType
+
+TESTDATA = Path("tests/testdata")
+
+
+@pytest.mark.parametrize(
+    "filename,content_type",
+    [
+        ("basic.csv", ContentType.CSV),
+        ("basic-document.json", ContentType.JSON),
+        ("basic-records.json", ContentType.JSON),
+        ("basic-nested.json", ContentType.JSON),
+        ("basic.ndjson", ContentType.NDJSON),
+        ("basic.lp", ContentType.LINEPROTOCOL),
+        ("air-sensor-data-irregular.lp", ContentType.LINEPROTOCOL),
+        ("basic.parquet", ContentType.PARQUET),
+        ("basic.xlsx", ContentType.XLSX),
+        ("basic.ods", ContentType.ODS),
+        ("aircraft-track-lear.nc", ContentType.NETCDF),
+    ],
+)
+def test_sniff_testdata(filename, content_type):
+    """
+    Detect content types of all test data files from their first bytes.
+    """
+    buffer = (TESTDATA / filename).read_bytes()[:SNIFF_BYTES]
+    assert sniff(buffer) is content_type
+
+
+@pytest.mark.parametrize(
+    "buffer,content_type",
+    [
+        (b"\x89HDF\r\n\x1a\n\x00\x00", ContentType.NETCDF),
+        (b"CDF\x02\x00\x00\x00\x00", ContentType.NETCDF),
+        (b"GRIB\x00\x00\x00\x02", ContentType.GRIB2),
+        (b'{"id": 1}', ContentType.JSON),
+        (b'{"id": 1}\n', ContentType.JSON),
+        (b'{"a": [{"id": 1}, {"id": 2}]}\n', ContentType.JSON),
+        (b'{"id": 1}\n{"id": 2}\n', ContentType.NDJSON),
+        (b'{"id": 1}\n{"id": 2, "name": "trunc', ContentType.NDJSON),
+        (b"id;name\n1;foo\n2;bar\n", ContentType.CSV),
+        (b"<!DOCTYPE html><html></html>", None),
+        (b"\x00\x01\x02\x03", None),
+        (b"", None),
+    ],
+)
+def test_sniff_signatures(buffer, content_type):
+    assert sniff(buffer) is content_type
+
+
+def test_sniff_gzip():
+    """
+    The content type of gzip-compressed data is detected from its payload, even when truncated.
+    """
+    payload = b"".join(f'{{"id": {index}, "name": "foo"}}\n'.encode() for index in range(10_000))
+    buffer = gzip.compress(payload)[:1024]
+    assert sniff(buffer) is ContentType.NDJSON
+    assert sniff(gzip.compress(b"\x00\x01\x02")) is ContentType.GZIP
+
+
+@pytest.mark.parametrize(
+    "buffer,compression",
+    [
+        (b"\x28\xb5\x2f\xfd\x24\x00", Compression.ZSTD),
+        (b"\x04\x22\x4d\x18\x64\x40", Compression.LZ4),
+        (b"\xff\x06\x00\x00sNaPpY\x00", Compression.SNAPPY),
+        (bz2.compress(b"foo"), Compression.BZ2),
+        (lzma.compress(b"foo"), Compression.XZ),
+        (gzip.compress(b"foo"), Compression.GZIP),
+        (b"PAR1", None),
+    ],
+)
+def test_sniff_compression(buffer, compression):
+    assert sniff_compression(buffer) is compression
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, lzma.compress])
+def test_sniff_compressed_payload(compress):
+    """
+    The content type of the payload of compressed data is detected from a truncated prefix.
+    Block-based formats like bz2 need a whole block, so they are only detected from streams.
+    """
+    payload = b"id,name\n" + b"".join(f"{index},{index * 7919 % 10007}\n".encode() for index in range(100_000))
+    assert sniff(compress(payload)[:SNIFF_BYTES]) is ContentType.CSV
+
+
+def test_sniff_long_first_line():
+    """
+    When the first line of a truncated buffer is longer than the buffer, the content type is undecided.
+    """
+    payload = b'{"id": 1, "text": "' + b"x" * SNIFF_BYTES + b'"}\n{"id": 2, "text": "y"}\n'
+    with pytest.raises(UndecidedContentType):
+        sniff(payload[:SNIFF_BYTES], complete=False)
+    assert sniff(payload, complete=False) is ContentType.NDJSON
+    assert sniff(b'{"id": 1}\n', complete=True) is ContentType.JSON
@@ -0,0 +1,71 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+# How long importing the command line interface may take, in microseconds.
+STARTUP_BUDGET_US = 500_000
+
+# Which modules must not be imported when starting the command line interface.
+HEAVY_MODULES = [
+    "ddlgenerator",
+    "fastparquet",
+    "frictionless",
+    "fsspec",
+    "numpy",
+    "pandas",
+    "sqlalchemy",
+    "sqlformatter",
+]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, check=True, text=True)  # noqa: S603
+
+
+def test_startup_no_heavy_imports():
+    """
+    Importing the command line interface does not import the heavy machinery.
+    """
+    process = run_python("-c", "import sys, skeem.cli; print(' '.join(sys.modules))")
+    modules = process.stdout.split()
+    assert [name for name in HEAVY_MODULES if name in modules] == []
+
+
+def test_startup_importtime():
+    """
+    Importing the command line interface stays within the startup time budget.
+    """
+    process = run_python("-X", "importtime", "-c", "import skeem.cli")
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| skeem\.cli$", process.stderr, re.MULTILINE)
+    assert match is not None, process.stderr
+    assert int(match.group(1)) < STARTUP_BUDGET_US
+
+
+@pytest.mark.parametrize(
+    "module,attribute,patch_module",
+    [
+        ("ddlgenerator.ddlgenerator", "Table", "skeem.ddlgen.ddlgenerator"),
+        ("fastparquet.core", "read_col", "skeem.fastparquet.core"),
+        ("pandas.io.common", "_get_filepath_or_buffer", "skeem.pandas.io_common"),
+    ],
+)
+def test_startup_patch_on_import(module, attribute, patch_module):
+    """
+    3rd-party modules are patched when they are imported, after importing `skeem`.
+    """
+    process = run_python("-c", f"import skeem, {module}; print({module}.{attribute}.__module__)")
+    assert process.stdout.strip() == patch_module
+
+
+def test_startup_patch_on_import_reverse():
+    """
+    3rd-party modules are patched when they are imported by the package which patches them.
+    """
+    process = run_python(
+        "-c",
+        "import skeem.ddlgen.ddlgenerator, ddlgenerator.ddlgenerator; "
+        "print(ddlgenerator.ddlgenerator.Table is skeem.ddlgen.ddlgenerator.TablePlus)",
+    )
+    assert process.stdout.strip() == "True"
@@ -1,7 +1,7 @@
 import pytest
 
 from skeem.exception import UnknownContentType
-from skeem.types import ContentType, ContentTypeMime, ContentTypeSuffix
+from skeem.types import Compression, ContentType, ContentTypeMime, ContentTypeSuffix
 
 # ===============
 # Main test cases
@@ -23,6 +23,30 @@ def test_content_type_from_filename_netcdf(filename: str):
     assert ContentType.from_filename(filename) is ContentType.NETCDF
 
 
+@pytest.mark.parametrize(
+    "filename,content_type,compression",
+    [
+        ("test.ndjson.zst", ContentType.NDJSON, Compression.ZSTD),
+        ("test.csv.bz2", ContentType.CSV, Compression.BZ2),
+        ("test.lp.xz", ContentType.LINEPROTOCOL, Compression.XZ),
+        ("test.csv.lz4", ContentType.CSV, Compression.LZ4),
+        ("test.json.sz", ContentType.JSON, Compression.SNAPPY),
+        ("test.csv.gz", ContentType.CSV, Compression.GZIP),
+        ("https://example.org/test.csv.gz?token=foo", ContentType.CSV, Compression.GZIP),
+        ("test.gz", ContentType.GZIP, Compression.GZIP),
+    ],
+)
+def test_content_type_from_filename_compressed(filename: str, content_type: ContentType, compression: Compression):
+    assert ContentType.from_filename(filename) is content_type
+    assert Compression.from_filename(filename) is compression
+
+
+def test_content_type_from_filename_compressed_unknown():
+    with pytest.raises(UnknownContentType) as ex:
+        ContentType.from_filename("test.zst")
+    assert ex.match("Unable to guess content type from 'test.zst'")
+
+
 def test_content_type_to_suffix_lineprotocol():
     assert ContentType.LINEPROTOCOL.suffix == ".lp"
 